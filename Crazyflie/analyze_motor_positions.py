@@ -1,8 +1,20 @@
 #!/usr/bin/env python3
-from pxr import Usd, UsdGeom, Gf
+from pxr import Usd, Gf
+import numpy as np
+import os
+import sys
 
-# Open the USD file
-stage = Usd.Stage.Open('cf2x.usd')
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.keyframes import frame_times
+from robot_usd.transforms import TransformCache
+
+# Open the USD file (pass an animated layer, e.g. cf2x_colored_animated.usda, to check a clip)
+input_file = sys.argv[1] if len(sys.argv) > 1 else 'cf2x.usd'
+stage = Usd.Stage.Open(input_file)
+
+# One transform cache shared by every query below
+transforms = TransformCache(stage)
 
 # Find the motor joints
 motor_joints = [
@@ -13,15 +25,11 @@ motor_joints = [
 ]
 
 print("Motor joint positions:")
-for joint_path in motor_joints:
-    joint = stage.GetPrimAtPath(joint_path)
-    if joint:
-        xformable = UsdGeom.Xformable(joint)
-        # Get the local transform matrix
-        local_transform = xformable.ComputeLocalToWorldTransform(0)
-        # Extract the translation component
-        translation = local_transform.ExtractTranslation()
-        print(f"{joint_path}: {translation}")
+found_joints = [path for path in motor_joints if stage.GetPrimAtPath(path)]
+if found_joints:
+    # Extract the translation component of every world transform at once
+    for joint_path, translation in zip(found_joints, transforms.world_positions(found_joints, 0)):
+        print(f"{joint_path}: {Gf.Vec3d(*translation)}")
 
 # Find the propellers
 propellers = [
@@ -32,15 +40,21 @@ propellers = [
 ]
 
 print("\nPropeller positions:")
-for prop_path in propellers:
-    prop = stage.GetPrimAtPath(prop_path)
-    if prop:
-        xformable = UsdGeom.Xformable(prop)
-        # Get the local transform matrix
-        local_transform = xformable.ComputeLocalToWorldTransform(0)
-        # Extract the translation component
-        translation = local_transform.ExtractTranslation()
-        print(f"{prop_path}: {translation}")
+found_props = [path for path in propellers if stage.GetPrimAtPath(path)]
+if found_props:
+    for prop_path, translation in zip(found_props, transforms.world_positions(found_props, 0)):
+        print(f"{prop_path}: {Gf.Vec3d(*translation)}")
+
+# Check propeller clearance over every frame of the clip
+if len(found_props) > 1:
+    frames = frame_times(stage.GetStartTimeCode(), stage.GetEndTimeCode())
+    positions = transforms.world_positions(found_props, frames)  # (frames, props, 3)
+    distances = np.linalg.norm(positions[:, :, np.newaxis] - positions[:, np.newaxis, :], axis=-1)
+    distances[:, np.arange(len(found_props)), np.arange(len(found_props))] = np.inf
+    frame_index, first, second = np.unravel_index(np.argmin(distances), distances.shape)
+    print(f"\nClosest propeller spacing over frames {frames[0]:g}-{frames[-1]:g}: "
+          f"{distances[frame_index, first, second]:.4f} "
+          f"({found_props[first]} / {found_props[second]} at frame {frames[frame_index]:g})")
 
 # Print the body visual components
 body_visual_path = "/crazyflie/body/body_visual"
@@ -48,4 +62,4 @@ body_visual = stage.GetPrimAtPath(body_visual_path)
 if body_visual:
     print("\nBody visual components:")
     for child in body_visual.GetChildren():
-        print(f"- {child.GetPath()}")
\ No newline at end of file
+        print(f"- {child.GetPath()}")
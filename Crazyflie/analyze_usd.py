@@ -1,18 +1,29 @@
 #!/usr/bin/env python3
-from pxr import Usd, UsdGeom
+import argparse
+import os
+import sys
 
-def print_hierarchy(prim, indent=0):
-    print(' ' * indent + f'- {prim.GetPath()}')
-    for child in prim.GetChildren():
-        print_hierarchy(child, indent + 2)
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.hierarchy import add_inspection_arguments, iter_prim_records, open_for_inspection, write_ndjson
+
+parser = argparse.ArgumentParser(description='Print the prim hierarchy of a USD file')
+parser.add_argument('input_file', nargs='?', default='cf2x.usd', help='USD file to inspect (default: cf2x.usd)')
+add_inspection_arguments(parser)
+args = parser.parse_args()
 
 # Open the USD file
-stage = Usd.Stage.Open('cf2x.usd')
+stage = open_for_inspection(args.input_file, not args.no_payloads)
 
-print('Root prims:')
-for prim in stage.GetPseudoRoot().GetChildren():
-    print(f'- {prim.GetPath()}')
+# Walk the stage once, without recursion
+records = iter_prim_records(stage, args.prefix, args.max_depth, sizes=args.json and not args.no_bytes)
 
-print('\nHierarchy:')
-for prim in stage.GetPseudoRoot().GetChildren():
-    print_hierarchy(prim)
\ No newline at end of file
+if args.json:
+    write_ndjson(records, sys.stdout)
+else:
+    print('Root prims:')
+    for prim in stage.GetPseudoRoot().GetChildren():
+        print(f'- {prim.GetPath()}')
+    
+    print('\nHierarchy:')
+    sys.stdout.writelines(' ' * (2 * (record["depth"] - 1)) + f'- {record["path"]}\n' for record in records)
@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
-from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, UsdShade, Vt
-import math
+from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, Vt
 import os
+import sys
 
-def create_animated_crazyflie():
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.keyframe_reduction import reduce_keyframes
+from robot_usd.keyframes import frame_times, linear_ramp, sine_wave, vec3, write_keyframes
+from robot_usd.materials import MaterialRegistry
+from robot_usd.output_format import layer_path
+
+def create_animated_crazyflie(output_format=None):
     # Input and output files
     input_file = "cf2x.usd"
-    output_file = "cf2x_animated_color.usda"
+    output_file = layer_path("cf2x_animated_color.usda", output_format)
     usdz_file = "cf2x_animated_color.usdz"
     
     # Open the stage
@@ -42,6 +49,8 @@ def create_animated_crazyflie():
     }
     
     # Animate the propellers
+    frames = frame_times(1, 48)
+    keyframes = {}
     for prop_path in propellers:
         prop = UsdGeom.Xform(stage.GetPrimAtPath(prop_path))
         
@@ -52,10 +61,8 @@ def create_animated_crazyflie():
         speed = rotation_speeds[prop_path]
         
         # Create a continuous rotation animation
-        for frame in range(1, 49):
-            time = frame
-            angle = (speed / 24) * frame  # Degrees per frame
-            rotation_attr.Set(Gf.Vec3d(0, 0, angle), time)
+        angle = linear_ramp(frames, speed / 24)  # Degrees per frame
+        keyframes[rotation_attr] = (frames, vec3(z=angle))
         
         print(f"Added rotation animation to {prop_path}")
     
@@ -64,10 +71,11 @@ def create_animated_crazyflie():
     translate_op = drone.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
     
     # Create a subtle up/down hovering motion
-    for frame in range(1, 49):
-        time = frame
-        height = 0.005 * math.sin(2 * math.pi * frame / 24)  # 5mm up/down motion
-        translate_op.Set(Gf.Vec3d(0, height, 0), time)
+    height = sine_wave(frames, 0.005, 24)  # 5mm up/down motion
+    keyframes[translate_op] = (frames, vec3(y=height))
+    
+    # Write all propeller and hover samples in one pass
+    write_keyframes(stage, keyframes)
     
     print("Added hovering animation to drone body")
     
@@ -100,31 +108,18 @@ def create_animated_crazyflie():
         "/crazyflie/m4_prop/cw_prop": Gf.Vec3f(0.0, 0.0, 0.8)
     }
     
-    # Apply colors to parts
+    # Apply colors to parts; parts with the same color share one material,
+    # kept under the default prim so the asset stays self-contained
+    materials = MaterialRegistry(stage, "/crazyflie/Materials")
     for part_path, color in colors.items():
         if stage.GetPrimAtPath(part_path):
-            # Create a new material for this part
-            material_path = part_path + "_material"
-            material = UsdShade.Material.Define(stage, material_path)
-            
-            # Create a PBR shader
-            shader = UsdShade.Shader.Define(stage, material_path + "/shader")
-            shader.CreateIdAttr("UsdPreviewSurface")
-            
-            # Set color and other properties
-            shader.CreateInput("diffuseColor", Sdf.ValueTypeNames.Color3f).Set(color)
-            shader.CreateInput("metallic", Sdf.ValueTypeNames.Float).Set(0.0)
-            shader.CreateInput("roughness", Sdf.ValueTypeNames.Float).Set(0.4)
-            
-            # Connect shader to material
-            material.CreateOutput("surface", Sdf.ValueTypeNames.Token).ConnectToSource(
-                UsdShade.ConnectableAPI(shader), "surface"
-            )
-            
-            # Bind material to part
-            UsdShade.MaterialBindingAPI(stage.GetPrimAtPath(part_path)).Bind(material)
-            
+            materials.bind(stage.GetPrimAtPath(part_path), diffuseColor=color, metallic=0.0, roughness=0.4)
             print(f"Applied color to {part_path}")
+    print(f"Created {len(materials)} shared materials")
+    
+    # Drop samples that linear interpolation reproduces from the curves written
+    # here, leaving any animation that came with the input untouched
+    reduce_keyframes(stage, attributes=list(keyframes))
     
     # Save the animated USD file
     stage.Export(output_file)
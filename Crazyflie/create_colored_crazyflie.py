@@ -1,18 +1,46 @@
 #!/usr/bin/env python3
-from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, UsdShade, UsdLux, Vt
+from pxr import Usd, UsdGeom, Sdf, Gf, UsdShade, UsdLux, Vt
+import argparse
 import math
 import os
+import sys
 
-def create_colored_crazyflie():
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.build_cache import open_build_cache
+from robot_usd.keyframe_reduction import reduce_keyframes
+from robot_usd.keyframes import frame_times, linear_ramp, write_keyframes
+from robot_usd.layer_split import save_split_layers
+from robot_usd.lod import write_lod_package
+from robot_usd.looping import common_period, loop_frames, mark_loopable, validate_loop_seam
+from robot_usd.mesh_copy import copy_prim_subtrees, rebind_materials
+from robot_usd.mesh_dedupe import dedupe_meshes
+from robot_usd.mesh_optimization import author_normals, mesh_optimization_enabled, optimize_meshes
+from robot_usd.output_format import add_output_format_argument, layer_path, resolve_output_format
+from robot_usd.profiling import lap
+from robot_usd.stage_loading import open_stage
+from robot_usd.usdz_packaging import package_usdz
+
+def create_colored_crazyflie(output_format=None, use_cache=True, loop=False, masked=True, lod_budgets=None, optimize=False):
     # Input and output files
     input_file = "cf2x.usd"
-    output_file = "cf2x_colored_animated.usda"
+    output_file = layer_path("cf2x_colored_animated.usda", output_format)
     usdz_file = "cf2x_colored_animated.usdz"
     
+    # Reuse a previous build when the input, parameters and script are unchanged
+    # (the cache only stores the main USDZ, so LOD builds always run)
+    cache = open_build_cache(use_cache and not lod_budgets)
+    if cache:
+        cache_key = cache.key(__file__, usdz_file, [input_file], {"output_format": resolve_output_format(output_format), "loop": loop, "optimize": mesh_optimization_enabled(optimize)})
+        if cache.fetch(cache_key, usdz_file):
+            return True
+    
     print(f"Creating colored animated USDZ from original USD file: {input_file}")
     
-    # Open the original USD file
-    source_stage = Usd.Stage.Open(input_file)
+    # Open the original USD file, composing only the subtrees that are copied
+    # (the body visuals and propellers), unless masked loading is turned off
+    source_paths = ["/crazyflie/body/body_visual"] + [f"/crazyflie/m{i}_prop" for i in range(1, 5)]
+    source_stage = open_stage(input_file, source_paths, masked)
     if not source_stage:
         print(f"❌ Error: Could not open {input_file}")
         return False
@@ -23,9 +51,12 @@ def create_colored_crazyflie():
     # Set timeCodesPerSecond for proper playback
     stage.SetTimeCodesPerSecond(24)
     
-    # Set frame range - 3 seconds at 24 fps
+    # Set frame range - 3 seconds at 24 fps, or a single propeller turn
+    # (360 degrees at 30 degrees per frame) when the clip is played as a loop
+    frames = loop_frames(common_period([360 / 30])) if loop else frame_times(1, 72)
     stage.SetStartTimeCode(1)
-    stage.SetEndTimeCode(72)
+    stage.SetEndTimeCode(frames[-1])
+    lap("open")
     
     # Copy the root prim
     source_root = source_stage.GetPrimAtPath("/crazyflie")
@@ -68,7 +99,9 @@ def create_colored_crazyflie():
         # Store material for later use
         materials[part_name] = material
     
-    # Copy the body and its children
+    # Collect the body visual components to copy
+    copy_paths = {}
+    bindings = {}
     body_path = "/crazyflie/body"
     source_body = source_stage.GetPrimAtPath(body_path)
     if source_body:
@@ -88,75 +121,19 @@ def create_colored_crazyflie():
                 
                 # Copy the mesh or geometry
                 if visual_child.IsA(UsdGeom.Mesh):
-                    # Create a new mesh
-                    mesh = UsdGeom.Mesh.Define(stage, child_path)
-                    
-                    # Copy points
-                    source_mesh = UsdGeom.Mesh(visual_child)
-                    if source_mesh.GetPointsAttr().Get():
-                        mesh.CreatePointsAttr().Set(source_mesh.GetPointsAttr().Get())
-                    
-                    # Copy face vertex counts
-                    if source_mesh.GetFaceVertexCountsAttr().Get():
-                        mesh.CreateFaceVertexCountsAttr().Set(source_mesh.GetFaceVertexCountsAttr().Get())
-                    
-                    # Copy face vertex indices
-                    if source_mesh.GetFaceVertexIndicesAttr().Get():
-                        mesh.CreateFaceVertexIndicesAttr().Set(source_mesh.GetFaceVertexIndicesAttr().Get())
-                    
-                    # Copy normals if they exist
-                    if source_mesh.GetNormalsAttr().Get():
-                        mesh.CreateNormalsAttr().Set(source_mesh.GetNormalsAttr().Get())
-                    
-                    # Copy UV coordinates if they exist
-                    primvars = UsdGeom.PrimvarsAPI(source_mesh)
-                    st_primvar = primvars.GetPrimvar("st")
-                    if st_primvar:
-                        mesh_primvars = UsdGeom.PrimvarsAPI(mesh)
-                        mesh_primvars.CreatePrimvar("st", st_primvar.GetTypeName(), st_primvar.GetInterpolation()).Set(st_primvar.Get())
+                    copy_paths[child_path] = child_path
                     
                     # Apply material based on part name
                     if child_name in materials:
-                        UsdShade.MaterialBindingAPI(mesh).Bind(materials[child_name])
+                        bindings[child_path] = materials[child_name]
                     elif child_name == "cf_body_001" or child_name == "Cylinder":
-                        UsdShade.MaterialBindingAPI(mesh).Bind(materials["body"])
-                    
-                    print(f"Copied mesh: {child_path}")
+                        bindings[child_path] = materials["body"]
                 elif visual_child.IsA(UsdGeom.Xform):
-                    # Create a new xform
-                    xform = UsdGeom.Xform.Define(stage, child_path)
-                    
-                    # Copy all children recursively
+                    # Copy the xform together with all of its children
+                    copy_paths[child_path] = child_path
                     for xform_child in visual_child.GetChildren():
                         if xform_child.IsA(UsdGeom.Mesh):
-                            xform_child_path = str(xform_child.GetPath())
-                            xform_mesh = UsdGeom.Mesh.Define(stage, xform_child_path)
-                            
-                            # Copy mesh data
-                            source_xform_mesh = UsdGeom.Mesh(xform_child)
-                            if source_xform_mesh.GetPointsAttr().Get():
-                                xform_mesh.CreatePointsAttr().Set(source_xform_mesh.GetPointsAttr().Get())
-                            
-                            if source_xform_mesh.GetFaceVertexCountsAttr().Get():
-                                xform_mesh.CreateFaceVertexCountsAttr().Set(source_xform_mesh.GetFaceVertexCountsAttr().Get())
-                            
-                            if source_xform_mesh.GetFaceVertexIndicesAttr().Get():
-                                xform_mesh.CreateFaceVertexIndicesAttr().Set(source_xform_mesh.GetFaceVertexIndicesAttr().Get())
-                            
-                            if source_xform_mesh.GetNormalsAttr().Get():
-                                xform_mesh.CreateNormalsAttr().Set(source_xform_mesh.GetNormalsAttr().Get())
-                            
-                            # Copy UV coordinates if they exist
-                            primvars = UsdGeom.PrimvarsAPI(source_xform_mesh)
-                            st_primvar = primvars.GetPrimvar("st")
-                            if st_primvar:
-                                mesh_primvars = UsdGeom.PrimvarsAPI(xform_mesh)
-                                mesh_primvars.CreatePrimvar("st", st_primvar.GetTypeName(), st_primvar.GetInterpolation()).Set(st_primvar.Get())
-                            
-                            # Apply material
-                            UsdShade.MaterialBindingAPI(xform_mesh).Bind(materials["body"])
-                            
-                            print(f"Copied nested mesh: {xform_child_path}")
+                            bindings[str(xform_child.GetPath())] = materials["body"]
                 else:
                     print(f"Skipping unsupported prim type: {child_path}")
     
@@ -176,6 +153,8 @@ def create_colored_crazyflie():
         "/crazyflie/m4_prop"
     ]
     
+    keyframes = {}
+    
     for i, prop_path in enumerate(propeller_paths):
         source_prop = source_stage.GetPrimAtPath(prop_path)
         if source_prop:
@@ -192,75 +171,25 @@ def create_colored_crazyflie():
                 child_path = str(prop_child.GetPath())
                 
                 if prop_child.IsA(UsdGeom.Mesh):
-                    # Create a new mesh
-                    mesh = UsdGeom.Mesh.Define(stage, child_path)
-                    
-                    # Copy mesh data
-                    source_mesh = UsdGeom.Mesh(prop_child)
-                    if source_mesh.GetPointsAttr().Get():
-                        mesh.CreatePointsAttr().Set(source_mesh.GetPointsAttr().Get())
-                    
-                    if source_mesh.GetFaceVertexCountsAttr().Get():
-                        mesh.CreateFaceVertexCountsAttr().Set(source_mesh.GetFaceVertexCountsAttr().Get())
-                    
-                    if source_mesh.GetFaceVertexIndicesAttr().Get():
-                        mesh.CreateFaceVertexIndicesAttr().Set(source_mesh.GetFaceVertexIndicesAttr().Get())
-                    
-                    if source_mesh.GetNormalsAttr().Get():
-                        mesh.CreateNormalsAttr().Set(source_mesh.GetNormalsAttr().Get())
-                    
-                    # Copy UV coordinates if they exist
-                    primvars = UsdGeom.PrimvarsAPI(source_mesh)
-                    st_primvar = primvars.GetPrimvar("st")
-                    if st_primvar:
-                        mesh_primvars = UsdGeom.PrimvarsAPI(mesh)
-                        mesh_primvars.CreatePrimvar("st", st_primvar.GetTypeName(), st_primvar.GetInterpolation()).Set(st_primvar.Get())
+                    copy_paths[child_path] = child_path
                     
                     # Apply material based on propeller type
                     if "ccw" in child_path:
-                        UsdShade.MaterialBindingAPI(mesh).Bind(materials["propeller_ccw"])
+                        bindings[child_path] = materials["propeller_ccw"]
                     else:
-                        UsdShade.MaterialBindingAPI(mesh).Bind(materials["propeller_cw"])
-                    
-                    print(f"Copied propeller mesh: {child_path}")
+                        bindings[child_path] = materials["propeller_cw"]
                 elif prop_child.IsA(UsdGeom.Xform):
-                    # Create a new xform
-                    xform = UsdGeom.Xform.Define(stage, child_path)
-                    
-                    # Copy all children recursively
+                    # Copy the xform together with all of its children
+                    copy_paths[child_path] = child_path
                     for xform_child in prop_child.GetChildren():
                         if xform_child.IsA(UsdGeom.Mesh):
                             xform_child_path = str(xform_child.GetPath())
-                            xform_mesh = UsdGeom.Mesh.Define(stage, xform_child_path)
-                            
-                            # Copy mesh data
-                            source_xform_mesh = UsdGeom.Mesh(xform_child)
-                            if source_xform_mesh.GetPointsAttr().Get():
-                                xform_mesh.CreatePointsAttr().Set(source_xform_mesh.GetPointsAttr().Get())
-                            
-                            if source_xform_mesh.GetFaceVertexCountsAttr().Get():
-                                xform_mesh.CreateFaceVertexCountsAttr().Set(source_xform_mesh.GetFaceVertexCountsAttr().Get())
-                            
-                            if source_xform_mesh.GetFaceVertexIndicesAttr().Get():
-                                xform_mesh.CreateFaceVertexIndicesAttr().Set(source_xform_mesh.GetFaceVertexIndicesAttr().Get())
-                            
-                            if source_xform_mesh.GetNormalsAttr().Get():
-                                xform_mesh.CreateNormalsAttr().Set(source_xform_mesh.GetNormalsAttr().Get())
-                            
-                            # Copy UV coordinates if they exist
-                            primvars = UsdGeom.PrimvarsAPI(source_xform_mesh)
-                            st_primvar = primvars.GetPrimvar("st")
-                            if st_primvar:
-                                mesh_primvars = UsdGeom.PrimvarsAPI(xform_mesh)
-                                mesh_primvars.CreatePrimvar("st", st_primvar.GetTypeName(), st_primvar.GetInterpolation()).Set(st_primvar.Get())
                             
                             # Apply material based on propeller type
                             if "ccw" in xform_child_path:
-                                UsdShade.MaterialBindingAPI(xform_mesh).Bind(materials["propeller_ccw"])
+                                bindings[xform_child_path] = materials["propeller_ccw"]
                             else:
-                                UsdShade.MaterialBindingAPI(xform_mesh).Bind(materials["propeller_cw"])
-                            
-                            print(f"Copied nested propeller mesh: {xform_child_path}")
+                                bindings[xform_child_path] = materials["propeller_cw"]
             
             # Add rotation animation to propeller
             # Alternate direction: odd-numbered props CCW, even-numbered CW
@@ -268,10 +197,26 @@ def create_colored_crazyflie():
             rotate_op = prop_xform.AddRotateZOp(UsdGeom.XformOp.PrecisionDouble, "rotateZ")
             
             # Create a continuous rotation animation
-            for frame in range(1, 73):
-                time = frame
-                angle = direction * (720 / 24) * frame  # 720 degrees per second (2 rotations)
-                rotate_op.Set(angle, time)
+            keyframes[rotate_op] = (frames, linear_ramp(frames, direction * (720 / 24)))  # 720 degrees per second (2 rotations)
+    
+    lap("traverse")
+    
+    # Copy all collected meshes in one spec-level pass, then bind materials
+    for copied_path in copy_prim_subtrees(source_stage, stage, copy_paths):
+        print(f"Copied mesh: {copied_path}")
+    rebind_materials(stage, bindings, copy_paths.values())
+    
+    # Weld the copied meshes and reorder them for the GPU vertex cache, and
+    # author any missing normals as indexed primvars, if enabled
+    if mesh_optimization_enabled(optimize):
+        optimize_meshes(stage)
+        author_normals(stage, indexed=True)
+    
+    # Store each repeated mesh shape (e.g. the cw/ccw propellers) once
+    dedupe_meshes(stage)
+    
+    # Write all propeller samples in one pass
+    write_keyframes(stage, keyframes)
     
     # Add a light to ensure visibility
     light = UsdLux.DistantLight.Define(stage, "/Light")
@@ -279,21 +224,48 @@ def create_colored_crazyflie():
     light.CreateAngleAttr(0.53)
     light.CreateColorAttr(Gf.Vec3f(1.0, 1.0, 1.0))
     
-    # Save the animated USD file
-    stage.Export(output_file)
+    if loop:
+        # Mark the single turn as loopable and make sure it repeats without a hitch
+        mark_loopable(stage, frames[0], frames[-1])
+        if validate_loop_seam(stage):
+            print("❌ Error: Propeller animation does not loop cleanly")
+            return False
+    
+    # Drop samples that linear interpolation reproduces
+    reduce_keyframes(stage)
+    lap("author")
+    
+    # Save the geometry and the animation as separate layers under a thin
+    # root layer; saving layers rather than exporting the flattened stage
+    # keeps the references to the shared mesh prototypes
+    save_split_layers(stage)
+    lap("export")
     print(f"✅ Colored animated USD saved to {output_file}")
     
     # Convert to USDZ
     try:
-        UsdUtils.CreateNewUsdzPackage(
-            Sdf.AssetPath(output_file),
-            usdz_file
-        )
+        package_usdz(output_file, usdz_file)
+        lap("package")
         print(f"✅ USDZ package created at {usdz_file}")
-        return True
+        if cache:
+            cache.store(cache_key, usdz_file)
     except Exception as e:
         print(f"❌ Error creating USDZ package: {e}")
         return False
+    
+    # Write a decimated copy of the real geometry for each triangle budget
+    for budget in lod_budgets or []:
+        lod_file = layer_path(f"cf2x_colored_animated_lod{budget}.usda", output_format)
+        if not write_lod_package(output_file, budget, lod_file, f"cf2x_colored_animated_lod{budget}.usdz"):
+            return False
+    return True
 
 if __name__ == "__main__":
-    create_colored_crazyflie()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create a colored animated Crazyflie USDZ")
+    parser.add_argument("--loop", action="store_true", help="Write one propeller turn marked as loopable instead of 3 seconds")
+    parser.add_argument("--lod", type=int, nargs="+", metavar="TRIANGLES", help="Also write a decimated USDZ for each triangle budget")
+    parser.add_argument("--optimize", action="store_true", help="Weld vertices, reorder indices for the GPU vertex cache and index normals")
+    add_output_format_argument(parser)
+    
+    args = parser.parse_args()
+    create_colored_crazyflie(args.output_format, loop=args.loop, lod_budgets=args.lod, optimize=args.optimize)
\ No newline at end of file
@@ -1,18 +1,40 @@
 #!/usr/bin/env python3
-from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, UsdShade, UsdLux, Vt
-import math
+from pxr import Usd, UsdGeom, Gf, UsdLux, Vt
 import os
+import sys
 
-def create_original_animated_crazyflie():
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.build_cache import open_build_cache
+from robot_usd.keyframe_reduction import reduce_keyframes
+from robot_usd.keyframes import frame_times, linear_ramp, sine_wave, vec3, write_keyframes
+from robot_usd.layer_split import save_split_layers
+from robot_usd.mesh_copy import copy_prim_subtrees, rebind_materials
+from robot_usd.mesh_dedupe import dedupe_meshes
+from robot_usd.mesh_optimization import author_normals, mesh_optimization_enabled, optimize_meshes
+from robot_usd.output_format import layer_path, resolve_output_format
+from robot_usd.stage_loading import open_stage
+from robot_usd.usdz_packaging import package_usdz
+
+def create_original_animated_crazyflie(output_format=None, use_cache=True, masked=True, optimize=False):
     # Input and output files
     input_file = "cf2x.usd"
-    output_file = "cf2x_original_animated.usda"
+    output_file = layer_path("cf2x_original_animated.usda", output_format)
     usdz_file = "cf2x_original_animated.usdz"
     
+    # Reuse a previous build when the input, parameters and script are unchanged
+    cache = open_build_cache(use_cache)
+    if cache:
+        cache_key = cache.key(__file__, usdz_file, [input_file], {"output_format": resolve_output_format(output_format), "optimize": mesh_optimization_enabled(optimize)})
+        if cache.fetch(cache_key, usdz_file):
+            return True
+    
     print(f"Creating animated USDZ from original USD file: {input_file}")
     
-    # Open the original USD file
-    source_stage = Usd.Stage.Open(input_file)
+    # Open the original USD file, composing only the subtrees that are copied
+    # (the body visuals, propellers and materials), unless masked loading is turned off
+    source_paths = ["/crazyflie/body/body_visual"] + [f"/crazyflie/m{i}_prop" for i in range(1, 5)] + ["/crazyflie/Looks"]
+    source_stage = open_stage(input_file, source_paths, masked)
     if not source_stage:
         print(f"❌ Error: Could not open {input_file}")
         return False
@@ -37,7 +59,8 @@ def create_original_animated_crazyflie():
     root = UsdGeom.Xform.Define(stage, "/crazyflie")
     stage.SetDefaultPrim(root.GetPrim())
     
-    # Copy the body and its children
+    # Collect the body visual components to copy
+    copy_paths = {}
     body_path = "/crazyflie/body"
     source_body = source_stage.GetPrimAtPath(body_path)
     if source_body:
@@ -53,67 +76,10 @@ def create_original_animated_crazyflie():
             # Copy all visual components
             for visual_child in source_body_visual.GetChildren():
                 child_path = str(visual_child.GetPath())
-                child_name = visual_child.GetName()
                 
-                # Copy the mesh or geometry
-                if visual_child.IsA(UsdGeom.Mesh):
-                    # Create a new mesh
-                    mesh = UsdGeom.Mesh.Define(stage, child_path)
-                    
-                    # Copy points
-                    source_mesh = UsdGeom.Mesh(visual_child)
-                    if source_mesh.GetPointsAttr().Get():
-                        mesh.CreatePointsAttr().Set(source_mesh.GetPointsAttr().Get())
-                    
-                    # Copy face vertex counts
-                    if source_mesh.GetFaceVertexCountsAttr().Get():
-                        mesh.CreateFaceVertexCountsAttr().Set(source_mesh.GetFaceVertexCountsAttr().Get())
-                    
-                    # Copy face vertex indices
-                    if source_mesh.GetFaceVertexIndicesAttr().Get():
-                        mesh.CreateFaceVertexIndicesAttr().Set(source_mesh.GetFaceVertexIndicesAttr().Get())
-                    
-                    # Copy normals if they exist
-                    if source_mesh.GetNormalsAttr().Get():
-                        mesh.CreateNormalsAttr().Set(source_mesh.GetNormalsAttr().Get())
-                    
-                    # Copy UV coordinates if they exist
-                    primvars = UsdGeom.PrimvarsAPI(source_mesh)
-                    st_primvar = primvars.GetPrimvar("st")
-                    if st_primvar:
-                        mesh_primvars = UsdGeom.PrimvarsAPI(mesh)
-                        mesh_primvars.CreatePrimvar("st", st_primvar.GetTypeName(), st_primvar.GetInterpolation()).Set(st_primvar.Get())
-                    
-                    print(f"Copied mesh: {child_path}")
-                elif visual_child.IsA(UsdGeom.Xform):
-                    # Create a new xform
-                    xform = UsdGeom.Xform.Define(stage, child_path)
-                    
-                    # Copy all children recursively
-                    for xform_child in visual_child.GetChildren():
-                        if xform_child.IsA(UsdGeom.Mesh):
-                            xform_child_path = str(xform_child.GetPath())
-                            xform_mesh = UsdGeom.Mesh.Define(stage, xform_child_path)
-                            
-                            # Copy mesh data
-                            source_xform_mesh = UsdGeom.Mesh(xform_child)
-                            if source_xform_mesh.GetPointsAttr().Get():
-                                xform_mesh.CreatePointsAttr().Set(source_xform_mesh.GetPointsAttr().Get())
-                            
-                            if source_xform_mesh.GetFaceVertexCountsAttr().Get():
-                                xform_mesh.CreateFaceVertexCountsAttr().Set(source_xform_mesh.GetFaceVertexCountsAttr().Get())
-                            
-                            if source_xform_mesh.GetFaceVertexIndicesAttr().Get():
-                                xform_mesh.CreateFaceVertexIndicesAttr().Set(source_xform_mesh.GetFaceVertexIndicesAttr().Get())
-                            
-                            if source_xform_mesh.GetNormalsAttr().Get():
-                                xform_mesh.CreateNormalsAttr().Set(source_xform_mesh.GetNormalsAttr().Get())
-                            
-                            if source_xform_mesh.GetPrimvar("st"):
-                                source_uvs = source_xform_mesh.GetPrimvar("st")
-                                xform_mesh.CreatePrimvar("st", source_uvs.GetTypeName(), source_uvs.GetInterpolation()).Set(source_uvs.Get())
-                            
-                            print(f"Copied nested mesh: {xform_child_path}")
+                # Copy the mesh or geometry, xforms together with all of their children
+                if visual_child.IsA(UsdGeom.Mesh) or visual_child.IsA(UsdGeom.Xform):
+                    copy_paths[child_path] = child_path
                 else:
                     print(f"Skipping unsupported prim type: {child_path}")
     
@@ -125,6 +91,9 @@ def create_original_animated_crazyflie():
         "/crazyflie/m4_prop"
     ]
     
+    frames = frame_times(1, 72)
+    keyframes = {}
+    
     for i, prop_path in enumerate(propeller_paths):
         source_prop = source_stage.GetPrimAtPath(prop_path)
         if source_prop:
@@ -132,65 +101,11 @@ def create_original_animated_crazyflie():
             prop = UsdGeom.Xform.Define(stage, prop_path)
             prop_xform = UsdGeom.Xformable(prop.GetPrim())
             
-            # Get the original transform
-            source_prop_xform = UsdGeom.Xformable(source_prop)
-            
             # Copy all propeller children (the actual mesh)
             for prop_child in source_prop.GetChildren():
-                child_path = str(prop_child.GetPath())
-                
-                if prop_child.IsA(UsdGeom.Mesh):
-                    # Create a new mesh
-                    mesh = UsdGeom.Mesh.Define(stage, child_path)
-                    
-                    # Copy mesh data
-                    source_mesh = UsdGeom.Mesh(prop_child)
-                    if source_mesh.GetPointsAttr().Get():
-                        mesh.CreatePointsAttr().Set(source_mesh.GetPointsAttr().Get())
-                    
-                    if source_mesh.GetFaceVertexCountsAttr().Get():
-                        mesh.CreateFaceVertexCountsAttr().Set(source_mesh.GetFaceVertexCountsAttr().Get())
-                    
-                    if source_mesh.GetFaceVertexIndicesAttr().Get():
-                        mesh.CreateFaceVertexIndicesAttr().Set(source_mesh.GetFaceVertexIndicesAttr().Get())
-                    
-                    if source_mesh.GetNormalsAttr().Get():
-                        mesh.CreateNormalsAttr().Set(source_mesh.GetNormalsAttr().Get())
-                    
-                    if source_mesh.GetPrimvar("st"):
-                        source_uvs = source_mesh.GetPrimvar("st")
-                        mesh.CreatePrimvar("st", source_uvs.GetTypeName(), source_uvs.GetInterpolation()).Set(source_uvs.Get())
-                    
-                    print(f"Copied propeller mesh: {child_path}")
-                elif prop_child.IsA(UsdGeom.Xform):
-                    # Create a new xform
-                    xform = UsdGeom.Xform.Define(stage, child_path)
-                    
-                    # Copy all children recursively
-                    for xform_child in prop_child.GetChildren():
-                        if xform_child.IsA(UsdGeom.Mesh):
-                            xform_child_path = str(xform_child.GetPath())
-                            xform_mesh = UsdGeom.Mesh.Define(stage, xform_child_path)
-                            
-                            # Copy mesh data
-                            source_xform_mesh = UsdGeom.Mesh(xform_child)
-                            if source_xform_mesh.GetPointsAttr().Get():
-                                xform_mesh.CreatePointsAttr().Set(source_xform_mesh.GetPointsAttr().Get())
-                            
-                            if source_xform_mesh.GetFaceVertexCountsAttr().Get():
-                                xform_mesh.CreateFaceVertexCountsAttr().Set(source_xform_mesh.GetFaceVertexCountsAttr().Get())
-                            
-                            if source_xform_mesh.GetFaceVertexIndicesAttr().Get():
-                                xform_mesh.CreateFaceVertexIndicesAttr().Set(source_xform_mesh.GetFaceVertexIndicesAttr().Get())
-                            
-                            if source_xform_mesh.GetNormalsAttr().Get():
-                                xform_mesh.CreateNormalsAttr().Set(source_xform_mesh.GetNormalsAttr().Get())
-                            
-                            if source_xform_mesh.GetPrimvar("st"):
-                                source_uvs = source_xform_mesh.GetPrimvar("st")
-                                xform_mesh.CreatePrimvar("st", source_uvs.GetTypeName(), source_uvs.GetInterpolation()).Set(source_uvs.Get())
-                            
-                            print(f"Copied nested propeller mesh: {xform_child_path}")
+                if prop_child.IsA(UsdGeom.Mesh) or prop_child.IsA(UsdGeom.Xform):
+                    child_path = str(prop_child.GetPath())
+                    copy_paths[child_path] = child_path
             
             # Add rotation animation to propeller
             # Alternate direction: odd-numbered props CCW, even-numbered CW
@@ -198,53 +113,38 @@ def create_original_animated_crazyflie():
             rotate_op = prop_xform.AddRotateYOp(UsdGeom.XformOp.PrecisionDouble, "rotateY")
             
             # Create a continuous rotation animation
-            for frame in range(1, 73):
-                time = frame
-                angle = direction * (720 / 24) * frame  # 720 degrees per second (2 rotations)
-                rotate_op.Set(angle, time)
+            keyframes[rotate_op] = (frames, linear_ramp(frames, direction * (720 / 24)))  # 720 degrees per second (2 rotations)
     
     # Add a subtle hovering motion to the entire drone
     hover_op = root.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
     
     # Create a subtle up/down hovering motion
-    for frame in range(1, 73):
-        time = frame
-        height = 0.05 * math.sin(2 * math.pi * frame / 48)  # Up/down motion
-        hover_op.Set(Gf.Vec3d(0, height, 0), time)
+    height = sine_wave(frames, 0.05, 48)  # Up/down motion
+    keyframes[hover_op] = (frames, vec3(y=height))
     
-    # Copy materials
+    # Copy materials, shaders included, so the copied meshes keep their bindings
     source_looks = source_stage.GetPrimAtPath("/crazyflie/Looks")
     if source_looks:
-        # Create Looks in the new stage
-        looks = UsdGeom.Xform.Define(stage, "/crazyflie/Looks")
-        
-        # Copy all materials
-        for material_prim in source_looks.GetChildren():
-            material_path = str(material_prim.GetPath())
-            
-            # Create material
-            material = UsdShade.Material.Define(stage, material_path)
-            
-            # Copy shader if it exists
-            shader_path = f"{material_path}/Shader"
-            source_shader = source_stage.GetPrimAtPath(shader_path)
-            if source_shader:
-                shader = UsdShade.Shader.Define(stage, shader_path)
-                
-                # Copy shader attributes
-                source_shader_prim = UsdShade.Shader(source_shader)
-                if source_shader_prim.GetIdAttr().Get():
-                    shader.CreateIdAttr(source_shader_prim.GetIdAttr().Get())
-                
-                # Copy inputs
-                for input_name in ["diffuseColor", "metallic", "roughness", "opacity"]:
-                    source_input = source_shader_prim.GetInput(input_name)
-                    if source_input and source_input.Get():
-                        shader.CreateInput(input_name, source_input.GetTypeName()).Set(source_input.Get())
-                
-                print(f"Copied shader: {shader_path}")
-            
-            print(f"Copied material: {material_path}")
+        copy_paths["/crazyflie/Looks"] = "/crazyflie/Looks"
+    
+    # Copy everything collected in one spec-level pass
+    for copied_path in copy_prim_subtrees(source_stage, stage, copy_paths):
+        print(f"Copied: {copied_path}")
+    
+    # Drop any bindings to materials that were not copied
+    rebind_materials(stage, {}, copy_paths.values())
+    
+    # Weld the copied meshes and reorder them for the GPU vertex cache, and
+    # author any missing normals as indexed primvars, if enabled
+    if mesh_optimization_enabled(optimize):
+        optimize_meshes(stage)
+        author_normals(stage, indexed=True)
+    
+    # Store each repeated mesh shape (e.g. the cw/ccw propellers) once
+    dedupe_meshes(stage)
+    
+    # Write all propeller and hover samples in one pass
+    write_keyframes(stage, keyframes)
     
     # Add a light to ensure visibility
     light = UsdLux.DistantLight.Define(stage, "/Light")
@@ -252,17 +152,21 @@ def create_original_animated_crazyflie():
     light.CreateAngleAttr(0.53)
     light.CreateColorAttr(Gf.Vec3f(1.0, 1.0, 1.0))
     
-    # Save the animated USD file
-    stage.Export(output_file)
+    # Drop samples that linear interpolation reproduces
+    reduce_keyframes(stage)
+    
+    # Save the geometry and the animation as separate layers under a thin
+    # root layer; saving layers rather than exporting the flattened stage
+    # keeps the references to the shared mesh prototypes
+    save_split_layers(stage)
     print(f"✅ Original animated USD saved to {output_file}")
     
     # Convert to USDZ
     try:
-        UsdUtils.CreateNewUsdzPackage(
-            Sdf.AssetPath(output_file),
-            usdz_file
-        )
+        package_usdz(output_file, usdz_file)
         print(f"✅ USDZ package created at {usdz_file}")
+        if cache:
+            cache.store(cache_key, usdz_file)
         return True
     except Exception as e:
         print(f"❌ Error creating USDZ package: {e}")
@@ -1,18 +1,41 @@
 #!/usr/bin/env python3
-from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, UsdShade, UsdLux, Vt, UsdSkel
+from pxr import Usd, UsdGeom, Sdf, Gf, UsdShade, UsdLux, Vt, UsdSkel
 import math
 import os
+import sys
 
-def create_scenekit_compatible_crazyflie():
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.build_cache import open_build_cache
+from robot_usd.keyframe_reduction import reduce_keyframes
+from robot_usd.keyframes import frame_times, linear_ramp, write_keyframes
+from robot_usd.layer_split import save_split_layers
+from robot_usd.mesh_copy import copy_prim_subtrees, rebind_materials
+from robot_usd.mesh_dedupe import dedupe_meshes
+from robot_usd.mesh_optimization import author_normals, mesh_optimization_enabled, optimize_meshes
+from robot_usd.output_format import layer_path, resolve_output_format
+from robot_usd.stage_loading import open_stage
+from robot_usd.usdz_packaging import package_usdz
+
+def create_scenekit_compatible_crazyflie(output_format=None, use_cache=True, masked=True, optimize=False):
     # Input and output files
     input_file = "cf2x.usd"
-    output_file = "cf2x_scenekit_animated.usda"
+    output_file = layer_path("cf2x_scenekit_animated.usda", output_format)
     usdz_file = "cf2x_scenekit_animated.usdz"
     
+    # Reuse a previous build when the input, parameters and script are unchanged
+    cache = open_build_cache(use_cache)
+    if cache:
+        cache_key = cache.key(__file__, usdz_file, [input_file], {"output_format": resolve_output_format(output_format), "optimize": mesh_optimization_enabled(optimize)})
+        if cache.fetch(cache_key, usdz_file):
+            return True
+    
     print(f"Creating SceneKit-compatible animated USDZ from original USD file: {input_file}")
     
-    # Open the original USD file
-    source_stage = Usd.Stage.Open(input_file)
+    # Open the original USD file, composing only the subtrees that are copied
+    # (the body visuals and propellers), unless masked loading is turned off
+    source_paths = ["/crazyflie/body/body_visual"] + [f"/crazyflie/m{i}_prop" for i in range(1, 5)]
+    source_stage = open_stage(input_file, source_paths, masked)
     if not source_stage:
         print(f"❌ Error: Could not open {input_file}")
         return False
@@ -60,7 +83,9 @@ def create_scenekit_compatible_crazyflie():
         # Store material for later use
         materials[part_name] = material
     
-    # Copy the body and its children
+    # Collect the body visual components to copy
+    copy_paths = {}
+    bindings = {}
     body_path = "/crazyflie/body"
     source_body = source_stage.GetPrimAtPath("/crazyflie/body")
     if source_body:
@@ -81,40 +106,13 @@ def create_scenekit_compatible_crazyflie():
                 
                 # Copy the mesh or geometry
                 if visual_child.IsA(UsdGeom.Mesh):
-                    # Create a new mesh
-                    mesh = UsdGeom.Mesh.Define(stage, new_child_path)
-                    
-                    # Copy points
-                    source_mesh = UsdGeom.Mesh(visual_child)
-                    if source_mesh.GetPointsAttr().Get():
-                        mesh.CreatePointsAttr().Set(source_mesh.GetPointsAttr().Get())
-                    
-                    # Copy face vertex counts
-                    if source_mesh.GetFaceVertexCountsAttr().Get():
-                        mesh.CreateFaceVertexCountsAttr().Set(source_mesh.GetFaceVertexCountsAttr().Get())
-                    
-                    # Copy face vertex indices
-                    if source_mesh.GetFaceVertexIndicesAttr().Get():
-                        mesh.CreateFaceVertexIndicesAttr().Set(source_mesh.GetFaceVertexIndicesAttr().Get())
-                    
-                    # Copy normals if they exist
-                    if source_mesh.GetNormalsAttr().Get():
-                        mesh.CreateNormalsAttr().Set(source_mesh.GetNormalsAttr().Get())
-                    
-                    # Copy UV coordinates if they exist
-                    primvars = UsdGeom.PrimvarsAPI(source_mesh)
-                    st_primvar = primvars.GetPrimvar("st")
-                    if st_primvar:
-                        mesh_primvars = UsdGeom.PrimvarsAPI(mesh)
-                        mesh_primvars.CreatePrimvar("st", st_primvar.GetTypeName(), st_primvar.GetInterpolation()).Set(st_primvar.Get())
+                    copy_paths[child_path] = new_child_path
                     
                     # Apply material based on part name
                     if child_name in materials:
-                        UsdShade.MaterialBindingAPI(mesh).Bind(materials[child_name])
+                        bindings[new_child_path] = materials[child_name]
                     elif child_name == "cf_body_001" or child_name == "Cylinder":
-                        UsdShade.MaterialBindingAPI(mesh).Bind(materials["body"])
-                    
-                    print(f"Copied mesh: {new_child_path}")
+                        bindings[new_child_path] = materials["body"]
     
     # Define propeller positions (from the analysis)
     propeller_positions = [
@@ -128,6 +126,9 @@ def create_scenekit_compatible_crazyflie():
     propeller_names = ["m1_prop", "m2_prop", "m3_prop", "m4_prop"]
     propeller_types = ["ccw", "cw", "ccw", "cw"]  # Alternating CCW and CW
     
+    frames = frame_times(0, 60)
+    keyframes = {}
+    
     for i, (prop_name, prop_type, position) in enumerate(zip(propeller_names, propeller_types, propeller_positions)):
         # Create propeller group
         prop_path = f"/crazyflie/{prop_name}"
@@ -138,9 +139,6 @@ def create_scenekit_compatible_crazyflie():
         translate_op = prop_xform.AddTranslateOp()
         translate_op.Set(position)
         
-        # Create propeller mesh
-        mesh_path = f"{prop_path}/{prop_type}_prop"
-        
         # Find source propeller mesh
         source_prop_mesh = None
         source_prop = source_stage.GetPrimAtPath(f"/crazyflie/{prop_name}")
@@ -151,35 +149,6 @@ def create_scenekit_compatible_crazyflie():
                     break
         
         if source_prop_mesh:
-            # Create propeller mesh
-            mesh = UsdGeom.Mesh.Define(stage, mesh_path)
-            
-            # Copy mesh data
-            if source_prop_mesh.GetPointsAttr().Get():
-                mesh.CreatePointsAttr().Set(source_prop_mesh.GetPointsAttr().Get())
-            
-            if source_prop_mesh.GetFaceVertexCountsAttr().Get():
-                mesh.CreateFaceVertexCountsAttr().Set(source_prop_mesh.GetFaceVertexCountsAttr().Get())
-            
-            if source_prop_mesh.GetFaceVertexIndicesAttr().Get():
-                mesh.CreateFaceVertexIndicesAttr().Set(source_prop_mesh.GetFaceVertexIndicesAttr().Get())
-            
-            if source_prop_mesh.GetNormalsAttr().Get():
-                mesh.CreateNormalsAttr().Set(source_prop_mesh.GetNormalsAttr().Get())
-            
-            # Copy UV coordinates if they exist
-            primvars = UsdGeom.PrimvarsAPI(source_prop_mesh)
-            st_primvar = primvars.GetPrimvar("st")
-            if st_primvar:
-                mesh_primvars = UsdGeom.PrimvarsAPI(mesh)
-                mesh_primvars.CreatePrimvar("st", st_primvar.GetTypeName(), st_primvar.GetInterpolation()).Set(st_primvar.Get())
-            
-            # Apply material based on propeller type
-            material_key = f"propeller_{prop_type}"
-            UsdShade.MaterialBindingAPI(mesh).Bind(materials[material_key])
-            
-            print(f"Created propeller mesh: {mesh_path}")
-            
             # Create a separate transform for animation
             prop_anim = UsdGeom.Xform.Define(stage, f"{prop_path}/anim")
             prop_anim_xform = UsdGeom.Xformable(prop_anim.GetPrim())
@@ -189,65 +158,56 @@ def create_scenekit_compatible_crazyflie():
             rotate_op = prop_anim_xform.AddRotateZOp()
             
             # Create animation
-            for frame in range(0, 61):
-                time = frame
-                angle = direction * 6.0 * frame  # 6 degrees per frame (144 degrees per second)
-                rotate_op.Set(angle, time)
+            keyframes[rotate_op] = (frames, linear_ramp(frames, direction * 6.0))  # 6 degrees per frame (144 degrees per second)
             
-            # Instead of reparenting, we'll create the mesh directly under the animation transform
-            # Delete the original mesh
-            stage.RemovePrim(mesh_path)
-            
-            # Create the mesh under the animation transform
+            # Copy the mesh directly under the animation transform
             anim_mesh_path = f"{prop_path}/anim/{prop_type}_prop"
-            anim_mesh = UsdGeom.Mesh.Define(stage, anim_mesh_path)
-            
-            # Copy mesh data
-            if source_prop_mesh.GetPointsAttr().Get():
-                anim_mesh.CreatePointsAttr().Set(source_prop_mesh.GetPointsAttr().Get())
-            
-            if source_prop_mesh.GetFaceVertexCountsAttr().Get():
-                anim_mesh.CreateFaceVertexCountsAttr().Set(source_prop_mesh.GetFaceVertexCountsAttr().Get())
-            
-            if source_prop_mesh.GetFaceVertexIndicesAttr().Get():
-                anim_mesh.CreateFaceVertexIndicesAttr().Set(source_prop_mesh.GetFaceVertexIndicesAttr().Get())
-            
-            if source_prop_mesh.GetNormalsAttr().Get():
-                anim_mesh.CreateNormalsAttr().Set(source_prop_mesh.GetNormalsAttr().Get())
-            
-            # Copy UV coordinates if they exist
-            primvars = UsdGeom.PrimvarsAPI(source_prop_mesh)
-            st_primvar = primvars.GetPrimvar("st")
-            if st_primvar:
-                mesh_primvars = UsdGeom.PrimvarsAPI(anim_mesh)
-                mesh_primvars.CreatePrimvar("st", st_primvar.GetTypeName(), st_primvar.GetInterpolation()).Set(st_primvar.Get())
+            copy_paths[str(source_prop_mesh.GetPath())] = anim_mesh_path
             
             # Apply material based on propeller type
             material_key = f"propeller_{prop_type}"
-            UsdShade.MaterialBindingAPI(anim_mesh).Bind(materials[material_key])
-            
-            print(f"Created animated propeller mesh: {anim_mesh_path}")
+            bindings[anim_mesh_path] = materials[material_key]
         else:
             print(f"⚠️ Warning: Could not find source propeller mesh for {prop_name}")
     
+    # Copy all collected meshes in one spec-level pass, then bind materials
+    for copied_path in copy_prim_subtrees(source_stage, stage, copy_paths):
+        print(f"Copied mesh: {copied_path}")
+    rebind_materials(stage, bindings, copy_paths.values())
+    
+    # Weld the copied meshes and reorder them for the GPU vertex cache, and
+    # author any missing normals as indexed primvars, if enabled
+    if mesh_optimization_enabled(optimize):
+        optimize_meshes(stage)
+        author_normals(stage, indexed=True)
+    
+    # Store each repeated mesh shape (e.g. the cw/ccw propellers) once
+    dedupe_meshes(stage)
+    
+    # Write all propeller samples in one pass
+    write_keyframes(stage, keyframes)
+    
     # Add a light to ensure visibility
     light = UsdLux.DistantLight.Define(stage, "/Light")
     light.CreateIntensityAttr(500.0)
     light.CreateAngleAttr(0.53)
     light.CreateColorAttr(Gf.Vec3f(1.0, 1.0, 1.0))
     
-    # Save the animated USD file
-    stage.Export(output_file)
+    # Drop samples that linear interpolation reproduces
+    reduce_keyframes(stage)
+    
+    # Save the geometry and the animation as separate layers under a thin
+    # root layer; saving layers rather than exporting the flattened stage
+    # keeps the references to the shared mesh prototypes
+    save_split_layers(stage)
     print(f"✅ SceneKit-compatible animated USD saved to {output_file}")
     
-    # Convert to USDZ with specific flags for SceneKit compatibility
+    # Convert to USDZ, rewriting only the entries that changed
     try:
-        UsdUtils.CreateNewUsdzPackage(
-            Sdf.AssetPath(output_file),
-            usdz_file,
-            # Add any additional args needed for SceneKit compatibility
-        )
+        package_usdz(output_file, usdz_file)
         print(f"✅ USDZ package created at {usdz_file}")
+        if cache:
+            cache.store(cache_key, usdz_file)
         return True
     except Exception as e:
         print(f"❌ Error creating USDZ package: {e}")
@@ -2,12 +2,27 @@
 from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, UsdShade, UsdLux, Vt
 import math
 import os
+import sys
 
-def create_visible_crazyflie():
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.build_cache import open_build_cache
+from robot_usd.keyframe_reduction import reduce_keyframes
+from robot_usd.keyframes import frame_times, linear_ramp, sine_wave, vec3, write_keyframes
+from robot_usd.output_format import layer_path, resolve_output_format
+
+def create_visible_crazyflie(output_format=None, use_cache=True):
     # Output files
-    output_file = "cf2x_visible.usda"
+    output_file = layer_path("cf2x_visible.usda", output_format)
     usdz_file = "cf2x_visible.usdz"
     
+    # Reuse a previous build when the parameters and script are unchanged
+    cache = open_build_cache(use_cache)
+    if cache:
+        cache_key = cache.key(__file__, usdz_file, [], {"output_format": resolve_output_format(output_format)})
+        if cache.fetch(cache_key, usdz_file):
+            return
+    
     # Create a new stage
     stage = Usd.Stage.CreateNew(output_file)
     
@@ -45,6 +60,10 @@ def create_visible_crazyflie():
     battery_xform.AddScaleOp().Set(Gf.Vec3d(1.5, 0.3, 1.0))  # Shape it
     battery_xform.AddTranslateOp().Set(Gf.Vec3d(0, -0.3, 0))  # Position under body
     
+    # Evaluate all animation curves for every frame at once
+    frames = frame_times(1, 72)
+    keyframes = {}
+    
     # Create four motor arms
     arm_positions = [
         (1.5, 0, 1.5),   # Front right
@@ -91,19 +110,17 @@ def create_visible_crazyflie():
         rotate_op = prop_xform.AddRotateYOp(UsdGeom.XformOp.PrecisionDouble, "rotateY")
         
         # Create a continuous rotation animation
-        for frame in range(1, 73):
-            time = frame
-            angle = direction * (720 / 24) * frame  # 720 degrees per second (2 rotations)
-            rotate_op.Set(angle, time)
+        keyframes[rotate_op] = (frames, linear_ramp(frames, direction * (720 / 24)))  # 720 degrees per second (2 rotations)
     
     # Add a subtle hovering motion to the entire drone
     hover_op = root.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
     
     # Create a subtle up/down hovering motion
-    for frame in range(1, 73):
-        time = frame
-        height = 0.2 * math.sin(2 * math.pi * frame / 48)  # Up/down motion
-        hover_op.Set(Gf.Vec3d(0, height, 0), time)
+    height = sine_wave(frames, 0.2, 48)  # Up/down motion
+    keyframes[hover_op] = (frames, vec3(y=height))
+    
+    # Write all propeller and hover samples in one pass
+    write_keyframes(stage, keyframes)
     
     # Define colors for different parts
     colors = {
@@ -166,6 +183,9 @@ def create_visible_crazyflie():
     light.CreateAngleAttr(0.53)
     light.CreateColorAttr(Gf.Vec3f(1.0, 1.0, 1.0))
     
+    # Drop samples that linear interpolation reproduces
+    reduce_keyframes(stage)
+    
     # Save the animated USD file
     stage.Export(output_file)
     print(f"✅ Visible animated USD saved to {output_file}")
@@ -177,6 +197,8 @@ def create_visible_crazyflie():
             usdz_file
         )
         print(f"✅ USDZ package created at {usdz_file}")
+        if cache:
+            cache.store(cache_key, usdz_file)
     except Exception as e:
         print(f"❌ Error creating USDZ package: {e}")
 
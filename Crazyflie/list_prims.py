@@ -1,6 +1,20 @@
-from pxr import Usd
+import argparse
+import os
+import sys
 
-stage = Usd.Stage.Open("cf2x.usd")
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.hierarchy import add_inspection_arguments, iter_prim_records, open_for_inspection, write_ndjson
 
-for prim in stage.Traverse():
-    print(prim.GetPath())
+parser = argparse.ArgumentParser(description="List the prims of a USD file")
+parser.add_argument("input_file", nargs="?", default="cf2x.usd", help="USD file to inspect (default: cf2x.usd)")
+add_inspection_arguments(parser)
+args = parser.parse_args()
+
+stage = open_for_inspection(args.input_file, not args.no_payloads)
+
+records = iter_prim_records(stage, args.prefix, args.max_depth, sizes=args.json and not args.no_bytes)
+if args.json:
+    write_ndjson(records, sys.stdout)
+else:
+    sys.stdout.writelines(f"{record['path']}\n" for record in records)
@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, Vt, UsdShade
-import math
+import argparse
 import os
+import sys
 
-def create_animated_b2():
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from robot_usd.keyframe_reduction import reduce_keyframes
+from robot_usd.keyframes import frame_times, sine_wave, vec3, write_keyframes
+from robot_usd.output_format import add_output_format_argument, layer_path
+from robot_usd.skeleton import create_skeleton_stage
+from robot_usd.stage_index import StageIndex
+from robot_usd.trajectory_logs import TrajectoryLog, bake_trajectory_log
+
+def create_animated_b2(output_format=None, log_file=None, angle_unit="rad", skel=False):
     # Open the existing USD file
     input_file = "b2.usd"
-    output_file = "b2_animated.usda"
+    output_file = layer_path("b2_animated.usda", output_format)
     
     # Open the stage
     stage = Usd.Stage.Open(input_file)
@@ -22,67 +32,96 @@ def create_animated_b2():
     # First, let's list all prims to understand the structure
     print("Exploring robot structure...")
     
+    # Classify every prim in a single traversal
+    index = StageIndex(stage, roles=["joint", "leg_joint", "body", "material"])
+    
     # Find leg joints to animate
-    leg_joints = []
-    for prim in stage.Traverse():
-        if "joint" in prim.GetPath().pathString.lower() and "leg" in prim.GetPath().pathString.lower():
-            leg_joints.append(prim.GetPath())
-            print(f"Found leg joint: {prim.GetPath()}")
+    leg_joints = list(index.leg_joints)
+    for joint_path in leg_joints:
+        print(f"Found leg joint: {joint_path}")
     
     # If no specific leg joints found, try to find any joints
     if not leg_joints:
-        for prim in stage.Traverse():
-            if "joint" in prim.GetPath().pathString.lower():
-                leg_joints.append(prim.GetPath())
-                print(f"Found joint: {prim.GetPath()}")
-    
-    # Animate the leg joints
-    for joint_path in leg_joints:
-        joint = UsdGeom.Xform(stage.GetPrimAtPath(joint_path))
-        
-        # Create rotation animation
-        rotation_attr = joint.AddRotateXYZOp(UsdGeom.XformOp.PrecisionDouble, "rotate")
-        
+        leg_joints = list(index.joints)
+        for joint_path in leg_joints:
+            print(f"Found joint: {joint_path}")
+    
+    frames = frame_times(1, 48)
+    
+    if log_file:
+        # Replay a recorded session onto the joints instead of the procedural gait
+        default_prim = stage.GetDefaultPrim()
+        stats = bake_trajectory_log(stage, TrajectoryLog(log_file), index.joints,
+                                    base_path=default_prim.GetPath() if default_prim else None,
+                                    angle_unit=angle_unit)
+        print(f"✅ Replayed {stats['frames']} frames for {len(stats['joints'])} joints from {log_file}")
+        animated = stats["attributes"]
+    else:
         # Create a walking motion
-        for frame in range(1, 49):
-            time = frame
-            angle = 30 * math.sin(2 * math.pi * frame / 24)  # 30 degree rotation
-            rotation_attr.Set(Gf.Vec3d(angle, 0, 0), time)
-    
-    # Also add a simple up/down body motion
-    body_paths = []
-    for prim in stage.Traverse():
-        if "body" in prim.GetPath().pathString.lower():
-            body_paths.append(prim.GetPath())
-            print(f"Found body part: {prim.GetPath()}")
-    
-    # If body parts found, animate them
-    for body_path in body_paths:
-        body = UsdGeom.Xform(stage.GetPrimAtPath(body_path))
+        keyframes = {}
+        leg_rotation = vec3(x=sine_wave(frames, 30, 24))  # 30 degree rotation
+        
+        # Animate the leg joints
+        for joint_path in leg_joints:
+            joint = UsdGeom.Xform(stage.GetPrimAtPath(joint_path))
+            
+            # Create rotation animation
+            rotation_attr = joint.AddRotateXYZOp(UsdGeom.XformOp.PrecisionDouble, "rotate")
+            keyframes[rotation_attr] = (frames, leg_rotation)
         
-        # Create translation animation for up/down motion
-        translate_op = body.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
+        # Also add a simple up/down body motion
+        body_paths = list(index.bodies)
+        for body_path in body_paths:
+            print(f"Found body part: {body_path}")
         
         # Create a subtle up/down motion
-        for frame in range(1, 49):
-            time = frame
-            height = 0.05 * math.sin(2 * math.pi * frame / 24)  # 5cm up/down motion
-            current_pos = translate_op.Get(time) if translate_op.Get(time) else Gf.Vec3d(0, 0, 0)
-            translate_op.Set(Gf.Vec3d(current_pos[0], current_pos[1], height), time)
+        body_motion = vec3(z=sine_wave(frames, 0.05, 24))  # 5cm up/down motion
+        
+        # If body parts found, animate them
+        for body_path in body_paths:
+            body = UsdGeom.Xform(stage.GetPrimAtPath(body_path))
+            
+            # Create translation animation for up/down motion
+            translate_op = body.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
+            keyframes[translate_op] = (frames, body_motion)
+        
+        # Write all joint and body samples in one pass
+        write_keyframes(stage, keyframes)
+        animated = list(keyframes)
     
     # Fix material references - remove external MDL references
-    for prim in stage.Traverse():
-        if prim.IsA(UsdShade.Material):
-            # Skip trying to modify existing materials as they might have complex dependencies
-            print(f"Found material: {prim.GetPath()}")
-            pass
+    for material_path in index.materials:
+        # Skip trying to modify existing materials as they might have complex dependencies
+        print(f"Found material: {material_path}")
+    
+    # Drop samples that linear interpolation reproduces from the curves written
+    # here, leaving any animation that came with the input untouched
+    reduce_keyframes(stage, attributes=animated)
     
     # Save the animated USD file
     stage.Export(output_file)
     print(f"✅ Animated USD saved to {output_file}")
     
+    if skel:
+        # Pack the joint animation into a single UsdSkel Skeleton and SkelAnimation
+        skel_file = layer_path("b2_skel.usda", output_format)
+        skel_stage, skel_stats = create_skeleton_stage(stage, skel_file)
+        if skel_stage:
+            skel_stage.Export(skel_file)
+            print(f"✅ UsdSkel USD saved to {skel_file} ({skel_stats['joints']} joints, {skel_stats['meshes']} meshes)")
+            try:
+                UsdUtils.CreateNewUsdzPackage(
+                    Sdf.AssetPath(skel_file),
+                    "b2_skel.usdz"
+                )
+                print("✅ USDZ package created at b2_skel.usdz")
+            except Exception as e:
+                print(f"❌ Error creating UsdSkel USDZ package: {e}")
+        else:
+            print("⚠️ Warning: No links found, skipping the UsdSkel conversion")
+    
     # Create a simplified version for USDZ conversion
-    simplified_file = "b2_simplified.usda"
+    simplified_file = layer_path("b2_simplified.usda", output_format)
     simplified_stage = Usd.Stage.CreateNew(simplified_file)
     
     # Set up the simplified stage
@@ -104,12 +143,12 @@ def create_animated_b2():
     rotate_op = cube_xform.AddRotateXYZOp(UsdGeom.XformOp.PrecisionDouble, "rotate")
     
     # Create animation
-    for frame in range(1, 49):
-        time = frame
-        height = 0.2 * math.sin(2 * math.pi * frame / 24)
-        rotation = 30 * math.sin(2 * math.pi * frame / 12)
-        translate_op.Set(Gf.Vec3d(0, 0, height), time)
-        rotate_op.Set(Gf.Vec3d(0, rotation, 0), time)
+    height = sine_wave(frames, 0.2, 24)
+    rotation = sine_wave(frames, 30, 12)
+    write_keyframes(simplified_stage, {
+        translate_op: (frames, vec3(z=height)),
+        rotate_op: (frames, vec3(y=rotation)),
+    })
     
     # Add a simple material
     material = UsdShade.Material.Define(simplified_stage, "/Robot/Material")
@@ -127,6 +166,9 @@ def create_animated_b2():
     # Bind the material to the cube
     UsdShade.MaterialBindingAPI(cube.GetPrim()).Bind(material)
     
+    # Drop samples that linear interpolation reproduces
+    reduce_keyframes(simplified_stage, attributes=[translate_op, rotate_op])
+    
     # Save the simplified USD file
     simplified_stage.Export(simplified_file)
     print(f"✅ Simplified USD saved to {simplified_file}")
@@ -144,7 +186,7 @@ def create_animated_b2():
         print("Creating a basic USDZ file instead...")
         
         # Create a very basic USD file for USDZ conversion
-        basic_file = "b2_basic.usda"
+        basic_file = layer_path("b2_basic.usda", output_format)
         basic_stage = Usd.Stage.CreateNew(basic_file)
         
         # Set up the basic stage
@@ -165,10 +207,8 @@ def create_animated_b2():
         translate_op = sphere_xform.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
         
         # Create a simple up/down animation
-        for frame in range(1, 49):
-            time = frame
-            height = 0.5 * math.sin(2 * math.pi * frame / 24)
-            translate_op.Set(Gf.Vec3d(0, height, 0), time)
+        height = sine_wave(frames, 0.5, 24)
+        write_keyframes(basic_stage, {translate_op: (frames, vec3(y=height))})
         
         # Add a simple material
         material = UsdShade.Material.Define(basic_stage, "/Robot/Material")
@@ -201,4 +241,11 @@ def create_animated_b2():
             print("Please use the animated USD file directly.")
 
 if __name__ == "__main__":
-    create_animated_b2()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Animate the Unitree B2 and package it as USDZ")
+    parser.add_argument("--log", help="Recorded joint/base log to replay (.csv, .npz, .npy or .bin) instead of the procedural gait")
+    parser.add_argument("--angle-unit", choices=["rad", "deg"], default="rad", help="Unit of the joint angles in the log (default: rad)")
+    parser.add_argument("--skel", action="store_true", help="Also write b2_skel.usdz with the joints packed into a UsdSkel Skeleton")
+    add_output_format_argument(parser)
+    
+    args = parser.parse_args()
+    create_animated_b2(args.output_format, args.log, args.angle_unit, args.skel)
\ No newline at end of file
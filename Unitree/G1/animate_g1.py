@@ -1,12 +1,25 @@
 #!/usr/bin/env python3
 from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, Vt, UsdShade
+import numpy as np
+import argparse
 import math
 import os
+import sys
 
-def create_animated_g1():
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from robot_usd.keyframe_reduction import reduce_keyframes
+from robot_usd.keyframes import frame_times, sine_wave, vec3, write_keyframes
+from robot_usd.looping import common_period, loop_frames, mark_loopable, validate_loop_seam
+from robot_usd.output_format import add_output_format_argument, layer_path
+from robot_usd.skeleton import create_skeleton_stage
+from robot_usd.stage_index import StageIndex
+from robot_usd.trajectory_logs import TrajectoryLog, bake_trajectory_log
+
+def create_animated_g1(output_format=None, log_file=None, angle_unit="rad", loop=False, skel=False):
     # Open the existing USD file
     input_file = "g1.usd"
-    output_file = "g1_animated.usda"
+    output_file = layer_path("g1_animated.usda", output_format)
     
     # Open the stage
     stage = Usd.Stage.Open(input_file)
@@ -21,75 +34,122 @@ def create_animated_g1():
     # Find the robot parts to animate
     print("Exploring robot structure...")
     
+    # Classify every prim in a single traversal
+    index = StageIndex(stage, roles=["joint", "leg_joint", "body", "material"])
+    
     # Find leg joints to animate
-    leg_joints = []
-    for prim in stage.Traverse():
-        if "joint" in prim.GetPath().pathString.lower() and "leg" in prim.GetPath().pathString.lower():
-            leg_joints.append(prim.GetPath())
-            print(f"Found leg joint: {prim.GetPath()}")
+    leg_joints = list(index.leg_joints)
+    for joint_path in leg_joints:
+        print(f"Found leg joint: {joint_path}")
     
     # If no specific leg joints found, try to find any joints
     if not leg_joints:
-        for prim in stage.Traverse():
-            if "joint" in prim.GetPath().pathString.lower():
-                leg_joints.append(prim.GetPath())
-                print(f"Found joint: {prim.GetPath()}")
+        leg_joints = list(index.joints)
+        for joint_path in leg_joints:
+            print(f"Found joint: {joint_path}")
+    
+    frames = frame_times(1, 72)
+    
+    # In loop mode write one gait cycle (24 frame stride, 12 frame bob) in
+    # place, without the forward drift, and let the viewer repeat it
+    if loop and log_file:
+        print("⚠️ Warning: Recorded logs are not periodic, ignoring --loop")
+        loop = False
+    if loop:
+        frames = loop_frames(common_period([24, 12]))
+        stage.SetEndTimeCode(frames[-1])
     
-    # Animate the leg joints
-    for i, joint_path in enumerate(leg_joints):
-        joint = UsdGeom.Xform(stage.GetPrimAtPath(joint_path))
+    if log_file:
+        # Replay a recorded session onto the joints instead of the procedural gait
+        default_prim = stage.GetDefaultPrim()
+        stats = bake_trajectory_log(stage, TrajectoryLog(log_file), index.joints,
+                                    base_path=default_prim.GetPath() if default_prim else None,
+                                    angle_unit=angle_unit)
+        print(f"✅ Replayed {stats['frames']} frames for {len(stats['joints'])} joints from {log_file}")
+        animated = stats["attributes"]
+    else:
+        # Create a walking motion with phase offset based on leg position
+        keyframes = {}
+        phase_offsets = np.arange(len(leg_joints)) * (math.pi / 2)  # Offset each leg by 90 degrees
+        joint_angles = sine_wave(frames, 45, 24, phase=phase_offsets)  # 45 degree rotation
         
-        # Create rotation animation
-        rotation_attr = joint.AddRotateXYZOp(UsdGeom.XformOp.PrecisionDouble, "rotate")
+        # Animate the leg joints
+        for i, joint_path in enumerate(leg_joints):
+            joint = UsdGeom.Xform(stage.GetPrimAtPath(joint_path))
+            
+            # Create rotation animation
+            rotation_attr = joint.AddRotateXYZOp(UsdGeom.XformOp.PrecisionDouble, "rotate")
+            keyframes[rotation_attr] = (frames, vec3(x=joint_angles[i]))
         
-        # Create a walking motion with phase offset based on leg position
-        phase_offset = i * (math.pi / 2)  # Offset each leg by 90 degrees
-        for frame in range(1, 73):
-            time = frame
-            angle = 45 * math.sin((2 * math.pi * frame / 24) + phase_offset)  # 45 degree rotation
-            rotation_attr.Set(Gf.Vec3d(angle, 0, 0), time)
-    
-    # Also add a simple body motion
-    body_paths = []
-    for prim in stage.Traverse():
-        if "body" in prim.GetPath().pathString.lower():
-            body_paths.append(prim.GetPath())
-            print(f"Found body part: {prim.GetPath()}")
-    
-    # If body parts found, animate them
-    for body_path in body_paths:
-        body = UsdGeom.Xform(stage.GetPrimAtPath(body_path))
-        
-        # Create translation animation for forward motion
-        translate_op = body.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
+        # Also add a simple body motion
+        body_paths = list(index.bodies)
+        for body_path in body_paths:
+            print(f"Found body part: {body_path}")
         
         # Create a forward walking motion
-        for frame in range(1, 73):
-            time = frame
-            # Move forward and slightly up/down
-            x_pos = 0.5 * (frame / 72.0)  # Move forward 0.5 units over the animation
-            z_pos = 0.03 * math.sin(2 * math.pi * frame / 12)  # Small up/down motion
-            translate_op.Set(Gf.Vec3d(x_pos, 0, z_pos), time)
+        # Move forward and slightly up/down
+        x_pos = 0.0 if loop else 0.5 * (frames / 72.0)  # Move forward 0.5 units over the animation
+        z_pos = sine_wave(frames, 0.03, 12)  # Small up/down motion
+        body_motion = vec3(x=x_pos, z=z_pos)
+        
+        # If body parts found, animate them
+        for body_path in body_paths:
+            body = UsdGeom.Xform(stage.GetPrimAtPath(body_path))
+            
+            # Create translation animation for forward motion
+            translate_op = body.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
+            keyframes[translate_op] = (frames, body_motion)
+        
+        # Write all joint and body samples in one pass
+        write_keyframes(stage, keyframes)
+        animated = list(keyframes)
     
     # Fix material references - remove external MDL references
-    for prim in stage.Traverse():
-        if prim.IsA(UsdShade.Material):
-            # Skip trying to modify existing materials as they might have complex dependencies
-            print(f"Found material: {prim.GetPath()}")
-            pass
+    for material_path in index.materials:
+        # Skip trying to modify existing materials as they might have complex dependencies
+        print(f"Found material: {material_path}")
+    
+    if loop:
+        # Mark the cycle as loopable and make sure it repeats without a hitch
+        mark_loopable(stage, frames[0], frames[-1])
+        if validate_loop_seam(stage):
+            print("❌ Error: Gait does not loop cleanly")
+            return
+    
+    # Drop samples that linear interpolation reproduces from the curves written
+    # here, leaving any animation that came with the input untouched
+    reduce_keyframes(stage, attributes=animated)
     
     # Save the animated USD file
     stage.Export(output_file)
     print(f"✅ Animated USD saved to {output_file}")
     
+    if skel:
+        # Pack the joint animation into a single UsdSkel Skeleton and SkelAnimation
+        skel_file = layer_path("g1_skel.usda", output_format)
+        skel_stage, skel_stats = create_skeleton_stage(stage, skel_file)
+        if skel_stage:
+            skel_stage.Export(skel_file)
+            print(f"✅ UsdSkel USD saved to {skel_file} ({skel_stats['joints']} joints, {skel_stats['meshes']} meshes)")
+            try:
+                UsdUtils.CreateNewUsdzPackage(
+                    Sdf.AssetPath(skel_file),
+                    "g1_skel.usdz"
+                )
+                print("✅ USDZ package created at g1_skel.usdz")
+            except Exception as e:
+                print(f"❌ Error creating UsdSkel USDZ package: {e}")
+        else:
+            print("⚠️ Warning: No links found, skipping the UsdSkel conversion")
+    
     # Create a simplified version for USDZ conversion
-    simplified_file = "g1_simplified.usda"
+    simplified_file = layer_path("g1_simplified.usda", output_format)
     simplified_stage = Usd.Stage.CreateNew(simplified_file)
     
     # Set up the simplified stage
     simplified_stage.SetTimeCodesPerSecond(24)
     simplified_stage.SetStartTimeCode(1)
-    simplified_stage.SetEndTimeCode(72)
+    simplified_stage.SetEndTimeCode(frames[-1])
     
     # Create a root prim
     root_prim = simplified_stage.DefinePrim("/Robot", "Xform")
@@ -108,6 +168,10 @@ def create_animated_g1():
         (0.8, 0.8)     # Back Right
     ]
     
+    # Create a walking motion with phase offset
+    keyframes = {}
+    leg_angles = sine_wave(frames, 30, 24, phase=np.arange(4) * (math.pi / 2))  # Offset each leg by 90 degrees
+    
     for i, (x, z) in enumerate(leg_positions):
         leg = UsdGeom.Cylinder.Define(simplified_stage, f"/Robot/Leg_{i}")
         leg.CreateRadiusAttr(0.2)
@@ -119,24 +183,20 @@ def create_animated_g1():
         
         # Add rotation animation to the leg
         rotate_op = leg_xform.AddRotateXYZOp(UsdGeom.XformOp.PrecisionDouble, "rotate")
-        
-        # Create a walking motion with phase offset
-        phase_offset = i * (math.pi / 2)  # Offset each leg by 90 degrees
-        for frame in range(1, 73):
-            time = frame
-            angle = 30 * math.sin((2 * math.pi * frame / 24) + phase_offset)
-            rotate_op.Set(Gf.Vec3d(angle, 0, 0), time)
+        keyframes[rotate_op] = (frames, vec3(x=leg_angles[i]))
     
     # Add animation to the body
     body_xform = UsdGeom.Xformable(body.GetPrim())
     translate_op = body_xform.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
     
     # Create a forward walking motion with slight up/down
-    for frame in range(1, 73):
-        time = frame
-        x_pos = 2.0 * (frame / 72.0)  # Move forward 2 units over the animation
-        y_pos = 0.1 * math.sin(2 * math.pi * frame / 12)  # Small up/down motion
-        translate_op.Set(Gf.Vec3d(x_pos, y_pos, 0), time)
+    x_pos = 0.0 if loop else 2.0 * (frames / 72.0)  # Move forward 2 units over the animation
+    y_pos = sine_wave(frames, 0.1, 12)  # Small up/down motion
+    keyframes[translate_op] = (frames, vec3(x=x_pos, y=y_pos))
+    write_keyframes(simplified_stage, keyframes)
+    if loop:
+        # The placeholder gait uses the same cycle as the full robot
+        mark_loopable(simplified_stage, frames[0], frames[-1])
     
     # Add a simple material
     material = UsdShade.Material.Define(simplified_stage, "/Robot/Material")
@@ -157,6 +217,9 @@ def create_animated_g1():
         leg = simplified_stage.GetPrimAtPath(f"/Robot/Leg_{i}")
         UsdShade.MaterialBindingAPI(leg).Bind(material)
     
+    # Drop samples that linear interpolation reproduces
+    reduce_keyframes(simplified_stage, attributes=list(keyframes))
+    
     # Save the simplified USD file
     simplified_stage.Export(simplified_file)
     print(f"✅ Simplified USD saved to {simplified_file}")
@@ -174,7 +237,7 @@ def create_animated_g1():
         print("Creating a basic USDZ file instead...")
         
         # Create a very basic USD file for USDZ conversion
-        basic_file = "g1_basic.usda"
+        basic_file = layer_path("g1_basic.usda", output_format)
         basic_stage = Usd.Stage.CreateNew(basic_file)
         
         # Set up the basic stage
@@ -195,11 +258,9 @@ def create_animated_g1():
         translate_op = sphere_xform.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
         
         # Create a simple animation
-        for frame in range(1, 73):
-            time = frame
-            x_pos = 2.0 * (frame / 72.0)  # Move forward 2 units
-            y_pos = 0.5 * math.sin(2 * math.pi * frame / 24)  # Up/down motion
-            translate_op.Set(Gf.Vec3d(x_pos, y_pos, 0), time)
+        x_pos = 2.0 * (frames / 72.0)  # Move forward 2 units
+        y_pos = sine_wave(frames, 0.5, 24)  # Up/down motion
+        write_keyframes(basic_stage, {translate_op: (frames, vec3(x=x_pos, y=y_pos))})
         
         # Add a simple material
         material = UsdShade.Material.Define(basic_stage, "/Robot/Material")
@@ -232,4 +293,12 @@ def create_animated_g1():
             print("Please use the animated USD file directly.")
 
 if __name__ == "__main__":
-    create_animated_g1()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Animate the Unitree G1 and package it as USDZ")
+    parser.add_argument("--log", help="Recorded joint/base log to replay (.csv, .npz, .npy or .bin) instead of the procedural gait")
+    parser.add_argument("--angle-unit", choices=["rad", "deg"], default="rad", help="Unit of the joint angles in the log (default: rad)")
+    parser.add_argument("--loop", action="store_true", help="Write one in-place gait cycle marked as loopable instead of 3 seconds")
+    parser.add_argument("--skel", action="store_true", help="Also write g1_skel.usdz with the joints packed into a UsdSkel Skeleton")
+    add_output_format_argument(parser)
+    
+    args = parser.parse_args()
+    create_animated_g1(args.output_format, args.log, args.angle_unit, args.loop, args.skel)
\ No newline at end of file
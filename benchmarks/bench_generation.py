@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Generation Pipeline Benchmarks
+
+Times create_animated_usdz(), create_colored_crazyflie(), create_animated_drone()
+and convert_to_usdz() against the bundled Crazyflie cf2x.usd, the G1
+configuration USD and synthetic joint chains, sweeping duration, fps and joint
+count. Every case runs in its own process so peak RSS is per case. Results are
+written as JSON with wall time, peak RSS, output size and the time spent in
+each pipeline stage (open, traverse, author, export, package). USD and the
+helpers the generators import lazily are loaded before timing starts, so the
+stages measure the pipeline rather than imports.
+
+Usage:
+    python benchmarks/bench_generation.py [--quick] [--repeat 3] [--filter NAME] [--output bench.json]
+
+Arguments:
+    --quick         Optional: Run one case per generator instead of the full sweep
+    --repeat        Optional: Runs per case; the median wall time is reported (default: 3)
+    --filter        Optional: Only run cases whose name contains this text
+    --output        Optional: Write the JSON report to this file instead of stdout
+    --list          Optional: Print the case names and exit
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, REPO_ROOT)
+
+# Stable reference assets shipped with the repository
+CF2X_USD = os.path.join(REPO_ROOT, "Crazyflie", "cf2x.usd")
+G1_USD = os.path.join(REPO_ROOT, "Unitree", "G1", "G1_with_hand", "configuration", "g1_29dof_with_hand_rev_1_0_sensor.usd")
+EXAMPLE_USDA = os.path.join(REPO_ROOT, "examples", "complex_robot.usda")
+# cf2x.usd references OmniPBR.mdl, which is not in the repository, so ARKit
+# packaging always rejects it; the flattened copy converts cleanly
+CF2X_CLEAN_USDA = os.path.join(REPO_ROOT, "Crazyflie", "cf2x_clean.usda")
+
+# Modules the generators import lazily; loading them before the profile
+# starts keeps import time out of the "open" stage
+PRELOADED_MODULES = (
+    "numpy",
+    "pxr.Gf", "pxr.Sdf", "pxr.Usd", "pxr.UsdGeom", "pxr.UsdLux", "pxr.UsdShade", "pxr.UsdUtils", "pxr.Vt",
+    "robot_usd.keyframe_reduction", "robot_usd.keyframes", "robot_usd.looping", "robot_usd.materials",
+    "robot_usd.stage_index", "robot_usd.stage_loading",
+)
+
+DURATIONS = (1, 3, 10)
+FPS_VALUES = (24, 60)
+JOINT_COUNTS = (8, 64, 512)
+
+def build_cases(quick=False):
+    """Return the benchmark cases as a list of dicts with a name, a generator and its parameters."""
+    durations = (3,) if quick else DURATIONS
+    fps_values = (24,) if quick else FPS_VALUES
+    joint_counts = (64,) if quick else JOINT_COUNTS
+    
+    cases = []
+    for asset_name, asset in (("cf2x", CF2X_USD), ("g1", G1_USD)):
+        for duration in durations:
+            for fps in fps_values:
+                cases.append({
+                    "name": f"animated_usdz/{asset_name}/d{duration}/fps{fps}",
+                    "generator": "animated_usdz",
+                    "input": asset,
+                    "duration": duration,
+                    "fps": fps,
+                })
+    
+    for joint_count in joint_counts:
+        cases.append({
+            "name": f"animated_usdz/chain{joint_count}/d3/fps24",
+            "generator": "animated_usdz",
+            "joints": joint_count,
+            "duration": 3,
+            "fps": 24,
+        })
+    
+    for output_format in ("usda", "usdc"):
+        cases.append({
+            "name": f"colored_crazyflie/{output_format}",
+            "generator": "colored_crazyflie",
+            "output_format": output_format,
+        })
+    
+    for duration in durations:
+        for fps in fps_values:
+            cases.append({
+                "name": f"drone/d{duration}/fps{fps}",
+                "generator": "drone",
+                "duration": duration,
+                "fps": fps,
+            })
+    
+    for asset_name, asset in (("complex_robot", EXAMPLE_USDA), ("cf2x", CF2X_CLEAN_USDA)):
+        for output_format in ("usda", "usdc"):
+            cases.append({
+                "name": f"convert_to_usdz/{asset_name}/{output_format}",
+                "generator": "convert_to_usdz",
+                "input": asset,
+                "output_format": output_format,
+            })
+    
+    return cases
+
+def load_function(relative_path, function_name):
+    """Import a generator script by path and return one of its functions."""
+    path = os.path.join(REPO_ROOT, relative_path)
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, function_name)
+
+def create_joint_chain(path, joint_count):
+    """Write a synthetic robot with joint_count joints, each holding a small cube."""
+    from pxr import Usd, UsdGeom
+    
+    stage = Usd.Stage.CreateNew(path)
+    root = UsdGeom.Xform.Define(stage, "/Robot")
+    stage.SetDefaultPrim(root.GetPrim())
+    UsdGeom.Xform.Define(stage, "/Robot/base_link")
+    for i in range(joint_count):
+        joint_path = f"/Robot/base_link/joint_{i}"
+        UsdGeom.Xform.Define(stage, joint_path)
+        UsdGeom.Cube.Define(stage, f"{joint_path}/link").CreateSizeAttr(0.1)
+    stage.GetRootLayer().Save()
+
+def prepare_case(case, work_dir):
+    """Set up a case's inputs in work_dir. Returns (run, output path), where run() builds the output."""
+    os.chdir(work_dir)
+    
+    if case["generator"] == "animated_usdz":
+        from create_animated_usdz import create_animated_usdz
+        input_file = case.get("input")
+        if input_file is None:
+            input_file = os.path.join(work_dir, "chain.usda")
+            create_joint_chain(input_file, case["joints"])
+        output_file = os.path.join(work_dir, "animated.usdz")
+        run = lambda: create_animated_usdz(input_file, output_file, case["duration"], case["fps"], use_cache=False)
+    elif case["generator"] == "colored_crazyflie":
+        create_colored_crazyflie = load_function("Crazyflie/create_colored_crazyflie.py", "create_colored_crazyflie")
+        shutil.copy(CF2X_USD, work_dir)
+        output_file = os.path.join(work_dir, "cf2x_colored_animated.usdz")
+        run = lambda: create_colored_crazyflie(case["output_format"], use_cache=False)
+    elif case["generator"] == "drone":
+        create_animated_drone = load_function("usdz_package/create_drone.py", "create_animated_drone")
+        output_file = os.path.join(work_dir, "drone_animated.usdz")
+        run = lambda: create_animated_drone(output_file, case["duration"], case["fps"])
+    elif case["generator"] == "convert_to_usdz":
+        convert_to_usdz = load_function("examples/convert_to_usdz.py", "convert_to_usdz")
+        input_file = os.path.join(work_dir, os.path.basename(case["input"]))
+        shutil.copy(case["input"], input_file)
+        output_file = os.path.join(work_dir, "converted.usdz")
+        run = lambda: convert_to_usdz(input_file, output_file, case["output_format"])
+    else:
+        raise ValueError(f"Unknown generator '{case['generator']}'")
+    
+    return run, output_file
+
+def child_main(case):
+    """Run a single case in this process and print its measurements as JSON."""
+    from robot_usd.profiling import start_profile, stop_profile
+    
+    work_dir = tempfile.mkdtemp(prefix="robot_usd_bench_")
+    try:
+        # Keep generator progress messages out of the JSON on stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            run, output_file = prepare_case(case, work_dir)
+            for module_name in PRELOADED_MODULES:
+                importlib.import_module(module_name)
+            start_profile()
+            start = time.perf_counter()
+            ok = run() is not False
+            wall = time.perf_counter() - start
+            stages = stop_profile()
+        
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":
+            peak_rss *= 1024
+        
+        print(json.dumps({
+            "ok": ok and os.path.exists(output_file),
+            "wall_seconds": wall,
+            "peak_rss_bytes": peak_rss,
+            "output_bytes": os.path.getsize(output_file) if os.path.exists(output_file) else 0,
+            "stages": stages,
+        }))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def measure(case, repeat):
+    """Run a case repeat times in fresh processes and summarize the runs."""
+    runs = []
+    for _ in range(repeat):
+        env = dict(os.environ, ROBOT_USD_CACHE="0")
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, env=env,
+        )
+        if proc.returncode != 0 or not proc.stdout.strip():
+            return dict(case, ok=False, error=(proc.stderr.strip().splitlines() or ["no output"])[-1])
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    
+    walls = [run["wall_seconds"] for run in runs]
+    median_run = sorted(runs, key=lambda run: run["wall_seconds"])[len(runs) // 2]
+    return dict(
+        case,
+        ok=all(run["ok"] for run in runs),
+        wall_seconds=round(statistics.median(walls), 4),
+        wall_seconds_runs=[round(wall, 4) for wall in walls],
+        peak_rss_bytes=max(run["peak_rss_bytes"] for run in runs),
+        output_bytes=median_run["output_bytes"],
+        stages={stage: round(seconds, 4) for stage, seconds in median_run["stages"].items()},
+    )
+
+def usd_version():
+    try:
+        from pxr import Usd
+        return ".".join(str(part) for part in Usd.GetVersion())
+    except ImportError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the USD/USDZ generation pipeline')
+    parser.add_argument('--quick', action='store_true', help='Run one case per generator instead of the full sweep')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case; the median is reported (default: 3)')
+    parser.add_argument('--filter', help='Only run cases whose name contains this text')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument('--list', action='store_true', help='Print the case names and exit')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    
+    args = parser.parse_args()
+    
+    if args.case:
+        child_main(json.loads(args.case))
+        return 0
+    
+    cases = build_cases(args.quick)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case["name"]]
+    
+    if args.list:
+        for case in cases:
+            print(case["name"])
+        return 0
+    
+    results = []
+    for case in cases:
+        result = measure(case, max(args.repeat, 1))
+        status = f"{result['wall_seconds']:.3f}s" if result["ok"] else "failed"
+        print(f"{'✅' if result['ok'] else '❌'} {case['name']}: {status}", file=sys.stderr)
+        results.append(result)
+    
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "usd": usd_version(),
+        "repeat": args.repeat,
+        "cases": results,
+    }
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Benchmark report written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+    
+    return 0 if all(result["ok"] for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
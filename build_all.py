@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Build All Robot Variants
+
+Runs every generator (Crazyflie, Unitree B2/G1, drone, examples) and then
+packages dist/ and robot_usdz_files.zip. Independent jobs run in parallel;
+a job starts as soon as the jobs producing its inputs have finished.
+
+Usage:
+    python build_all.py [--jobs N] [--only NAME ...] [--format usdc] [--report build_report.json] [--list]
+
+Arguments:
+    --jobs          Optional: Number of worker processes (default: number of CPUs)
+    --only          Optional: Build only these jobs and the jobs they depend on
+    --format        Optional: Intermediate layer format, usda or usdc (default: usda)
+    --report        Optional: Write per-job status and timing to a JSON file
+    --list          Optional: Print the jobs and their dependencies without building
+    --verbose       Optional: Print the output of every job, not only failing ones
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from robot_usd.batch import build_graph, discover_jobs, run_jobs
+from robot_usd.output_format import add_output_format_argument
+
+def select_jobs(jobs, names):
+    """Return the named jobs plus everything they depend on, in the original order."""
+    by_name = build_graph(jobs)
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        print(f"❌ Error: Unknown job(s): {', '.join(unknown)}")
+        return None
+    
+    selected = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(by_name[name].deps)
+    return [job for job in jobs if job.name in selected]
+
+def main():
+    parser = argparse.ArgumentParser(description='Build every robot variant in parallel')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Number of worker processes (default: number of CPUs)')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='Build only these jobs and their dependencies')
+    parser.add_argument('--report', help='Write per-job status and timing to this JSON file')
+    parser.add_argument('--list', action='store_true', help='List jobs and dependencies without building')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print the output of every job')
+    add_output_format_argument(parser)
+    
+    args = parser.parse_args()
+    
+    # Worker processes read the layer format from the environment
+    if args.output_format:
+        os.environ["ROBOT_USD_OUTPUT_FORMAT"] = args.output_format
+    
+    jobs = discover_jobs()
+    if args.only:
+        jobs = select_jobs(jobs, args.only)
+        if jobs is None:
+            return 1
+    build_graph(jobs)
+    
+    if args.list:
+        for job in jobs:
+            deps = f" (after {', '.join(sorted(job.deps))})" if job.deps else ""
+            print(f"{job.name}: {', '.join(job.outputs)}{deps}")
+        return 0
+    
+    start = time.perf_counter()
+    results = run_jobs(jobs, workers=args.jobs, verbose=args.verbose)
+    elapsed = time.perf_counter() - start
+    
+    # Summary
+    print("\nJob timings:")
+    for result in results:
+        print(f"  {result['status']:<8} {result['seconds']:>8.2f}s  {result['name']}")
+    serial = sum(result["seconds"] for result in results)
+    print(f"Total: {elapsed:.2f}s wall, {serial:.2f}s of job time")
+    
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"wall_seconds": round(elapsed, 3), "jobs": results}, f, indent=2)
+        print(f"✅ Report written to {args.report}")
+    
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
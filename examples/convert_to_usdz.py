@@ -1,10 +1,25 @@
 #!/usr/bin/env python3
 
-from pxr import Usd, UsdUtils
+import contextlib
+import glob
+import io
+import json
 import os
+import sys
+import tempfile
+import time
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def convert_to_usdz(input_path, output_path=None):
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.output_format import add_output_format_argument, is_crate_file, layer_path, resolve_output_format
+from robot_usd.profiling import lap
+
+# Files picked up when a directory is given as input
+USD_EXTENSIONS = (".usd", ".usda", ".usdc")
+
+def convert_to_usdz(input_path, output_path=None, output_format=None):
     """
     Convert a USD file to USDZ format for use with RealityKit in Xcode.
     
@@ -12,18 +27,47 @@ def convert_to_usdz(input_path, output_path=None):
         input_path (str): Path to the input USD file
         output_path (str, optional): Path for the output USDZ file. If not provided,
                                     will use the same name as input with .usdz extension.
+        output_format (str, optional): Layer format to package, "usda" or "usdc". With
+                                    "usdc", a text input is first converted to a binary
+                                    crate layer in a temporary directory, which is
+                                    removed after packaging.
     """
     if not os.path.exists(input_path):
         print(f"Error: Input file {input_path} does not exist.")
         return False
     
+    # Imported here so --help and argument errors return without loading USD
+    from pxr import UsdUtils, Sdf
+    
     if output_path is None:
         # Use the same name but with .usdz extension
         base_name = os.path.splitext(input_path)[0]
         output_path = f"{base_name}.usdz"
     
-    # Create the USDZ package
-    result = UsdUtils.CreateNewARKitUsdzPackage(input_path, output_path)
+    with tempfile.TemporaryDirectory(prefix="convert_to_usdz_") as scratch_dir:
+        # Convert text layers to crate so the package holds binary data. The
+        # crate is written to a scratch directory rather than next to the
+        # input, where it would be picked up as another input by later runs
+        package_path = input_path
+        if resolve_output_format(output_format) == "usdc" and not is_crate_file(input_path):
+            package_path = os.path.join(scratch_dir, os.path.basename(layer_path(input_path, "usdc")))
+            layer = Sdf.Layer.FindOrOpen(input_path)
+            lap("open")
+            if not layer or not layer.Export(package_path):
+                print(f"Failed to convert {input_path} to a binary crate layer")
+                return False
+            
+            # Anchor relative asset paths (sublayers, references, textures) to the
+            # input's directory, so they still resolve from the scratch directory
+            crate = Sdf.Layer.FindOrOpen(package_path)
+            UsdUtils.ModifyAssetPaths(crate, lambda path: layer.ComputeAbsolutePath(path) if path else path)
+            crate.Save()
+            lap("export")
+            print(f"Converted {input_path} to a binary crate layer")
+        
+        # Create the USDZ package
+        result = UsdUtils.CreateNewARKitUsdzPackage(package_path, output_path)
+        lap("package")
     
     if result:
         print(f"Successfully created USDZ file: {output_path}")
@@ -32,10 +76,199 @@ def convert_to_usdz(input_path, output_path=None):
         print(f"Failed to create USDZ file from {input_path}")
         return False
 
-if __name__ == "__main__":
+def read_manifest(manifest_path):
+    """
+    Read input paths from a manifest file: one path per line, relative to the
+    manifest's directory. Blank lines and lines starting with # are skipped.
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path) as f:
+        lines = [line.strip() for line in f]
+    return [os.path.join(base_dir, line) for line in lines if line and not line.startswith("#")]
+
+def collect_inputs(sources, manifest_path=None):
+    """
+    Expand files, glob patterns, directories and a manifest into a list of
+    USD files, without duplicates and in a stable order.
+    
+    Args:
+        sources (list): Files, glob patterns (e.g. "robots/**/*.usda") or
+                        directories, which are searched recursively
+        manifest_path (str, optional): Manifest file with more inputs
+    
+    Returns:
+        tuple: (input paths, sources that matched nothing)
+    """
+    sources = list(sources) + (read_manifest(manifest_path) if manifest_path else [])
+    inputs = []
+    unmatched = []
+    for source in sources:
+        if os.path.isdir(source):
+            matches = sorted(
+                os.path.join(dirpath, name)
+                for dirpath, _, names in os.walk(source)
+                for name in names if name.endswith(USD_EXTENSIONS)
+            )
+        elif glob.has_magic(source):
+            matches = sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path))
+        else:
+            matches = [source] if os.path.isfile(source) else []
+        if not matches:
+            unmatched.append(source)
+        inputs.extend(matches)
+    
+    seen = set()
+    unique = []
+    for path in inputs:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique, unmatched
+
+def output_path_for(input_path, output_dir=None):
+    """Return the .usdz path for an input, next to it or in output_dir."""
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    directory = output_dir if output_dir else os.path.dirname(input_path)
+    return os.path.join(directory, f"{base_name}.usdz")
+
+def convert_one(input_path, output_path, output_format=None):
+    """
+    Convert one file and report how it went. Runs in a worker process.
+    
+    Returns:
+        dict: input, output, status ("ok" or "failed"), seconds, input_bytes,
+              output_bytes and the conversion's printed log
+    """
+    log = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            ok = convert_to_usdz(input_path, output_path, output_format)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            ok = False
+    
+    return {
+        "input": input_path,
+        "output": output_path,
+        "status": "ok" if ok and os.path.exists(output_path) else "failed",
+        "seconds": round(time.perf_counter() - start, 3),
+        "input_bytes": os.path.getsize(input_path) if os.path.exists(input_path) else 0,
+        "output_bytes": os.path.getsize(output_path) if ok and os.path.exists(output_path) else 0,
+        "log": log.getvalue(),
+    }
+
+def convert_many(pairs, output_format=None, workers=None, on_result=None):
+    """
+    Convert (input, output) pairs concurrently across a process pool.
+    
+    Args:
+        pairs (list): (input path, output path) tuples
+        output_format (str, optional): Layer format to package (see convert_to_usdz)
+        workers (int, optional): Number of conversions running at once
+                                 (default: number of CPUs)
+        on_result (callable, optional): Called with each result as it finishes
+    
+    Returns:
+        list: Results from convert_one(), in the order of pairs
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pairs)))
+    results = {}
+    
+    # A single file or worker does not need a pool
+    if workers == 1:
+        for input_path, output_path in pairs:
+            results[input_path] = convert_one(input_path, output_path, output_format)
+            if on_result:
+                on_result(results[input_path])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(convert_one, input_path, output_path, output_format)
+                       for input_path, output_path in pairs]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result["input"]] = result
+                if on_result:
+                    on_result(result)
+    
+    return [results[input_path] for input_path, _ in pairs]
+
+def format_bytes(count):
+    """Format a byte count for the summary."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+def main():
     parser = argparse.ArgumentParser(description="Convert USD files to USDZ format for RealityKit")
-    parser.add_argument("input_path", help="Path to the input USD file")
-    parser.add_argument("--output", "-o", help="Path for the output USDZ file (optional)")
+    parser.add_argument("inputs", nargs="*", metavar="INPUT",
+                        help="USD files, glob patterns (quote them, e.g. 'robots/**/*.usda') or directories")
+    parser.add_argument("--output", "-o", help="Path for the output USDZ file (single input only)")
+    parser.add_argument("--output-dir", help="Write all USDZ files to this directory (default: next to each input)")
+    parser.add_argument("--manifest", help="File listing more inputs, one path per line")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Number of conversions running at once (default: number of CPUs)")
+    parser.add_argument("--report", help="Write per-file status, timing and sizes to this JSON file")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Print the output of every conversion, not only failing ones")
+    add_output_format_argument(parser)
     
     args = parser.parse_args()
-    convert_to_usdz(args.input_path, args.output)
\ No newline at end of file
+    if not args.inputs and not args.manifest:
+        parser.error("no inputs given")
+    
+    inputs, unmatched = collect_inputs(args.inputs, args.manifest)
+    for source in unmatched:
+        print(f"⚠️ Warning: No USD files found for {source}")
+    if not inputs:
+        print("❌ Error: Nothing to convert")
+        return 1
+    if args.output and len(inputs) > 1:
+        parser.error("--output needs a single input; use --output-dir for several")
+    
+    # Pair every input with its output, refusing to write one file twice
+    if args.output:
+        pairs = [(inputs[0], args.output)]
+    else:
+        pairs = [(path, output_path_for(path, args.output_dir)) for path in inputs]
+    outputs = {}
+    for input_path, output_path in pairs:
+        other = outputs.setdefault(os.path.abspath(output_path), input_path)
+        if other != input_path:
+            print(f"❌ Error: {other} and {input_path} would both be written to {output_path}")
+            return 1
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    
+    def report_progress(result):
+        if result["status"] == "ok":
+            print(f"✅ {result['input']} -> {result['output']} "
+                  f"({format_bytes(result['output_bytes'])}, {result['seconds']:.2f}s)")
+        else:
+            print(f"❌ {result['input']} failed ({result['seconds']:.2f}s)")
+        if args.verbose or result["status"] != "ok":
+            print(result["log"].rstrip())
+    
+    start = time.perf_counter()
+    results = convert_many(pairs, args.output_format, args.jobs, report_progress)
+    elapsed = time.perf_counter() - start
+    
+    # Summary
+    converted = [result for result in results if result["status"] == "ok"]
+    failed = [result for result in results if result["status"] != "ok"]
+    serial = sum(result["seconds"] for result in results)
+    print(f"\nConverted {len(converted)} of {len(results)} files in {elapsed:.2f}s wall ({serial:.2f}s of conversion time)")
+    print(f"Input: {format_bytes(sum(result['input_bytes'] for result in results))}, "
+          f"output: {format_bytes(sum(result['output_bytes'] for result in converted))}")
+    for result in failed:
+        print(f"  failed: {result['input']}")
+    
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"wall_seconds": round(elapsed, 3), "files": results}, f, indent=2)
+        print(f"✅ Report written to {args.report}")
+    
+    return 0 if not failed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 
 from pxr import Usd, UsdGeom, UsdSkel, Sdf, Gf, Vt
+import math
+import os
 
 def create_animated_robot(output_path):
     # Create a new stage
@@ -80,8 +82,5 @@ def create_animated_robot(output_path):
     print(f"Created animated robot USD file at {output_path}")
 
 if __name__ == "__main__":
-    import math
-    import os
-    
-    # Create the animated robot USD file
-    create_animated_robot("/workspace/robot-usd/examples/animated_robot.usda")
\ No newline at end of file
+    # Create the animated robot USD file next to this script
+    create_animated_robot(os.path.join(os.path.dirname(os.path.abspath(__file__)), "animated_robot.usda"))
\ No newline at end of file
@@ -138,5 +138,5 @@ def create_complex_robot(output_path):
     print(f"Created complex animated robot USD file at {output_path}")
 
 if __name__ == "__main__":
-    # Create the animated robot USD file
-    create_complex_robot("/workspace/robot-usd/examples/complex_robot.usda")
\ No newline at end of file
+    # Create the animated robot USD file next to this script
+    create_complex_robot(os.path.join(os.path.dirname(os.path.abspath(__file__)), "complex_robot.usda"))
\ No newline at end of file
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+USDZ Generation Server
+
+Keeps the generators and their source stages loaded and serves generation
+jobs over HTTP, so callers that need one USDZ at a time (such as the web
+configurator) do not pay Python startup, the pxr imports and a cold parse
+of the source USD on every request.
+
+Usage:
+    python generation_server.py [--port 8765] [--host 127.0.0.1] [--socket PATH] [--root DIR] [--max-stages 4]
+
+Arguments:
+    --port          Optional: TCP port to listen on (default: 8765)
+    --host          Optional: Interface to listen on (default: 127.0.0.1)
+    --socket        Optional: Listen on this Unix socket instead of TCP
+    --root          Optional: Directory job inputs are resolved against (default: the repository root)
+    --max-stages    Optional: Number of source stages kept open (default: 4)
+
+Example:
+    curl -s -X POST localhost:8765/generate -o cf2x.usdz -d '{"kind": "animate", "input": "Crazyflie/cf2x.usd", "fps": 30}'
+    curl -s --unix-socket /tmp/robot_usd.sock http://localhost/status
+"""
+
+import argparse
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve USDZ generation jobs from a warm process')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port to listen on (default: 8765)')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--socket', dest='socket_path', help='Listen on this Unix socket instead of TCP')
+    parser.add_argument('--root', default=REPO_ROOT, help='Directory job inputs are resolved against (default: the repository root)')
+    parser.add_argument('--max-stages', type=int, default=4, help='Number of source stages kept open (default: 4)')
+    
+    args = parser.parse_args()
+    
+    # Imported once the arguments are valid, so --help does not load USD
+    from robot_usd.generation_service import GenerationService, make_server
+    
+    service = GenerationService(args.root, args.max_stages)
+    service.warm()
+    server = make_server(service, args.host, args.port, args.socket_path)
+    
+    where = args.socket_path or f"http://{args.host}:{args.port}"
+    print(f"✅ Serving generation jobs on {where} (inputs under {service.source_root})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping")
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
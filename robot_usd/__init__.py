@@ -0,0 +1,8 @@
+"""
+Shared helpers for the robot USD/USDZ generator scripts.
+
+The generators in Crazyflie/, Unitree/, examples/ and usdz_package/ import
+the modules in this package directly, e.g.:
+
+    from robot_usd.mesh_copy import copy_prim_subtrees
+"""
@@ -0,0 +1,9 @@
+"""Run the unified command line: python -m robot_usd <command> [arguments]."""
+
+import sys
+
+from robot_usd.cli import main
+
+# Guarded, as worker processes started with spawn import this module again
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Parallel batch builds of every robot variant.
+
+Each generator script is a BuildJob with the files it reads and writes,
+relative to the repository root. Jobs are linked into a dependency graph by
+matching one job's outputs against another's inputs (source USD -> animated
+layer -> USDZ -> dist zip), and every job whose dependencies have finished is
+run at once in a process pool. Scripts run as __main__ in their own
+directory, exactly as when they are started by hand.
+"""
+
+import contextlib
+import fnmatch
+import glob
+import io
+import os
+import runpy
+import shutil
+import sys
+import time
+import traceback
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generator-looking scripts that are not jobs: copies of a job's script, or
+# tools that need a user-supplied input file
+NON_JOB_SCRIPTS = (
+    "create_animated_usdz.py",
+    "Crazyflie/create_original_animated_crazyflie_fixed.py",
+    "usdz_package/create_animated_usdz.py",
+    "usdz_package/create_*_crazyflie.py",
+)
+
+
+class BuildJob:
+    """
+    One step of the batch build.
+
+    Args:
+        name (str): Unique job name
+        script (str): Script to run, relative to the repository root. None for
+            jobs implemented by a function instead.
+        inputs (list): Files the job reads (files or glob patterns)
+        outputs (list): Files the job writes
+        args (list, optional): Command line arguments for the script
+        func (callable, optional): Module-level function called with the
+            repository root instead of running a script
+    """
+
+    def __init__(self, name, script=None, inputs=(), outputs=(), args=(), func=None):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+        self.func = func
+        self.deps = set()
+
+    def __repr__(self):
+        return f"BuildJob({self.name!r})"
+
+
+def package_dist(root):
+    """Collect the example USDZ files and Xcode docs in dist/ and zip them (replaces package_files.sh)."""
+    dist_dir = os.path.join(root, "dist")
+    os.makedirs(dist_dir, exist_ok=True)
+
+    files = sorted(glob.glob(os.path.join(root, "examples", "*.usdz")))
+    files += [
+        os.path.join(root, "examples", "RobotARView.swift"),
+        os.path.join(root, "examples", "XcodeProjectStructure.md"),
+        os.path.join(root, "README.md"),
+    ]
+    for path in files:
+        shutil.copy(path, dist_dir)
+
+    zip_path = os.path.join(root, "robot_usdz_files.zip")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name in sorted(os.listdir(dist_dir)):
+            archive.write(os.path.join(dist_dir, name), os.path.join("dist", name))
+    print(f"✅ Package created at {zip_path}")
+    return True
+
+
+def default_jobs():
+    """Return the known generator jobs of this repository."""
+    cf2x = "Crazyflie/cf2x.usd"
+    jobs = [
+        BuildJob("crazyflie-animated", "Crazyflie/animate_crazyflie.py",
+                 [cf2x], ["Crazyflie/cf2x_animated_color.usdz"]),
+        BuildJob("crazyflie-colored", "Crazyflie/create_colored_crazyflie.py",
+                 [cf2x], ["Crazyflie/cf2x_colored_animated.usdz"]),
+        BuildJob("crazyflie-explicit", "Crazyflie/create_explicit_animation_crazyflie.py",
+                 [cf2x], ["Crazyflie/cf2x_explicit_animated.usdz"]),
+        BuildJob("crazyflie-ios", "Crazyflie/create_ios_compatible_crazyflie.py",
+                 [cf2x], ["Crazyflie/cf2x_ios_animated.usdz"]),
+        BuildJob("crazyflie-original", "Crazyflie/create_original_animated_crazyflie.py",
+                 [cf2x], ["Crazyflie/cf2x_original_animated.usdz"]),
+        BuildJob("crazyflie-scenekit", "Crazyflie/create_scenekit_compatible_crazyflie.py",
+                 [cf2x], ["Crazyflie/cf2x_scenekit_animated.usdz"]),
+        BuildJob("crazyflie-simplified", "Crazyflie/create_simplified_crazyflie.py",
+                 [], ["Crazyflie/cf2x_simplified.usdz"]),
+        BuildJob("crazyflie-visible", "Crazyflie/create_visible_crazyflie.py",
+                 [], ["Crazyflie/cf2x_visible.usdz"]),
+        BuildJob("unitree-b2", "Unitree/B2/animate_b2.py",
+                 ["Unitree/B2/b2.usd"], ["Unitree/B2/b2_animated.usdz"]),
+        BuildJob("unitree-g1", "Unitree/G1/animate_g1.py",
+                 ["Unitree/G1/g1.usd"], ["Unitree/G1/g1_animated.usdz"]),
+        BuildJob("drone", "usdz_package/create_drone.py",
+                 [], ["usdz_package/drone_animated.usdz"]),
+        BuildJob("fleet", "usdz_package/create_fleet.py",
+                 [], ["usdz_package/fleet_animated.usdz"]),
+        BuildJob("example-animated-robot", "examples/create_animated_robot.py",
+                 [], ["examples/animated_robot.usda"]),
+        BuildJob("example-complex-robot", "examples/create_complex_robot.py",
+                 [], ["examples/complex_robot.usda"]),
+        BuildJob("example-animated-robot-usdz", "examples/convert_to_usdz.py",
+                 ["examples/animated_robot.usda"], ["examples/animated_robot.usdz"],
+                 args=["animated_robot.usda"]),
+        BuildJob("example-complex-robot-usdz", "examples/convert_to_usdz.py",
+                 ["examples/complex_robot.usda"], ["examples/complex_robot.usdz"],
+                 args=["complex_robot.usda"]),
+        BuildJob("dist", inputs=["examples/*.usdz", "examples/RobotARView.swift",
+                                 "examples/XcodeProjectStructure.md", "README.md"],
+                 outputs=["robot_usdz_files.zip"], func=package_dist),
+    ]
+    return jobs
+
+
+def discover_jobs(root=REPO_ROOT):
+    """
+    Return the jobs whose scripts exist under root.
+
+    Generator scripts (create_*.py, animate_*.py) that are neither a known job
+    nor listed in NON_JOB_SCRIPTS are reported, so new generators are not silently left
+    out of the batch build.
+    """
+    jobs = [job for job in default_jobs() if job.script is None or os.path.exists(os.path.join(root, job.script))]
+    known = set(job.script for job in jobs)
+
+    for pattern in ("**/create_*.py", "**/animate_*.py"):
+        for path in sorted(glob.glob(os.path.join(root, pattern), recursive=True)):
+            script = os.path.relpath(path, root).replace(os.sep, "/")
+            if script in known or any(fnmatch.fnmatch(script, mirror) for mirror in NON_JOB_SCRIPTS):
+                continue
+            print(f"⚠️ Warning: {script} looks like a generator but has no batch job")
+    return jobs
+
+
+def build_graph(jobs):
+    """
+    Fill in job.deps from matching outputs to inputs.
+
+    Returns:
+        dict: Maps job names to jobs
+    """
+    by_name = {job.name: job for job in jobs}
+    producers = {}
+    for job in jobs:
+        for output in job.outputs:
+            producers[output] = job.name
+
+    for job in jobs:
+        job.deps = set()
+        for pattern in job.inputs:
+            for output, producer in producers.items():
+                if producer != job.name and fnmatch.fnmatch(output, pattern):
+                    job.deps.add(producer)
+    return by_name
+
+
+def _run_job(job, root):
+    """Run one job in a worker process. Returns (name, ok, seconds, log)."""
+    log = io.StringIO()
+    start = time.perf_counter()
+    ok = True
+
+    # Workers are reused across jobs, so the directory and arguments a script
+    # runs with are put back afterwards, even when the job fails
+    cwd, argv = os.getcwd(), sys.argv
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            if job.func is not None:
+                ok = job.func(root) is not False
+            else:
+                script_path = os.path.join(root, job.script)
+                os.chdir(os.path.dirname(script_path))
+                sys.argv = [script_path] + job.args
+                runpy.run_path(script_path, run_name="__main__")
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except Exception:
+            traceback.print_exc()
+            ok = False
+        finally:
+            os.chdir(cwd)
+            sys.argv = argv
+
+    # Generators report most failures by printing, so also check what they wrote
+    missing = [output for output in job.outputs if not os.path.exists(os.path.join(root, output))]
+    if missing:
+        log.write(f"Missing outputs: {', '.join(missing)}\n")
+        ok = False
+    return job.name, ok, time.perf_counter() - start, log.getvalue()
+
+
+def run_jobs(jobs, root=REPO_ROOT, workers=None, verbose=False):
+    """
+    Run jobs in dependency order across a process pool.
+
+    A job is skipped when one of its source inputs (an input no other job
+    produces) is missing, or when a job it depends on failed.
+
+    Args:
+        jobs (list): BuildJob instances
+        root (str): Repository root the job paths are relative to
+        workers (int, optional): Pool size (default: number of CPUs)
+        verbose (bool): Print every job's output, not only failing ones
+
+    Returns:
+        list: One dict per job with name, status ("ok", "failed" or "skipped"),
+        seconds and reason
+    """
+    build_graph(jobs)
+    results = {}
+
+    def skip(job, reason):
+        results[job.name] = {"name": job.name, "status": "skipped", "seconds": 0.0, "reason": reason}
+        print(f"⚠️ Skipped {job.name}: {reason}")
+
+    # Source inputs are the ones no job produces; they have to exist up front
+    produced = [output for job in jobs for output in job.outputs]
+    for job in jobs:
+        sources = [pattern for pattern in job.inputs if not fnmatch.filter(produced, pattern)]
+        missing = [pattern for pattern in sources if not glob.glob(os.path.join(root, pattern))]
+        if missing:
+            skip(job, f"missing input {', '.join(missing)}")
+
+    pending = {job.name: job for job in jobs if job.name not in results}
+    running = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            # Submit every job whose dependencies are done
+            progressed = False
+            for name, job in list(pending.items()):
+                dep_status = [results[dep]["status"] if dep in results else None for dep in job.deps]
+                if None in dep_status:
+                    continue
+                del pending[name]
+                progressed = True
+                if any(status != "ok" for status in dep_status):
+                    skip(job, "a dependency did not build")
+                    continue
+                print(f"▶️ Starting {name}")
+                running[pool.submit(_run_job, job, root)] = name
+
+            if not running:
+                if not progressed:
+                    for job in pending.values():
+                        skip(job, "dependency cycle")
+                    pending.clear()
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                name, ok, seconds, log = future.result()
+                results[name] = {"name": name, "status": "ok" if ok else "failed", "seconds": round(seconds, 3), "reason": ""}
+                if verbose or not ok:
+                    print(log, end="")
+                print(f"{'✅' if ok else '❌'} {name} finished in {seconds:.2f}s")
+
+    return [results[job.name] for job in jobs]
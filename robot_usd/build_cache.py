@@ -0,0 +1,155 @@
+"""
+Content-addressed cache for generated USDZ files.
+
+A build is identified by a SHA-256 key over:
+
+- the input layers and every layer or asset they depend on,
+- the generation parameters (duration, fps, colors, output format, ...),
+- the generator script and the robot_usd helper sources.
+
+When a key is already in the cache the stored .usdz is copied to the output
+path and the generator skips opening, authoring, exporting and packaging.
+The cache directory is kept under a byte budget by evicting the least
+recently used entries.
+
+Settings come from the environment:
+
+    ROBOT_USD_CACHE=0               disable the cache
+    ROBOT_USD_CACHE_DIR             cache location (default: ~/.cache/robot_usd)
+    ROBOT_USD_CACHE_MAX_BYTES       size budget (default: 1 GiB)
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Bump to invalidate every existing cache entry
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "robot_usd")
+DEFAULT_MAX_BYTES = 1 << 30
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _hash_file(digest, path):
+    """Feed the contents of path into digest in 1 MiB chunks."""
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+
+def _dependency_paths(input_file):
+    """Return input_file plus every local layer and asset it depends on."""
+    from pxr import Sdf, UsdUtils
+
+    paths = [os.path.abspath(input_file)]
+    layers, assets, _unresolved = UsdUtils.ComputeAllDependencies(Sdf.AssetPath(input_file))
+    for layer in layers:
+        if layer.realPath:
+            paths.append(layer.realPath)
+    paths.extend(assets)
+    return sorted(set(path for path in paths if os.path.isfile(path)))
+
+
+class BuildCache:
+    """
+    Size-bounded LRU cache of .usdz files keyed by build inputs.
+
+    Args:
+        cache_dir (str, optional): Directory to store entries in
+        max_bytes (int, optional): Total size the cache is trimmed to after each store
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.environ.get("ROBOT_USD_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = int(max_bytes or os.environ.get("ROBOT_USD_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, generator_file, output_file, input_files, params):
+        """
+        Compute the cache key for a build.
+
+        Args:
+            generator_file (str): Path of the generator script (usually __file__)
+            output_file (str): The build's output; its name is part of the key, so
+                builds that only differ in where they write do not share an entry
+            input_files (list): Input USD files; their dependencies are hashed too
+            params (dict): Generation parameters. Values that are not JSON types
+                (e.g. Gf.Vec3f colors) are hashed by their string form.
+
+        Returns:
+            str: Hex digest identifying the build
+        """
+        digest = hashlib.sha256()
+        digest.update(f"robot_usd-build-cache-{CACHE_FORMAT_VERSION}".encode())
+
+        # Generator version: the script itself plus the shared helpers it uses
+        _hash_file(digest, generator_file)
+        for helper in sorted(glob.glob(os.path.join(_PACKAGE_DIR, "*.py"))):
+            _hash_file(digest, helper)
+        digest.update(os.path.basename(output_file).encode())
+
+        for input_file in input_files:
+            for path in _dependency_paths(input_file):
+                digest.update(os.path.basename(path).encode())
+                _hash_file(digest, path)
+
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.usdz")
+
+    def fetch(self, key, output_file):
+        """Copy the cached build for key to output_file. Returns False on a miss."""
+        entry = self._entry_path(key)
+        try:
+            shutil.copyfile(entry, output_file)
+            # Mark the entry as recently used
+            os.utime(entry)
+        except FileNotFoundError:
+            # Missing, or evicted by another build process in the meantime
+            return False
+        print(f"✅ Reused cached build for {output_file}")
+        return True
+
+    def store(self, key, output_file):
+        """Add a freshly built output_file to the cache, then evict old entries."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(output_file, tmp_path)
+        os.replace(tmp_path, self._entry_path(key))
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        # Other build processes may store or evict entries at the same time,
+        # so files can disappear between listing and stat() or remove()
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.usdz")):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def open_build_cache(use_cache=True):
+    """Return a BuildCache, or None if caching is turned off by argument or environment."""
+    if not use_cache or os.environ.get("ROBOT_USD_CACHE", "1") == "0":
+        return None
+    return BuildCache()
@@ -0,0 +1,171 @@
+"""
+Unified command line entry point.
+
+    python -m robot_usd <command> [arguments]
+
+Each command runs one of the repository's scripts (its main() function,
+with the same arguments). Nothing heavy is imported until a command is
+chosen: this module only uses the standard library, and the scripts import
+pxr and NumPy inside the functions that do the work, so listing commands,
+--help and argument errors return without loading USD. Orchestration that
+only validates arguments or reads help text therefore stays cheap.
+
+"check-startup" enforces that: it runs every command's --help in a fresh
+interpreter and fails if any of them loads a pxr module or takes longer than
+the startup budget.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Commands, as (script relative to the repository root, summary)
+COMMANDS = {
+    "animate": ("create_animated_usdz.py", "Animate a USD robot and package it as USDZ"),
+    "drone": ("usdz_package/create_drone.py", "Create an animated drone USDZ"),
+    "fleet": ("usdz_package/create_fleet.py", "Create a USDZ with a fleet of animated drones"),
+    "convert": ("examples/convert_to_usdz.py", "Convert USD files to USDZ"),
+    "build": ("build_all.py", "Build every robot variant in parallel"),
+    "serve": ("generation_server.py", "Serve USDZ generation jobs from a warm process"),
+}
+
+# Wall time allowed for "<command> --help", including interpreter startup
+DEFAULT_STARTUP_BUDGET = float(os.environ.get("ROBOT_USD_STARTUP_BUDGET", "0.5"))
+
+# Run in a fresh interpreter by check-startup; prints the pxr modules loaded
+_STARTUP_PROBE = """
+import contextlib, io, json, sys
+from robot_usd.cli import run_command
+with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    try:
+        run_command(sys.argv[1], ["--help"])
+    except SystemExit:
+        pass
+print(json.dumps(sorted(name for name in sys.modules if name == "pxr" or name.startswith("pxr."))))
+"""
+
+
+def _load_script(relative_path):
+    """Import a script by path without running its __main__ block."""
+    path = os.path.join(REPO_ROOT, relative_path)
+
+    # Scripts import their neighbours (e.g. create_fleet imports create_drone)
+    # as they would when run directly
+    script_dir = os.path.dirname(path)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    # Registered under its own name, so functions it sends to worker processes
+    # (e.g. convert's process pool) pickle as they do when it is run directly
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_command(name, args):
+    """
+    Run a command's main() with args as its command line.
+
+    Args:
+        name (str): Command name (see COMMANDS)
+        args (list): Arguments after the command name
+
+    Returns:
+        int: Exit status
+    """
+    script, _ = COMMANDS[name]
+    module = _load_script(script)
+    sys.argv = [f"robot_usd {name}"] + list(args)
+    result = module.main()
+    return result if isinstance(result, int) else 0
+
+
+def check_startup(budget=DEFAULT_STARTUP_BUDGET, commands=None):
+    """
+    Time "<command> --help" for every command in a fresh interpreter.
+
+    Args:
+        budget (float): Seconds allowed per command, including interpreter startup
+        commands (list, optional): Commands to check (default: all)
+
+    Returns:
+        list: One dict per command with "command", "seconds", "pxr_modules"
+        (None if --help failed) and "ok"
+    """
+    results = []
+    for name in commands or COMMANDS:
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", _STARTUP_PROBE, name], cwd=REPO_ROOT,
+                                   capture_output=True, text=True)
+        seconds = time.perf_counter() - start
+
+        try:
+            pxr_modules = json.loads(completed.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            pxr_modules = None
+        if completed.returncode != 0:
+            pxr_modules = None
+        ok = pxr_modules == [] and seconds <= budget
+        results.append({"command": name, "seconds": round(seconds, 3), "pxr_modules": pxr_modules, "ok": ok})
+    return results
+
+
+def _print_usage():
+    """Print the list of commands."""
+    print("Usage: python -m robot_usd <command> [arguments]\n")
+    print("Commands:")
+    for name, (script, summary) in COMMANDS.items():
+        print(f"  {name:<14} {summary} ({script})")
+    print(f"  {'check-startup':<14} Check that every command's --help stays within the startup budget")
+    print("\nRun 'python -m robot_usd <command> --help' for the options of a command.")
+
+
+def _check_startup_main(args):
+    """Run check-startup from the command line."""
+    parser = argparse.ArgumentParser(prog="robot_usd check-startup",
+                                     description="Check that --help of every command starts quickly without loading USD")
+    parser.add_argument("--budget", type=float, default=DEFAULT_STARTUP_BUDGET,
+                        help=f"Seconds allowed per command (default: {DEFAULT_STARTUP_BUDGET}, or $ROBOT_USD_STARTUP_BUDGET)")
+    parser.add_argument("commands", nargs="*", metavar="COMMAND", help="Commands to check (default: all)")
+    args = parser.parse_args(args)
+    unknown = [name for name in args.commands if name not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+
+    results = check_startup(args.budget, args.commands)
+    for result in results:
+        if result["pxr_modules"] is None:
+            print(f"❌ {result['command']}: --help failed")
+        elif result["pxr_modules"]:
+            print(f"❌ {result['command']}: --help loaded {', '.join(result['pxr_modules'])}")
+        elif not result["ok"]:
+            print(f"❌ {result['command']}: --help took {result['seconds']:.2f}s (budget {args.budget:.2f}s)")
+        else:
+            print(f"✅ {result['command']}: --help took {result['seconds']:.2f}s")
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+def main(argv=None):
+    """Dispatch to a command. Returns the exit status."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        _print_usage()
+        return 0 if argv else 2
+
+    name, args = argv[0], argv[1:]
+    if name == "check-startup":
+        return _check_startup_main(args)
+    if name not in COMMANDS:
+        print(f"❌ Error: Unknown command '{name}'\n")
+        _print_usage()
+        return 2
+    return run_command(name, args)
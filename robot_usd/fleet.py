@@ -0,0 +1,137 @@
+"""
+Fleet layouts drawn with a single UsdGeom.PointInstancer.
+
+Instead of one prim hierarchy (or one USDZ) per vehicle, a fleet stores a
+few prototype vehicles under a PointInstancer and one entry per vehicle in
+its positions, orientations and protoIndices arrays. All per-vehicle data is
+built with NumPy and written as whole Vt arrays, so 10k vehicles cost a few
+array copies rather than 10k prim definitions.
+
+Propeller phase offsets are handled by building several prototypes whose
+propellers start at evenly spaced angles, then assigning each vehicle to the
+prototype closest to its phase.
+"""
+
+import numpy as np
+from pxr import Gf, Sdf, UsdGeom, Vt
+
+
+def grid_positions(count, spacing=6.0, height=0.0):
+    """
+    Lay count vehicles out on a square grid in the XZ plane (Y up), centered
+    on the origin.
+
+    Returns:
+        numpy.ndarray: (count, 3) positions
+    """
+    columns = int(np.ceil(np.sqrt(count)))
+    index = np.arange(count)
+    x = (index % columns - (columns - 1) / 2.0) * spacing
+    z = (index // columns - (columns - 1) / 2.0) * spacing
+    return np.stack([x, np.full(count, float(height)), z], axis=-1)
+
+
+def yaw_orientations(yaw_degrees):
+    """
+    Convert rotations about the Y (up) axis into quaternions.
+
+    Returns:
+        numpy.ndarray: (..., 4) quaternions as (real, i, j, k)
+    """
+    half = np.radians(np.asarray(yaw_degrees, dtype=np.float64)) / 2.0
+    zeros = np.zeros_like(half)
+    return np.stack([np.cos(half), zeros, np.sin(half), zeros], axis=-1)
+
+
+def phase_buckets(phases, bucket_count, period=360.0):
+    """Map each phase (0..period) to the nearest of bucket_count evenly spaced phases."""
+    buckets = np.round(np.mod(phases, period) / (period / bucket_count)).astype(np.int32)
+    return buckets % bucket_count
+
+
+def circle_trajectories(positions, frames, radius=2.0, period=None, phases=None):
+    """
+    Move every vehicle around a horizontal circle centered on its position.
+
+    Args:
+        positions (array): (N, 3) circle centers
+        frames (array): (F,) frame numbers
+        radius (float): Circle radius
+        period (float, optional): Frames per lap (default: the whole frame range)
+        phases (array, optional): (N,) starting angle per vehicle in degrees
+
+    Returns:
+        numpy.ndarray: (F, N, 3) positions per frame
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    frames = np.asarray(frames, dtype=np.float64)
+    period = period or len(frames)
+    phases = np.zeros(len(positions)) if phases is None else np.radians(phases)
+
+    angle = 2 * np.pi * frames[:, np.newaxis] / period + phases[np.newaxis, :]
+    offsets = np.stack([radius * np.cos(angle), np.zeros_like(angle), radius * np.sin(angle)], axis=-1)
+    return positions[np.newaxis, :, :] + offsets
+
+
+def _quath_array(quaternions):
+    """Convert an (N, 4) array of (real, i, j, k) quaternions into a Vt.QuathArray."""
+    return Vt.QuathArray([Gf.Quath(*quaternion) for quaternion in np.asarray(quaternions).tolist()])
+
+
+def define_fleet(stage, path, prototype_paths, positions, orientations=None, proto_indices=None,
+                 frames=None, trajectories=None, orientation_trajectories=None):
+    """
+    Define a PointInstancer that draws one prototype per vehicle.
+
+    Args:
+        stage (Usd.Stage): Stage to author into
+        path (str): Path of the PointInstancer
+        prototype_paths (list): Prototype prims, ideally children of path so
+            they are only drawn through the instancer
+        positions (array): (N, 3) rest positions
+        orientations (array, optional): (N, 4) quaternions as (real, i, j, k)
+        proto_indices (array, optional): (N,) index into prototype_paths per
+            vehicle (default: all 0)
+        frames (array, optional): (F,) frame numbers for the trajectories
+        trajectories (array, optional): (F, N, 3) positions per frame
+        orientation_trajectories (array, optional): (F, N, 4) quaternions per frame
+
+    Returns:
+        UsdGeom.PointInstancer: The instancer
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    count = len(positions)
+    if proto_indices is None:
+        proto_indices = np.zeros(count, dtype=np.int32)
+
+    instancer = UsdGeom.PointInstancer.Define(stage, path)
+    instancer.CreatePrototypesRel().SetTargets([Sdf.Path(str(prototype)) for prototype in prototype_paths])
+    instancer.CreateProtoIndicesAttr().Set(Vt.IntArray.FromNumpy(np.ascontiguousarray(proto_indices, dtype=np.int32)))
+    instancer.CreateIdsAttr().Set(Vt.Int64Array.FromNumpy(np.arange(count, dtype=np.int64)))
+
+    positions_attr = instancer.CreatePositionsAttr()
+    positions_attr.Set(Vt.Vec3fArray.FromNumpy(np.ascontiguousarray(positions)))
+    orientations_attr = instancer.CreateOrientationsAttr()
+    if orientations is not None:
+        orientations_attr.Set(_quath_array(orientations))
+
+    if frames is None:
+        return instancer
+
+    # Write whole per-frame arrays straight into the layer
+    edit_target = stage.GetEditTarget()
+    layer = edit_target.GetLayer()
+    curves = []
+    if trajectories is not None:
+        trajectories = np.asarray(trajectories, dtype=np.float32)
+        curves.append((positions_attr, [Vt.Vec3fArray.FromNumpy(np.ascontiguousarray(frame)) for frame in trajectories]))
+    if orientation_trajectories is not None:
+        curves.append((orientations_attr, [_quath_array(frame) for frame in orientation_trajectories]))
+
+    with Sdf.ChangeBlock():
+        for attr, values in curves:
+            spec_path = edit_target.MapToSpecPath(attr.GetPath())
+            for time, value in zip(np.asarray(frames, dtype=np.float64).tolist(), values):
+                layer.SetTimeSample(spec_path, time, value)
+
+    return instancer
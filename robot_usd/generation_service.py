@@ -0,0 +1,291 @@
+"""
+Persistent USDZ generation service.
+
+Every run of create_animated_usdz.py or create_drone.py pays Python startup,
+the pxr imports and a cold parse of its source USD before doing any work,
+which dominates the latency of one-off requests such as the web
+configurator's. GenerationService keeps one process warm instead: the
+generator scripts are loaded once, source stages stay open in a
+SourceStageCache (reloaded when a source file changes on disk), and each job
+runs in a scratch directory and returns the USDZ bytes.
+
+The service speaks HTTP on localhost or on a Unix socket:
+
+    POST /generate   JSON job -> USDZ bytes (model/vnd.usdz+zip)
+    GET  /status     JSON cache and job counters
+
+Jobs are JSON objects with a "kind":
+
+    {"kind": "animate", "input": "Crazyflie/cf2x.usd", "duration": 3, "fps": 24,
+     "mask": ["/crazyflie/body"]}
+    {"kind": "drone", "duration": 3, "fps": 24, "body_color": [0.1, 0.1, 0.1],
+     "prop1_color": [0.8, 0, 0], "prop2_color": [0, 0, 0.8], "loop": false}
+
+"input" is resolved against the service's source root and must stay inside
+it. Jobs run one at a time: the generators print progress to stdout, which
+is captured per job and returned with errors.
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import socketserver
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from pxr import Gf, Sdf
+
+from robot_usd.stage_loading import SourceStageCache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generator functions the service runs, by job kind
+GENERATORS = {
+    "animate": ("create_animated_usdz.py", "create_animated_usdz"),
+    "drone": ("usdz_package/create_drone.py", "create_animated_drone"),
+}
+
+# Largest job description accepted, in bytes
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+class JobError(Exception):
+    """A job that could not be run, with the HTTP status to report."""
+
+    def __init__(self, message, status=400, log=""):
+        super().__init__(message)
+        self.status = status
+        self.log = log
+
+
+def _color(job, name):
+    """Return a job's RGB color as a Gf.Vec3f, or None if it is not given."""
+    value = job.get(name)
+    if value is None:
+        return None
+    try:
+        r, g, b = (float(component) for component in value)
+    except (TypeError, ValueError):
+        raise JobError(f"{name} must be a list of three numbers")
+    return Gf.Vec3f(r, g, b)
+
+
+def _mask(job):
+    """Return a job's population mask as a list of prim paths, or None if it is not given."""
+    value = job.get("mask")
+    if value is None:
+        return None
+    if not isinstance(value, list) or not all(isinstance(path, str) for path in value):
+        raise JobError("mask must be a list of prim path strings")
+    invalid = [path for path in value if not path.startswith("/") or not Sdf.Path.IsValidPathString(path)]
+    if invalid:
+        raise JobError(f"mask holds invalid prim paths: {', '.join(invalid)}")
+    return value
+
+
+class GenerationService:
+    """
+    Runs generation jobs in a warm process.
+
+    Args:
+        source_root (str): Directory job inputs are resolved against
+        max_stages (int): Number of source stages kept open
+    """
+
+    def __init__(self, source_root=REPO_ROOT, max_stages=4):
+        self.source_root = os.path.realpath(source_root)
+        self.stages = SourceStageCache(max_stages)
+        self.jobs = 0
+        self.failures = 0
+        self._generators = {}
+
+    def generator(self, kind):
+        """Return the generator function for a job kind, loading its script once."""
+        if kind not in GENERATORS:
+            raise JobError(f"Unknown job kind '{kind}' (expected one of {', '.join(GENERATORS)})")
+        if kind not in self._generators:
+            script, name = GENERATORS[kind]
+            spec = importlib.util.spec_from_file_location(f"robot_usd_generator_{kind}", os.path.join(REPO_ROOT, script))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._generators[kind] = getattr(module, name)
+        return self._generators[kind]
+
+    def warm(self, kinds=tuple(GENERATORS)):
+        """Load the generator scripts ahead of the first job."""
+        for kind in kinds:
+            self.generator(kind)
+
+    def resolve_input(self, path):
+        """Return the absolute path of a job input, which must be inside the source root."""
+        if not isinstance(path, str) or not path:
+            raise JobError("input must be a file path")
+        resolved = os.path.realpath(os.path.join(self.source_root, path))
+        if os.path.commonpath([resolved, self.source_root]) != self.source_root:
+            raise JobError(f"input '{path}' is outside the source root", status=403)
+        if not os.path.isfile(resolved):
+            raise JobError(f"input '{path}' not found", status=404)
+        return resolved
+
+    def _call(self, kind, job, output_file):
+        """Run the generator for one job, writing output_file."""
+        try:
+            duration = float(job.get("duration", 3))
+            fps = int(job.get("fps", 24))
+        except (TypeError, ValueError):
+            raise JobError("duration and fps must be numbers")
+        if duration <= 0 or fps <= 0:
+            raise JobError("duration and fps must be positive")
+
+        generator = self.generator(kind)
+        if kind == "animate":
+            input_file = self.resolve_input(job.get("input"))
+            return generator(input_file, output_file, duration, fps, job.get("format"),
+                             job.get("cache", True), _mask(job))
+
+        colors = {}
+        for name in ("body_color", "prop1_color", "prop2_color"):
+            color = _color(job, name)
+            if color is not None:
+                colors[name] = color
+        return generator(output_file, duration, fps, output_format=job.get("format"),
+                         loop=bool(job.get("loop", False)), **colors)
+
+    def generate(self, job):
+        """
+        Run one job and return its USDZ bytes.
+
+        Args:
+            job (dict): Job description (see the module docstring)
+
+        Returns:
+            tuple: USDZ bytes and a dict with the job's "seconds" and "log"
+
+        Raises:
+            JobError: If the job is invalid or the generator fails
+        """
+        if not isinstance(job, dict):
+            raise JobError("job must be a JSON object")
+        kind = job.get("kind", "animate")
+        start = time.perf_counter()
+        self.jobs += 1
+
+        scratch_dir = tempfile.mkdtemp(prefix="robot_usd_job_")
+        output_file = os.path.join(scratch_dir, f"{kind}.usdz")
+        log = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(log), self.stages.activate():
+                ok = self._call(kind, job, output_file)
+            if not ok or not os.path.exists(output_file):
+                raise JobError("generation failed", status=500, log=log.getvalue())
+            with open(output_file, "rb") as f:
+                data = f.read()
+        except JobError as e:
+            self.failures += 1
+            e.log = e.log or log.getvalue()
+            raise
+        except Exception as e:
+            self.failures += 1
+            raise JobError(f"{type(e).__name__}: {e}", status=500, log=log.getvalue())
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+        return data, {"seconds": time.perf_counter() - start, "log": log.getvalue()}
+
+    def status(self):
+        """Return the service's job and stage cache counters."""
+        return {
+            "jobs": self.jobs,
+            "failures": self.failures,
+            "stages": self.stages.paths(),
+            "stage_hits": self.stages.hits,
+            "stage_misses": self.stages.misses,
+            "stage_reloads": self.stages.reloads,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP front end of a GenerationService (set as the server's .service)."""
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode(), "application/json")
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._send_json(200, self.server.service.status())
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._send_json(413, {"error": "Job description too large"})
+            return
+        try:
+            job = json.loads(self.rfile.read(length) or b"{}")
+            data, info = self.server.service.generate(job)
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
+            return
+        except JobError as e:
+            self._send_json(e.status, {"error": str(e), "log": e.log})
+            return
+
+        print(f"✅ {job.get('kind', 'animate')} job: {len(data)} bytes in {info['seconds']:.2f}s")
+        self._send(200, data, "model/vnd.usdz+zip", {"X-Generation-Seconds": f"{info['seconds']:.3f}"})
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnixHTTPServer(socketserver.UnixStreamServer):
+    """HTTP over a Unix socket; jobs are handled one at a time like on TCP."""
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def make_server(service, host="127.0.0.1", port=8765, socket_path=None):
+    """
+    Create an HTTP server for a GenerationService.
+
+    Args:
+        service (GenerationService): Service that runs the jobs
+        host (str): Interface to listen on when no socket_path is given
+        port (int): TCP port to listen on
+        socket_path (str, optional): Listen on this Unix socket instead
+
+    Returns:
+        socketserver.BaseServer: Call serve_forever() to start handling jobs
+    """
+    if socket_path:
+        server = _UnixHTTPServer(socket_path, _Handler)
+    else:
+        server = HTTPServer((host, port), _Handler)
+    server.service = service
+    return server
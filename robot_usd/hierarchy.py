@@ -0,0 +1,118 @@
+"""
+Streaming prim hierarchy dumps.
+
+The analysis scripts used to print a recursive tree one print() call at a
+time, which hits Python's recursion limit on deep assets and produces output
+nothing can parse. iter_prim_records() walks the stage with a single
+Usd.PrimRange iterator (no recursion, depth limits enforced by pruning, not
+by filtering), and write_ndjson() streams one JSON object per prim:
+
+    {"path": "/crazyflie/body", "type": "Xform", "depth": 2, "children": 3,
+     "attributes": 4, "timeSamples": 0, "bytes": 96}
+
+"bytes" is the size of the attributes' authored default values (array
+payloads included, time samples excluded). Reading it forces array values to
+be loaded, so it can be switched off for a faster structural dump.
+"""
+
+import json
+
+import numpy as np
+from pxr import Sdf, Usd
+
+
+def _value_size(value):
+    """Approximate the in-memory size of an attribute value in bytes."""
+    if value is None:
+        return 0
+    if isinstance(value, (str, Sdf.AssetPath)):
+        return len(str(value))
+    try:
+        return memoryview(value).nbytes
+    except TypeError:
+        pass
+    try:
+        return np.asarray(value).nbytes
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+def iter_prim_records(stage, prefixes=None, max_depth=None, sizes=True):
+    """
+    Yield one summary dict per prim, in depth-first order.
+
+    Args:
+        stage (Usd.Stage): Stage to inspect
+        prefixes (list, optional): Only walk the subtrees rooted at these prim
+            paths (default: the whole stage)
+        max_depth (int, optional): Deepest level to report, counted in path
+            elements from the root (/robot is depth 1)
+        sizes (bool): Compute the "bytes" field
+
+    Yields:
+        dict: path, type, depth, children, attributes, timeSamples and
+        (if sizes) bytes
+    """
+    if prefixes:
+        roots = [stage.GetPrimAtPath(str(prefix)) for prefix in prefixes]
+        missing = [str(prefix) for prefix, root in zip(prefixes, roots) if not root]
+        if missing:
+            raise ValueError(f"Prims not found: {', '.join(missing)}")
+    else:
+        roots = stage.GetPseudoRoot().GetChildren()
+
+    for root in roots:
+        prim_range = iter(Usd.PrimRange(root))
+        for prim in prim_range:
+            path = prim.GetPath()
+            depth = path.pathElementCount
+            if max_depth is not None and depth >= max_depth:
+                prim_range.PruneChildren()
+                if depth > max_depth:
+                    continue
+
+            attributes = prim.GetAuthoredAttributes()
+            record = {
+                "path": path.pathString,
+                "type": prim.GetTypeName(),
+                "depth": depth,
+                "children": len(prim.GetChildrenNames()),
+                "attributes": len(attributes),
+                "timeSamples": sum(attr.GetNumTimeSamples() for attr in attributes),
+            }
+            if sizes:
+                record["bytes"] = sum(_value_size(attr.Get()) for attr in attributes)
+            yield record
+
+
+def write_ndjson(records, out):
+    """
+    Write records as newline-delimited JSON.
+
+    Args:
+        records (iterable): Dicts from iter_prim_records()
+        out (file): Text stream to write to
+
+    Returns:
+        int: Number of records written
+    """
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, separators=(",", ":")))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def open_for_inspection(input_file, load_payloads=True):
+    """Open a stage, optionally without loading any payloads."""
+    return Usd.Stage.Open(input_file, Usd.Stage.LoadAll if load_payloads else Usd.Stage.LoadNone)
+
+
+def add_inspection_arguments(parser):
+    """Add the shared --json/--prefix/--max-depth/--no-bytes/--no-payloads options to a parser."""
+    parser.add_argument("--json", action="store_true", help="Emit one JSON object per prim (NDJSON)")
+    parser.add_argument("--prefix", action="append", metavar="PATH", help="Only inspect the subtree at PATH (repeatable)")
+    parser.add_argument("--max-depth", type=int, help="Deepest path level to report (/robot is depth 1)")
+    parser.add_argument("--no-bytes", action="store_true", help="Skip the value-size field, which loads array data")
+    parser.add_argument("--no-payloads", action="store_true", help="Open the stage without loading payloads")
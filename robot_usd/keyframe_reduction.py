@@ -0,0 +1,155 @@
+"""
+Keyframe reduction for baked animation.
+
+The generators write one sample per frame, even for motion that linear
+interpolation reproduces exactly, such as a propeller spinning at a constant
+rate. reduce_keyframes() runs after authoring and removes every time sample
+that interpolating between its neighbours reproduces within a tolerance,
+using a Ramer-Douglas-Peucker split on the per-sample interpolation error.
+
+Rotation ops (xformOp:rotate*) use an angular tolerance in degrees; all
+other numeric attributes use a positional tolerance in scene units.
+Quaternion and non-numeric attributes are left untouched.
+
+Kept rotation keys are also never more than DEFAULT_MAX_ROTATION_SPAN
+degrees apart: RealityKit converts rotations to quaternions and slerps
+between keys along the shortest path, so a multi-turn segment (such as a
+propeller spinning at a constant rate, which would otherwise collapse to
+its first and last key) would play the wrong motion on device.
+
+Generators that animate a stage opened from the user's input pass the
+attributes they wrote, so samples that came with the input are kept as is.
+"""
+
+import numpy as np
+from pxr import Gf, Sdf
+
+# Defaults: 0.01 degrees, and 0.1 mm for stages in meters
+DEFAULT_ANGULAR_TOLERANCE = 0.01
+DEFAULT_POSITIONAL_TOLERANCE = 1e-4
+
+# Largest rotation between two kept keys, in degrees (must stay below 180)
+DEFAULT_MAX_ROTATION_SPAN = 120.0
+
+_QUATERNION_TYPES = (Gf.Quatd, Gf.Quatf, Gf.Quath)
+
+
+def _sample_array(values):
+    """Convert sample values into an (N, k) float array, or None if they are not numeric."""
+    if isinstance(values[0], _QUATERNION_TYPES):
+        return None
+    try:
+        array = np.array([np.atleast_1d(np.asarray(value, dtype=np.float64)) for value in values])
+    except (TypeError, ValueError):
+        return None
+    return array if array.ndim == 2 else None
+
+
+def keep_mask(times, values, tolerance, max_span=None):
+    """
+    Choose the samples needed to reproduce a curve within tolerance.
+
+    Args:
+        times (array): (N,) increasing sample times
+        values (array): (N, k) sample values
+        tolerance (float): Largest allowed interpolation error per component
+        max_span (float, optional): Largest allowed change per component
+            between two kept samples; segments spanning more are split even
+            if they interpolate within tolerance
+
+    Returns:
+        numpy.ndarray: (N,) boolean mask of the samples to keep
+    """
+    count = len(times)
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = True
+
+    # A constant curve only needs its first sample
+    if count < 2 or np.abs(values - values[0]).max() <= tolerance:
+        return keep
+
+    keep[-1] = True
+    segments = [(0, count - 1)]
+    while segments:
+        start, end = segments.pop()
+        if end - start < 2:
+            continue
+
+        # Interpolation error of every sample inside the segment
+        fraction = (times[start + 1:end] - times[start]) / (times[end] - times[start])
+        interpolated = values[start] + fraction[:, np.newaxis] * (values[end] - values[start])
+        error = np.abs(values[start + 1:end] - interpolated).max(axis=1)
+
+        worst = int(np.argmax(error))
+        if error[worst] > tolerance:
+            split = start + 1 + worst
+        elif max_span is not None and np.abs(values[end] - values[start]).max() > max_span:
+            split = (start + end) // 2
+        else:
+            continue
+        keep[split] = True
+        segments.append((start, split))
+        segments.append((split, end))
+
+    return keep
+
+
+def reduce_keyframes(stage, angular_tolerance=DEFAULT_ANGULAR_TOLERANCE,
+                     positional_tolerance=DEFAULT_POSITIONAL_TOLERANCE, verbose=True,
+                     attributes=None, max_rotation_span=DEFAULT_MAX_ROTATION_SPAN):
+    """
+    Remove redundant time samples from the stage's edit target layer.
+
+    Args:
+        stage (Usd.Stage): Stage whose edit target holds the samples
+        angular_tolerance (float): Allowed error for rotation ops, in degrees
+        positional_tolerance (float): Allowed error for other attributes
+        verbose (bool): Print the compression summary
+        attributes (list, optional): Usd.Attributes or UsdGeom.XformOps to
+            reduce, such as the keys passed to write_keyframes() (default:
+            every animated attribute in the layer)
+        max_rotation_span (float): Largest rotation between kept keys, in degrees
+
+    Returns:
+        dict: "before" and "after" sample counts and their "ratio"
+    """
+    edit_target = stage.GetEditTarget()
+    layer = edit_target.GetLayer()
+
+    if attributes is not None:
+        attribute_paths = [edit_target.MapToSpecPath((attr.GetAttr() if hasattr(attr, "GetAttr") else attr).GetPath())
+                           for attr in attributes]
+    else:
+        # Collect every animated attribute spec in the layer
+        attribute_paths = []
+        layer.Traverse(Sdf.Path.absoluteRootPath,
+                       lambda path: attribute_paths.append(path) if path.IsPropertyPath() else None)
+
+    before = after = 0
+    removals = []
+    for path in attribute_paths:
+        times = layer.ListTimeSamplesForPath(path)
+        if not times:
+            continue
+        before += len(times)
+        values = _sample_array([layer.QueryTimeSample(path, time) for time in times])
+        if values is None or len(times) < 2:
+            after += len(times)
+            continue
+
+        if path.name.startswith("xformOp:rotate"):
+            keep = keep_mask(np.asarray(times, dtype=np.float64), values, angular_tolerance, max_rotation_span)
+        else:
+            keep = keep_mask(np.asarray(times, dtype=np.float64), values, positional_tolerance)
+        after += int(keep.sum())
+        removals.append((path, [time for time, kept in zip(times, keep) if not kept]))
+
+    with Sdf.ChangeBlock():
+        for path, times in removals:
+            for time in times:
+                layer.EraseTimeSample(path, time)
+
+    ratio = before / after if after else 1.0
+    if verbose and before:
+        print(f"✅ Reduced keyframes from {before} to {after} samples ({ratio:.1f}x)")
+    return {"before": before, "after": after, "ratio": ratio}
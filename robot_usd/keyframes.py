@@ -0,0 +1,123 @@
+"""
+Vectorized keyframe authoring.
+
+Animation curves are evaluated with NumPy for every frame (and every op) at
+once, then written straight into the stage's edit target layer with
+Sdf.Layer.SetTimeSample inside a single Sdf.ChangeBlock. This replaces the
+per-frame math.sin / XformOp.Set(value, time) loops, which pay for Usd value
+resolution and change notification on every sample.
+
+Example:
+
+    frames = frame_times(1, total_frames)
+    angles = sine_wave(frames, 30, total_frames, phase=phases)  # one row per joint
+    write_keyframes(stage, {op: (frames, vec3(x=angles[i])) for i, op in enumerate(ops)})
+"""
+
+import numpy as np
+from pxr import Sdf, Vt
+
+# Vt array types used to convert (N, k) NumPy values into Gf vectors
+_VECTOR_ARRAY_TYPES = {
+    2: Vt.Vec2dArray,
+    3: Vt.Vec3dArray,
+    4: Vt.Vec4dArray,
+}
+
+
+def frame_times(start, end):
+    """Return the frame numbers start..end (inclusive) as a float64 array."""
+    return np.arange(start, end + 1, dtype=np.float64)
+
+
+def sine_wave(times, amplitude, period, phase=0.0):
+    """
+    Evaluate amplitude * sin(2 * pi * times / period + phase).
+
+    Args:
+        times (array): Time codes to evaluate at
+        amplitude (float): Peak value of the wave
+        period (float): Length of one cycle, in time codes
+        phase (float or array): Phase offset in radians. Passing one phase per
+            op returns one row per op.
+
+    Returns:
+        numpy.ndarray: Shape (N,) for a scalar phase, (len(phase), N) otherwise
+    """
+    phase = np.asarray(phase, dtype=np.float64)
+    return amplitude * np.sin(2 * np.pi * np.asarray(times) / period + phase[..., np.newaxis])
+
+
+def linear_ramp(times, rate, offset=0.0):
+    """
+    Evaluate offset + rate * times.
+
+    rate may be one value per op, in which case the result has one row per op.
+    """
+    rate = np.asarray(rate, dtype=np.float64)
+    return offset + rate[..., np.newaxis] * np.asarray(times)
+
+
+def vec3(x=0.0, y=0.0, z=0.0):
+    """Stack per-frame x, y and z components (arrays or scalars) into an (N, 3) array."""
+    return np.stack(np.broadcast_arrays(
+        np.asarray(x, dtype=np.float64),
+        np.asarray(y, dtype=np.float64),
+        np.asarray(z, dtype=np.float64),
+    ), axis=-1)
+
+
+def _to_sample_values(values):
+    """Convert a (N,) or (N, k) array into a list of Python/Gf values."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return values.tolist()
+    array_type = _VECTOR_ARRAY_TYPES.get(values.shape[1]) if values.ndim == 2 else None
+    if array_type is None:
+        raise ValueError(f"Unsupported keyframe value shape {values.shape}")
+    return list(array_type.FromNumpy(np.ascontiguousarray(values)))
+
+
+def write_keyframes(stage, samples):
+    """
+    Author time samples for many attributes in one pass.
+
+    Values are cast by Sdf to each attribute's declared type, so float and
+    double precision ops can share the same NumPy curves.
+
+    Args:
+        stage (Usd.Stage): Stage whose edit target receives the samples
+        samples (dict): Maps a Usd.Attribute or UsdGeom.XformOp to a
+            (times, values) pair. times is a 1-D array of time codes and values
+            is a 1-D array for scalar attributes or an (N, k) array for vector
+            attributes such as double3.
+
+    Returns:
+        int: Number of time samples written
+    """
+    edit_target = stage.GetEditTarget()
+    layer = edit_target.GetLayer()
+
+    # Convert every curve before touching the layer
+    curves = []
+    for attr, (times, values) in samples.items():
+        if hasattr(attr, "GetAttr"):
+            attr = attr.GetAttr()
+        times = np.asarray(times, dtype=np.float64).tolist()
+        values = _to_sample_values(values)
+        if len(times) != len(values):
+            raise ValueError(f"{attr.GetPath()}: got {len(times)} times but {len(values)} values")
+        curves.append((attr, edit_target.MapToSpecPath(attr.GetPath()), times, values))
+
+    written = 0
+    with Sdf.ChangeBlock():
+        for attr, spec_path, times, values in curves:
+            if not layer.GetAttributeAtPath(spec_path):
+                Sdf.JustCreatePrimAttributeInLayer(
+                    layer, spec_path, attr.GetTypeName(), attr.GetVariability(), attr.IsCustom()
+                )
+            for time, value in zip(times, values):
+                layer.SetTimeSample(spec_path, time, value)
+            written += len(times)
+
+    return written
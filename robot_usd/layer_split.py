@@ -0,0 +1,131 @@
+"""
+Separate geometry and animation layers.
+
+The Crazyflie generators author meshes, materials and propeller timeSamples
+into one layer, so any change to the motion rewrites the whole file, most
+of which is mesh data copied from cf2x.usd. save_split_layers() saves a
+generator's stage as three layers instead:
+
+  * <name>_geometry: everything except timeSamples (meshes, materials,
+    lights and the static parts of the transforms),
+  * <name>_animation: only the timeSamples, as overs on the animated
+    attributes, and
+  * <name>: a thin root layer with the stage metadata (default prim, time
+    range, frame rate, loop range) that sublayers the two, animation first.
+
+The composed stage is unchanged. The geometry layer is only rewritten when
+its content differs from the file on disk, so builds that only change the
+motion (such as a generator's --loop variant) author a few KB, and
+incremental packaging keeps the geometry entry of the existing USDZ.
+"""
+
+import os
+
+from pxr import Sdf
+
+# Stage metadata that belongs to the root layer only
+_TIME_METADATA = ("startTimeCode", "endTimeCode", "timeCodesPerSecond", "framesPerSecond", "customLayerData")
+
+
+def split_layer_paths(layer_file):
+    """Return the (geometry, animation) layer paths for a root layer path."""
+    base, extension = os.path.splitext(layer_file)
+    return f"{base}_geometry{extension}", f"{base}_animation{extension}"
+
+
+def _animated_attribute_paths(layer):
+    """Return the paths of the attribute specs in layer that hold timeSamples."""
+    paths = []
+
+    def visit(path):
+        if path.IsPropertyPath() and layer.GetNumTimeSamplesForPath(path):
+            paths.append(path)
+
+    layer.Traverse(Sdf.Path.absoluteRootPath, visit)
+    return paths
+
+
+def _export(layer, layer_file, only_if_changed=False):
+    """
+    Export layer to layer_file, or leave the file alone if only_if_changed
+    is set and it already holds the same content.
+
+    Returns:
+        bool: True if the file was written
+    """
+    if only_if_changed and os.path.exists(layer_file):
+        existing = Sdf.Layer.OpenAsAnonymous(layer_file)
+        if existing and existing.ExportToString() == layer.ExportToString():
+            return False
+    layer.Export(layer_file)
+
+    # A layer opened from this path earlier in the process would be stale
+    loaded = Sdf.Layer.Find(layer_file)
+    if loaded:
+        loaded.Reload(True)
+    return True
+
+
+def save_split_layers(stage, verbose=True):
+    """
+    Save a stage's root layer as a root, a geometry and an animation layer.
+
+    The root layer keeps its path; the other two are written next to it
+    (see split_layer_paths()). Everything must be authored in the root
+    layer, which replaces stage.Save().
+
+    Args:
+        stage (Usd.Stage): Stage whose root layer holds the generated content
+        verbose (bool): Print what was written
+
+    Returns:
+        dict: "geometry" and "animation" layer paths, "geometry_written"
+        (False when the existing geometry layer was up to date) and
+        "animated" attribute count
+    """
+    root = stage.GetRootLayer()
+    geometry_file, animation_file = split_layer_paths(root.realPath)
+    animated = _animated_attribute_paths(root)
+
+    # Geometry: everything except the samples and the stage's time metadata
+    geometry = Sdf.Layer.CreateAnonymous(os.path.basename(geometry_file))
+    geometry.TransferContent(root)
+    for key in _TIME_METADATA:
+        geometry.pseudoRoot.ClearInfo(key)
+    for path in animated:
+        geometry.GetAttributeAtPath(path).ClearInfo("timeSamples")
+
+    # Animation: the samples alone, at the root layer's frame rate
+    animation = Sdf.Layer.CreateAnonymous(os.path.basename(animation_file))
+    for key in ("timeCodesPerSecond", "framesPerSecond"):
+        if root.pseudoRoot.HasInfo(key):
+            animation.pseudoRoot.SetInfo(key, root.pseudoRoot.GetInfo(key))
+    with Sdf.ChangeBlock():
+        for path in animated:
+            Sdf.CreatePrimInLayer(animation, path.GetPrimPath())
+            Sdf.CopySpec(root, path, animation, path)
+            animation.GetAttributeAtPath(path).ClearDefaultValue()
+
+    geometry_written = _export(geometry, geometry_file, only_if_changed=True)
+    _export(animation, animation_file)
+
+    # Root: the stage metadata and the two sublayers
+    metadata = {key: root.pseudoRoot.GetInfo(key) for key in root.pseudoRoot.ListInfoKeys()
+                if key not in ("primChildren", "subLayers", "subLayerOffsets")}
+    with Sdf.ChangeBlock():
+        root.Clear()
+        for key, value in metadata.items():
+            root.pseudoRoot.SetInfo(key, value)
+        root.subLayerPaths = [f"./{os.path.basename(animation_file)}", f"./{os.path.basename(geometry_file)}"]
+    root.Save()
+
+    if verbose:
+        state = "written" if geometry_written else "unchanged"
+        print(f"✅ Saved geometry layer {geometry_file} ({state}) and "
+              f"animation layer {animation_file} ({len(animated)} animated attributes)")
+    return {
+        "geometry": geometry_file,
+        "animation": animation_file,
+        "geometry_written": geometry_written,
+        "animated": len(animated),
+    }
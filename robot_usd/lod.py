@@ -0,0 +1,122 @@
+"""
+Automatic levels of detail for USDZ exports.
+
+The Crazyflie outputs are dominated by cf2x.usd's mesh data, and the only
+light alternative used to be create_simplified_crazyflie.py's hand-built
+cubes and cylinders. decimate_stage() instead reduces every mesh authored in
+a stage's edit target layer to fit a total triangle budget, and
+write_lod_package() turns an exported layer into a separate, lighter USDZ
+per budget, so the real geometry can ship at a device-appropriate cost.
+
+Levels are written as separate USDZ files rather than as a variant set:
+meshes shared through mesh_dedupe prototypes are reached through internal
+references, which do not see variant opinions authored on their ancestors.
+"""
+
+import numpy as np
+from pxr import Gf, Sdf, Usd, UsdUtils, Vt
+
+from robot_usd.mesh_optimization import static_mesh_specs
+from robot_usd.mesh_processing import decimate, triangulate
+
+# Per-point and per-face-vertex data that no longer matches decimated topology
+_TOPOLOGY_INTERPOLATIONS = ("vertex", "varying", "faceVarying")
+
+
+def decimate_stage(stage, triangle_budget, verbose=True):
+    """
+    Decimate every mesh in the stage's edit target layer to fit a triangle budget.
+
+    The budget is shared between meshes in proportion to their triangle
+    counts. Decimated meshes become triangle meshes; their normals and any
+    vertex or face-varying primvars (such as st) are removed, and extents are
+    recomputed.
+
+    Args:
+        stage (Usd.Stage): Stage whose edit target holds the meshes
+        triangle_budget (int): Total triangles allowed across all meshes
+        verbose (bool): Print a summary
+
+    Returns:
+        dict: "meshes" decimated, and "before" and "after" triangle counts
+    """
+    layer = stage.GetEditTarget().GetLayer()
+
+    meshes = []
+    for spec in static_mesh_specs(layer):
+        attributes = spec.attributes
+        triangles, _ = triangulate(attributes["faceVertexCounts"].default, attributes["faceVertexIndices"].default)
+        meshes.append((spec, np.asarray(attributes["points"].default, dtype=np.float64), triangles))
+
+    before = sum(len(triangles) for _, _, triangles in meshes)
+    if before <= triangle_budget:
+        return {"meshes": 0, "before": before, "after": before}
+
+    # Decimate before touching the layer
+    results = []
+    for spec, points, triangles in meshes:
+        share = max(int(triangle_budget * len(triangles) / before), 1)
+        if len(triangles) > share:
+            new_points, new_triangles = decimate(points, triangles, share)
+            # Meshes decimate() could not reduce without emptying them stay as they are
+            if len(new_triangles) < len(triangles):
+                results.append((spec, len(triangles), new_points, new_triangles))
+
+    after = before
+    with Sdf.ChangeBlock():
+        for spec, original_count, points, triangles in results:
+            after -= original_count - len(triangles)
+            attributes = spec.attributes
+            attributes["points"].default = Vt.Vec3fArray.FromNumpy(np.ascontiguousarray(points, dtype=np.float32))
+            attributes["faceVertexCounts"].default = Vt.IntArray.FromNumpy(np.full(len(triangles), 3, dtype=np.int32))
+            attributes["faceVertexIndices"].default = Vt.IntArray.FromNumpy(np.ascontiguousarray(triangles.ravel(), dtype=np.int32))
+            if "extent" in attributes and len(points):
+                low = points.min(axis=0).tolist()
+                high = points.max(axis=0).tolist()
+                attributes["extent"].default = Vt.Vec3fArray([Gf.Vec3f(*low), Gf.Vec3f(*high)])
+
+            # Data laid out per point or per face vertex no longer lines up
+            for name in list(attributes.keys()):
+                if name not in attributes:
+                    continue
+                attribute = attributes[name]
+                interpolation = attribute.GetInfo("interpolation") if attribute.HasInfo("interpolation") else None
+                if name == "normals" or (name.startswith("primvars:") and interpolation in _TOPOLOGY_INTERPOLATIONS):
+                    spec.RemoveProperty(attribute)
+                    if f"{name}:indices" in attributes:
+                        spec.RemoveProperty(attributes[f"{name}:indices"])
+
+    if verbose:
+        print(f"✅ Decimated {len(results)} meshes from {before} to {after} triangles")
+    return {"meshes": len(results), "before": before, "after": after}
+
+
+def write_lod_package(layer_file, triangle_budget, lod_layer_file, usdz_file):
+    """
+    Write a decimated copy of an exported layer and package it as USDZ.
+
+    The source layer and its sublayers (such as the geometry and animation
+    layers written by save_split_layers()) are flattened into an anonymous
+    layer, so nothing is modified on disk or left edited in the layer
+    registry, and the copy is exported as a layer so internal references to
+    shared prototypes are kept.
+
+    Args:
+        layer_file (str): Exported full-detail layer
+        triangle_budget (int): Total triangles allowed in the copy
+        lod_layer_file (str): Path of the decimated layer
+        usdz_file (str): Path of the decimated USDZ
+
+    Returns:
+        bool: True if the package was written
+    """
+    stage = Usd.Stage.Open(UsdUtils.FlattenLayerStack(Usd.Stage.Open(layer_file)))
+    decimate_stage(stage, triangle_budget)
+    stage.GetRootLayer().Export(lod_layer_file)
+    try:
+        UsdUtils.CreateNewUsdzPackage(Sdf.AssetPath(lod_layer_file), usdz_file)
+        print(f"✅ LOD USDZ package ({triangle_budget} triangles) created at {usdz_file}")
+        return True
+    except Exception as e:
+        print(f"❌ Error creating LOD USDZ package: {e}")
+        return False
@@ -0,0 +1,161 @@
+"""
+Loop-aware authoring for periodic animation.
+
+Propeller spin and walking gaits repeat exactly, so baking them over the
+whole playback duration only makes the file grow with the duration. In loop
+mode a generator writes a single period instead: samples from frame start to
+start + period inclusive, so the last sample lands back on the first pose.
+mark_loopable() records the loop range in the layer's customLayerData, and
+the consumer repeats the clip (RealityKit `animation.repeat()`, as in the
+README example).
+
+validate_loop_seam() checks that every animated attribute comes back to its
+starting value at the seam and that its velocity does not change there any
+more abruptly than it does elsewhere in the cycle, so a wrong period shows
+up at build time instead of as a hitch on device.
+"""
+
+import numpy as np
+
+from robot_usd.keyframes import frame_times
+
+
+def common_period(periods, max_frames=10000):
+    """
+    Return the shortest whole number of frames that is a multiple of every period.
+
+    Args:
+        periods (list): Periods of the individual motions, in frames (they
+            need not be whole numbers, e.g. 12.5)
+        max_frames (int): Longest loop to accept
+
+    Returns:
+        int: Loop length in frames
+    """
+    periods = np.asarray(periods, dtype=np.float64)
+    for frames in range(1, max_frames + 1):
+        cycles = frames / periods
+        if np.all(np.abs(cycles - np.round(cycles)) < 1e-6):
+            return frames
+    raise ValueError(f"No common loop of at most {max_frames} frames for periods {periods.tolist()}")
+
+
+def loop_frames(period, start=1):
+    """Return the frames of one loop, start..start + period inclusive."""
+    return frame_times(start, start + period)
+
+
+def mark_loopable(stage, start, end):
+    """
+    Set the stage's time range to one loop and record it as loopable.
+
+    The range is stored as customLayerData["loop"] = {"startTimeCode",
+    "endTimeCode"} on the root layer.
+    """
+    stage.SetStartTimeCode(start)
+    stage.SetEndTimeCode(end)
+    layer = stage.GetRootLayer()
+    data = dict(layer.customLayerData)
+    data["loop"] = {"startTimeCode": float(start), "endTimeCode": float(end)}
+    layer.customLayerData = data
+
+
+def _as_array(value):
+    try:
+        return np.atleast_1d(np.asarray(value, dtype=np.float64))
+    except (TypeError, ValueError):
+        return None
+
+
+def _wrap_degrees(delta):
+    return (delta + 180.0) % 360.0 - 180.0
+
+
+def _seam_kink(values, angular):
+    """
+    Return how much more abruptly the velocity changes at the seam than the
+    motion's own curvature explains.
+
+    The cycle is played as values[0], ..., values[-2], values[0], ...; a
+    curved motion changes its per-frame step at every frame, by about its
+    second derivative, so the change at the seam is compared with the
+    changes on either side of it (which cancels the curvature), and the
+    result is measured against the same quantity elsewhere in the cycle.
+
+    Args:
+        values (array): One sample per frame from start to end inclusive,
+            shape (N + 1, ...)
+        angular (bool): Wrap the steps to [-180, 180) degrees
+
+    Returns:
+        array: Excess velocity change per frame at the seam (0 where it is
+        no rougher than the rest of the cycle), or None for cycles too short
+        to tell
+    """
+    steps = np.diff(values, axis=0)
+    if angular:
+        steps = _wrap_degrees(steps)
+    if len(steps) < 5:
+        return None
+
+    # Change of step at each frame of the repeating cycle (index 0 is the seam)
+    change = steps - np.roll(steps, 1, axis=0)
+    # The part of it that does not follow from the neighbouring frames
+    roughness = np.abs(change - (np.roll(change, 1, axis=0) + np.roll(change, -1, axis=0)) / 2)
+    # Frames next to the seam share its steps, so they are left out
+    interior = roughness[2:-1].max(axis=0)
+    return np.maximum(roughness[0] - 1.5 * interior, 0.0)
+
+
+def validate_loop_seam(stage, tolerance=1e-4, angular_tolerance=0.01, verbose=True):
+    """
+    Check that every animated attribute is continuous across the loop seam.
+
+    The value at the end of the stage's time range must match the value at the
+    start, and the per-frame step must not change at the seam more abruptly
+    than it does in the rest of the cycle (see _seam_kink()). Rotation ops
+    (xformOp:rotate*) are compared modulo 360 degrees.
+
+    Args:
+        stage (Usd.Stage): Stage whose time range is one loop
+        tolerance (float): Allowed mismatch for positional attributes
+        angular_tolerance (float): Allowed mismatch for rotation ops, in degrees
+        verbose (bool): Print the result
+
+    Returns:
+        list: One message per discontinuity (empty if the seam is clean)
+    """
+    start = stage.GetStartTimeCode()
+    end = stage.GetEndTimeCode()
+    times = np.linspace(start, end, int(round(end - start)) + 1)
+
+    issues = []
+    for prim in stage.Traverse():
+        for attr in prim.GetAttributes():
+            if attr.GetNumTimeSamples() < 2:
+                continue
+            values = [_as_array(attr.Get(time)) for time in times]
+            if any(value is None or value.shape != values[0].shape for value in values):
+                continue
+            values = np.stack(values)
+
+            angular = attr.GetName().startswith("xformOp:rotate")
+            limit = angular_tolerance if angular else tolerance
+            jump = values[-1] - values[0]
+            if angular:
+                jump = _wrap_degrees(jump)
+
+            if np.abs(jump).max() > limit:
+                issues.append(f"{attr.GetPath()}: value jumps by {np.abs(jump).max():.6g} at the loop seam")
+                continue
+            kink = _seam_kink(values, angular)
+            if kink is not None and kink.max() > limit:
+                issues.append(f"{attr.GetPath()}: velocity changes by {kink.max():.6g} per frame at the loop seam")
+
+    if verbose:
+        if issues:
+            for issue in issues:
+                print(f"⚠️ Warning: {issue}")
+        else:
+            print(f"✅ Loop seam is continuous (frames {start:g}-{end:g})")
+    return issues
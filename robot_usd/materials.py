@@ -0,0 +1,108 @@
+"""
+Shared UsdPreviewSurface materials.
+
+The generators used to define a Material and Shader for every colored part,
+so the drone's four arms and four motors each got their own copy of the same
+gray. MaterialRegistry hashes the UsdPreviewSurface inputs of every request,
+defines each distinct material once under a shared scope, and binds parts to
+it. Fewer materials mean fewer draw-state changes and smaller files on
+device.
+
+Example:
+
+    materials = MaterialRegistry(stage)
+    materials.bind(prim, diffuseColor=Gf.Vec3f(0.3, 0.3, 0.3), roughness=0.4)
+"""
+
+import hashlib
+
+import numpy as np
+from pxr import Sdf, UsdGeom, UsdShade
+
+# UsdPreviewSurface inputs the registry accepts, with their value types
+PREVIEW_SURFACE_INPUTS = {
+    "diffuseColor": Sdf.ValueTypeNames.Color3f,
+    "emissiveColor": Sdf.ValueTypeNames.Color3f,
+    "specularColor": Sdf.ValueTypeNames.Color3f,
+    "useSpecularWorkflow": Sdf.ValueTypeNames.Int,
+    "metallic": Sdf.ValueTypeNames.Float,
+    "roughness": Sdf.ValueTypeNames.Float,
+    "clearcoat": Sdf.ValueTypeNames.Float,
+    "clearcoatRoughness": Sdf.ValueTypeNames.Float,
+    "opacity": Sdf.ValueTypeNames.Float,
+    "opacityThreshold": Sdf.ValueTypeNames.Float,
+    "ior": Sdf.ValueTypeNames.Float,
+    "occlusion": Sdf.ValueTypeNames.Float,
+}
+
+
+def _inputs_digest(inputs):
+    """Hash input values rounded to float precision, so equal colors share a material."""
+    key = sorted(
+        (name, tuple(np.round(np.atleast_1d(np.asarray(value, dtype=np.float64)), 6).tolist()))
+        for name, value in inputs.items()
+    )
+    return hashlib.sha256(repr(key).encode()).hexdigest()[:12]
+
+
+class MaterialRegistry:
+    """
+    Materials of a stage, one per distinct set of UsdPreviewSurface inputs.
+
+    Args:
+        stage (Usd.Stage): Stage to define materials in
+        scope_path (str): Scope that holds the shared materials
+    """
+
+    def __init__(self, stage, scope_path="/Materials"):
+        self.stage = stage
+        self.scope_path = scope_path
+        self._materials = {}
+
+    def __len__(self):
+        return len(self._materials)
+
+    def material(self, **inputs):
+        """
+        Return the material with these UsdPreviewSurface inputs, defining it
+        on first use.
+
+        Args:
+            **inputs: Input values by name, e.g. diffuseColor=Gf.Vec3f(...),
+                metallic=0.0 (see PREVIEW_SURFACE_INPUTS)
+
+        Returns:
+            UsdShade.Material: The shared material
+        """
+        unknown = [name for name in inputs if name not in PREVIEW_SURFACE_INPUTS]
+        if unknown:
+            raise ValueError(f"Unsupported UsdPreviewSurface input(s): {', '.join(unknown)}")
+
+        digest = _inputs_digest(inputs)
+        material = self._materials.get(digest)
+        if material is not None:
+            return material
+
+        if not self.stage.GetPrimAtPath(self.scope_path):
+            UsdGeom.Scope.Define(self.stage, self.scope_path)
+
+        material_path = f"{self.scope_path}/material_{digest}"
+        material = UsdShade.Material.Define(self.stage, material_path)
+        shader = UsdShade.Shader.Define(self.stage, f"{material_path}/shader")
+        shader.CreateIdAttr("UsdPreviewSurface")
+        for name, value in sorted(inputs.items()):
+            shader.CreateInput(name, PREVIEW_SURFACE_INPUTS[name]).Set(value)
+
+        # Connect shader to material
+        material.CreateOutput("surface", Sdf.ValueTypeNames.Token).ConnectToSource(
+            UsdShade.ConnectableAPI(shader), "surface"
+        )
+
+        self._materials[digest] = material
+        return material
+
+    def bind(self, prim, **inputs):
+        """Bind prim to the shared material with these inputs and return the material."""
+        material = self.material(**inputs)
+        UsdShade.MaterialBindingAPI(prim).Bind(material)
+        return material
@@ -0,0 +1,108 @@
+"""
+Bulk prim copying between stages.
+
+Instead of reading points, faceVertexCounts, faceVertexIndices, normals and
+st one attribute at a time and setting them on a freshly defined Mesh, the
+helpers here copy whole prim subtrees at the Sdf spec level. Array values are
+moved between layers without being decoded into Python, and material binding
+is applied afterwards as a separate pass.
+"""
+
+from pxr import Usd, UsdShade, Sdf
+
+
+def _single_layer_source(prim):
+    """Return the layer holding every opinion in prim's subtree, or None if the subtree is composed."""
+    layer = None
+    for descendant in Usd.PrimRange(prim, Usd.PrimAllPrimsPredicate):
+        prim_stack = descendant.GetPrimStack()
+        if len(prim_stack) != 1 or prim_stack[0].path != descendant.GetPath():
+            return None
+        if layer is None:
+            layer = prim_stack[0].layer
+        elif prim_stack[0].layer != layer:
+            return None
+    return layer
+
+
+def copy_prim_subtrees(source_stage, stage, path_map):
+    """
+    Copy prim subtrees from one stage into the edit target of another.
+
+    Each source prim is copied with all of its descendants, properties and
+    metadata in a single Sdf.CopySpec call, and all copies are authored inside
+    one Sdf.ChangeBlock. Subtrees that come from more than one layer (references,
+    payloads, sublayers) are copied from a flattened version of the source stage.
+
+    Args:
+        source_stage (Usd.Stage): Stage to copy from
+        stage (Usd.Stage): Stage to copy into
+        path_map (dict): Maps source prim paths to destination prim paths
+
+    Returns:
+        list: Destination paths that were copied
+    """
+    edit_target = stage.GetEditTarget()
+    dest_layer = edit_target.GetLayer()
+    flattened_layer = None
+
+    # Resolve where each subtree's specs live before authoring anything
+    copies = []
+    for source_path, dest_path in path_map.items():
+        source_prim = source_stage.GetPrimAtPath(str(source_path))
+        if not source_prim:
+            print(f"⚠️ Warning: Could not find {source_path} in source stage")
+            continue
+
+        source_layer = _single_layer_source(source_prim)
+        if source_layer is None:
+            if flattened_layer is None:
+                flattened_layer = source_stage.Flatten()
+            source_layer = flattened_layer
+
+        dest_spec_path = edit_target.MapToSpecPath(Sdf.Path(str(dest_path)))
+        copies.append((source_layer, source_prim.GetPath(), dest_spec_path))
+
+    copied = []
+    with Sdf.ChangeBlock():
+        for source_layer, source_path, dest_spec_path in copies:
+            parent_path = dest_spec_path.GetParentPath()
+            if not parent_path.IsAbsoluteRootPath():
+                Sdf.CreatePrimInLayer(dest_layer, parent_path)
+
+            if Sdf.CopySpec(source_layer, source_path, dest_layer, dest_spec_path):
+                copied.append(str(dest_spec_path))
+            else:
+                print(f"❌ Error copying {source_path} to {dest_spec_path}")
+
+    return copied
+
+
+def rebind_materials(stage, bindings, roots=()):
+    """
+    Bind materials onto copied prims as a post-pass.
+
+    Copied specs keep the material:binding they had in the source stage, which
+    usually points at a material that does not exist in the new stage. Dangling
+    direct bindings under roots are removed before the new bindings are applied.
+
+    Args:
+        stage (Usd.Stage): Stage holding the copied prims
+        bindings (dict): Maps prim paths to the UsdShade.Material to bind
+        roots (iterable): Copied subtree roots to clear dangling bindings from
+    """
+    for root in roots:
+        root_prim = stage.GetPrimAtPath(str(root))
+        if not root_prim:
+            continue
+        for prim in Usd.PrimRange(root_prim):
+            binding_rel = UsdShade.MaterialBindingAPI(prim).GetDirectBindingRel()
+            if not binding_rel:
+                continue
+            if any(not stage.GetPrimAtPath(target) for target in binding_rel.GetTargets()):
+                prim.RemoveProperty(binding_rel.GetName())
+
+    for prim_path, material in bindings.items():
+        prim = stage.GetPrimAtPath(str(prim_path))
+        if prim:
+            UsdShade.MaterialBindingAPI(prim).Bind(material)
@@ -0,0 +1,137 @@
+"""
+Mesh deduplication.
+
+The Crazyflie has four propellers but only two propeller shapes, and every
+generator used to write full point and index arrays for each of them.
+dedupe_meshes() hashes the geometry of every mesh in a stage's edit target
+layer, writes each shape that occurs more than once a single time as a
+prototype, and turns every use site into a reference to that prototype. Use
+sites keep their own transforms, material bindings and animation; only the
+geometry attributes move to the prototype.
+"""
+
+import hashlib
+
+import numpy as np
+from pxr import Sdf, UsdGeom
+
+# Mesh attributes that define a shape and are moved to the shared prototype
+GEOMETRY_ATTRIBUTES = (
+    "points",
+    "faceVertexCounts",
+    "faceVertexIndices",
+    "holeIndices",
+    "normals",
+    "extent",
+    "orientation",
+    "subdivisionScheme",
+    "primvars:normals",
+    "primvars:normals:indices",
+    "primvars:st",
+    "primvars:st:indices",
+)
+
+
+def _value_bytes(value):
+    """Return the raw bytes of an array or scalar value for hashing."""
+    array = np.asarray(value)
+    if array.dtype == object:
+        return str(value).encode()
+    return np.ascontiguousarray(array).tobytes()
+
+
+def _mesh_digest(layer, path):
+    """
+    Hash the geometry authored on the mesh spec at path.
+
+    Returns:
+        tuple: (hex digest, names of the hashed attributes), or (None, []) when
+        the mesh has no local points or has animated geometry
+    """
+    if not layer.GetPrimAtPath(path):
+        return None, []
+
+    digest = hashlib.sha256()
+    names = []
+    for name in GEOMETRY_ATTRIBUTES:
+        spec = layer.GetAttributeAtPath(path.AppendProperty(name))
+        if not spec:
+            continue
+        if layer.GetNumTimeSamplesForPath(spec.path):
+            return None, []
+        if spec.default is None:
+            continue
+
+        digest.update(f"{name}:{spec.typeName}:{spec.GetInfo('interpolation')}:".encode())
+        digest.update(_value_bytes(spec.default))
+        names.append(name)
+
+    if "points" not in names:
+        return None, []
+    return digest.hexdigest(), names
+
+
+def dedupe_meshes(stage, prototype_root=None, instanceable=False):
+    """
+    Store each repeated mesh shape once and reference it from every use site.
+
+    Args:
+        stage (Usd.Stage): Stage whose edit target holds the mesh specs
+        prototype_root (str, optional): Path of the abstract scope holding the
+            prototypes (default: Prototypes under the default prim)
+        instanceable (bool): Also mark use sites instanceable so renderers can
+            share one copy of the geometry in memory
+
+    Returns:
+        dict: Maps each prototype path to the use-site paths referencing it
+    """
+    edit_target = stage.GetEditTarget()
+    layer = edit_target.GetLayer()
+
+    if prototype_root is None:
+        default_prim = stage.GetDefaultPrim()
+        prototype_root = default_prim.GetPath().AppendChild("Prototypes") if default_prim else "/Prototypes"
+    prototype_root = Sdf.Path(str(prototype_root))
+
+    # Group meshes by geometry hash
+    groups = {}
+    for prim in stage.Traverse():
+        if not prim.IsA(UsdGeom.Mesh):
+            continue
+        spec_path = edit_target.MapToSpecPath(prim.GetPath())
+        digest, names = _mesh_digest(layer, spec_path)
+        if digest:
+            groups.setdefault(digest, (names, []))[1].append(spec_path)
+
+    prototypes = {}
+    with Sdf.ChangeBlock():
+        for digest, (names, paths) in groups.items():
+            if len(paths) < 2:
+                continue
+
+            # The scope is a class so the prototypes themselves are never drawn
+            root_spec = Sdf.CreatePrimInLayer(layer, prototype_root)
+            root_spec.specifier = Sdf.SpecifierClass
+            root_spec.typeName = "Scope"
+
+            prototype_path = prototype_root.AppendChild(f"mesh_{digest[:12]}")
+            prototype_spec = Sdf.CreatePrimInLayer(layer, prototype_path)
+            prototype_spec.specifier = Sdf.SpecifierDef
+            prototype_spec.typeName = "Mesh"
+            for name in names:
+                Sdf.CopySpec(layer, paths[0].AppendProperty(name), layer, prototype_path.AppendProperty(name))
+
+            for path in paths:
+                prim_spec = layer.GetPrimAtPath(path)
+                for name in names:
+                    prim_spec.RemoveProperty(prim_spec.attributes[name])
+                prim_spec.referenceList.Prepend(Sdf.Reference(primPath=prototype_path))
+                if instanceable:
+                    prim_spec.instanceable = True
+
+            prototypes[str(prototype_path)] = [str(path) for path in paths]
+
+    shared = sum(len(paths) for paths in prototypes.values())
+    if prototypes:
+        print(f"✅ Deduplicated {shared} meshes into {len(prototypes)} prototypes")
+    return prototypes
@@ -0,0 +1,306 @@
+"""
+Vertex welding and index reordering for copied meshes.
+
+The generators copy cf2x.usd's meshes verbatim, so every duplicated vertex
+and the exporter's arbitrary face order end up on device, where the AR app
+is vertex-bound once many drones are on screen. optimize_meshes() rewrites
+every static mesh in a stage's edit target layer as a triangle mesh whose
+
+  * vertices are welded within an epsilon (only where normals, texture
+    coordinates and other per-vertex data agree),
+  * triangles are ordered for the post-transform vertex cache, and
+  * vertices are numbered in first-use order, for fetch locality.
+
+Per-vertex, per-face and face-varying primvars follow the new topology.
+Meshes whose topology other data depends on (holes, creases, corners,
+GeomSubsets), or whose data does not match their topology, are left
+untouched and reported. Empty primvars (such as the primvars:st = [] that
+cf2x.usd authors on most meshes) are carried through unchanged.
+
+author_normals() computes smooth normals for meshes that have none, so
+clients no longer derive them on every load, and can write normals as an
+indexed primvar: cf2x.usd's box-like parts repeat the same few normals for
+every vertex of a face, and an index array is much smaller than the copies.
+
+The pass is opt-in: pass optimize=True to a generator, or set
+ROBOT_USD_OPTIMIZE_MESHES=1.
+"""
+
+import os
+
+import numpy as np
+from pxr import Sdf, Vt
+
+from robot_usd.mesh_processing import acmr, cache_order, fetch_order, triangulate, unique_rows, vertex_normals, weld
+
+# Attributes that hold point indices or face indices of the original topology
+_TOPOLOGY_DEPENDENT_ATTRIBUTES = ("holeIndices", "cornerIndices", "creaseIndices")
+
+# Point-based attributes that are not primvars but hold one value per point
+_PER_POINT_ATTRIBUTES = ("velocities", "accelerations")
+
+
+def mesh_optimization_enabled(optimize=False):
+    """Return whether the mesh optimization pass is on for this call and environment."""
+    return optimize or os.environ.get("ROBOT_USD_OPTIMIZE_MESHES", "0") == "1"
+
+
+def static_mesh_specs(layer):
+    """Return the Mesh prim specs in layer that hold static points and faces."""
+    paths = []
+
+    def visit(path):
+        if not path.IsPrimPath():
+            return
+        spec = layer.GetPrimAtPath(path)
+        if spec.typeName != "Mesh":
+            return
+        attributes = spec.attributes
+        if all(name in attributes and attributes[name].HasDefaultValue()
+               and not layer.GetNumTimeSamplesForPath(attributes[name].path)
+               for name in ("points", "faceVertexCounts", "faceVertexIndices")):
+            paths.append(path)
+
+    layer.Traverse(Sdf.Path.absoluteRootPath, visit)
+    return [layer.GetPrimAtPath(path) for path in paths]
+
+
+def _element_attributes(layer, spec):
+    """
+    Return (attribute spec, interpolation, element size) for every array that
+    holds one entry per point, face or face vertex.
+
+    Authored but empty arrays hold no data to reorder and are left as they are.
+
+    Returns:
+        tuple: (elements, None), or (None, reason) if the mesh cannot be rewritten
+    """
+    attributes = spec.attributes
+    if any(child.typeName == "GeomSubset" for child in spec.nameChildren.values()):
+        return None, "has GeomSubsets"
+    for name in _TOPOLOGY_DEPENDENT_ATTRIBUTES:
+        if name in attributes and attributes[name].HasDefaultValue() and len(attributes[name].default):
+            return None, f"has {name}"
+
+    elements = []
+    for name in attributes.keys():
+        if name == "normals" or name in _PER_POINT_ATTRIBUTES or name.startswith("primvars:"):
+            if name.endswith(":indices"):
+                continue
+            attribute = attributes[name]
+            interpolation = attribute.GetInfo("interpolation") if attribute.HasInfo("interpolation") else None
+            if name.startswith("primvars:"):
+                interpolation = interpolation or "constant"
+            else:
+                interpolation = interpolation or "vertex"
+            if interpolation == "constant":
+                continue
+
+            # Indexed primvars are laid out by their indices, not their values
+            # (an empty index array leaves the primvar unindexed)
+            index_name = f"{name}:indices"
+            if index_name in attributes:
+                indices = attributes[index_name]
+                if not indices.HasDefaultValue() or len(indices.default) or layer.GetNumTimeSamplesForPath(indices.path):
+                    attribute = indices
+            if layer.GetNumTimeSamplesForPath(attribute.path) or not attribute.HasDefaultValue():
+                return None, f"{attribute.name} is animated or has no default value"
+            if not len(attribute.default):
+                continue
+            if np.asarray(attribute.default).dtype == object:
+                return None, f"{attribute.name} holds values NumPy cannot reorder"
+            element_size = attributes[name].GetInfo("elementSize") if attributes[name].HasInfo("elementSize") else 1
+            elements.append((attribute, interpolation, element_size or 1))
+    return elements, None
+
+
+def _take(value, count, element_size, selection):
+    """Select entries of a Vt array laid out as count groups of element_size."""
+    array = np.asarray(value)
+    grouped = array.reshape(count, element_size, *array.shape[1:])
+    return type(value).FromNumpy(np.ascontiguousarray(grouped[selection].reshape(-1, *array.shape[1:])))
+
+
+def optimize_meshes(stage, weld_epsilon=1e-6, verbose=True):
+    """
+    Weld, triangulate and reorder every static mesh in the stage's edit target layer.
+
+    Args:
+        stage (Usd.Stage): Stage whose edit target holds the meshes
+        weld_epsilon (float): Welding distance along each axis, in stage units
+        verbose (bool): Print a summary
+
+    Returns:
+        dict: "meshes" rewritten, "vertices" and "triangles" as (before, after),
+        "acmr" (vertex cache misses per triangle) as (before, after), and
+        "skipped" meshes as {path: reason}
+    """
+    layer = stage.GetEditTarget().GetLayer()
+
+    # Compute every mesh before touching the layer
+    results = []
+    skipped = {}
+    vertices = [0, 0]
+    triangle_counts = [0, 0]
+    misses = [0.0, 0.0]
+    for spec in static_mesh_specs(layer):
+        elements, reason = _element_attributes(layer, spec)
+        if elements is None:
+            skipped[str(spec.path)] = reason
+            continue
+        attributes = spec.attributes
+        points = np.asarray(attributes["points"].default, dtype=np.float64)
+        counts = np.asarray(attributes["faceVertexCounts"].default)
+        indices = np.asarray(attributes["faceVertexIndices"].default, dtype=np.int64)
+
+        # Skip meshes whose data does not match their own topology
+        expected = {"vertex": len(points), "varying": len(points), "uniform": len(counts), "faceVarying": len(indices)}
+        mismatched = next((f"{attribute.name} has {len(attribute.default)} values for {interpolation} interpolation"
+                           for attribute, interpolation, element_size in elements
+                           if interpolation not in expected
+                           or len(attribute.default) != expected[interpolation] * element_size), None)
+        if mismatched:
+            skipped[str(spec.path)] = mismatched
+            continue
+
+        # Triangulate face vertices, so face-varying data can follow the corners
+        corners, faces = triangulate(counts, np.arange(len(indices)))
+        triangles = indices[corners]
+        if not len(triangles):
+            skipped[str(spec.path)] = "has no faces"
+            continue
+
+        per_point = [np.asarray(attribute.default).reshape(len(points), -1)
+                     for attribute, interpolation, _ in elements if interpolation in ("vertex", "varying")]
+        representatives, welded, kept = weld(points, triangles, weld_epsilon, per_point)
+        corners, faces = corners[kept], faces[kept]
+
+        order = cache_order(points[representatives], welded)
+        point_order, welded = fetch_order(welded[order], len(representatives))
+        corners, faces = corners[order], faces[order]
+        point_selection = representatives[point_order]
+
+        results.append((spec, elements, len(points), len(counts), len(indices), point_selection, welded, corners, faces))
+        vertices[0] += len(points)
+        vertices[1] += len(point_selection)
+        triangle_counts[0] += len(triangles)
+        triangle_counts[1] += len(welded)
+        misses[0] += acmr(triangles) * len(triangles)
+        misses[1] += acmr(welded) * len(welded)
+
+    with Sdf.ChangeBlock():
+        for spec, elements, point_count, face_count, corner_count, point_selection, welded, corners, faces in results:
+            attributes = spec.attributes
+            points = attributes["points"].default
+            attributes["points"].default = _take(points, point_count, 1, point_selection)
+            attributes["faceVertexCounts"].default = Vt.IntArray.FromNumpy(np.full(len(welded), 3, dtype=np.int32))
+            attributes["faceVertexIndices"].default = Vt.IntArray.FromNumpy(np.ascontiguousarray(welded.ravel(), dtype=np.int32))
+
+            for attribute, interpolation, element_size in elements:
+                if interpolation in ("vertex", "varying"):
+                    attribute.default = _take(attribute.default, point_count, element_size, point_selection)
+                elif interpolation == "uniform":
+                    attribute.default = _take(attribute.default, face_count, element_size, faces)
+                elif interpolation == "faceVarying":
+                    attribute.default = _take(attribute.default, corner_count, element_size, corners.ravel())
+
+    stats = {
+        "meshes": len(results),
+        "vertices": tuple(vertices),
+        "triangles": tuple(triangle_counts),
+        "acmr": tuple(total / count if count else 0.0 for total, count in zip(misses, triangle_counts)),
+        "skipped": skipped,
+    }
+    if verbose:
+        for path, reason in skipped.items():
+            print(f"⚠️ Warning: Not optimizing {path}: {reason}")
+        print(f"✅ Optimized {len(results)} meshes: {vertices[0]} → {vertices[1]} vertices, "
+              f"vertex cache misses per triangle {stats['acmr'][0]:.2f} → {stats['acmr'][1]:.2f}")
+    return stats
+
+
+def _write_normals(spec, normals, interpolation, indexed):
+    """Author normals on a mesh spec, as an indexed primvars:normals if requested."""
+    attributes = spec.attributes
+    normals = np.ascontiguousarray(normals, dtype=np.float32)
+    if not indexed:
+        attribute = attributes["normals"] if "normals" in attributes else Sdf.AttributeSpec(spec, "normals", Sdf.ValueTypeNames.Normal3fArray)
+        attribute.default = Vt.Vec3fArray.FromNumpy(normals)
+        attribute.SetInfo("interpolation", interpolation)
+        return len(normals)
+
+    # primvars:normals takes precedence over normals, so the plain attribute goes
+    if "normals" in attributes:
+        spec.RemoveProperty(attributes["normals"])
+    values, indices = unique_rows(normals)
+    name = "primvars:normals"
+    attribute = attributes[name] if name in attributes else Sdf.AttributeSpec(spec, name, Sdf.ValueTypeNames.Normal3fArray)
+    attribute.default = Vt.Vec3fArray.FromNumpy(values)
+    attribute.SetInfo("interpolation", interpolation)
+    index_name = f"{name}:indices"
+    index_attribute = attributes[index_name] if index_name in attributes else Sdf.AttributeSpec(spec, index_name, Sdf.ValueTypeNames.IntArray)
+    index_attribute.default = Vt.IntArray.FromNumpy(indices.astype(np.int32))
+    return len(values)
+
+
+def author_normals(stage, weighting="angle", indexed=False, verbose=True):
+    """
+    Compute missing normals, and optionally index all normals, for every
+    static mesh in the stage's edit target layer.
+
+    Meshes without normals get smooth per-vertex normals. With indexed=True,
+    every mesh's normals (computed or authored, with any interpolation) are
+    written as primvars:normals holding each distinct normal once, plus
+    primvars:normals:indices.
+
+    Args:
+        stage (Usd.Stage): Stage whose edit target holds the meshes
+        weighting (str): "angle" or "area" weighting of face normals
+        indexed (bool): Write normals as an indexed primvar
+        verbose (bool): Print a summary
+
+    Returns:
+        dict: "computed" and "indexed" mesh counts, and "values" as the
+        number of normal values in the rewritten meshes (before, after;
+        meshes without normals count as 0 before)
+    """
+    layer = stage.GetEditTarget().GetLayer()
+
+    # Compute every mesh before touching the layer
+    updates = []
+    computed = 0
+    values = [0, 0]
+    for spec in static_mesh_specs(layer):
+        attributes = spec.attributes
+        source = next((attributes[name] for name in ("primvars:normals", "normals") if name in attributes), None)
+        if source is None:
+            points = np.asarray(attributes["points"].default, dtype=np.float64)
+            triangles, _ = triangulate(attributes["faceVertexCounts"].default, attributes["faceVertexIndices"].default)
+            normals = vertex_normals(points, triangles, weighting)
+            orientation = attributes["orientation"].default if "orientation" in attributes else None
+            if orientation == "leftHanded":
+                normals = -normals
+            updates.append((spec, normals, "vertex"))
+            computed += 1
+        elif indexed:
+            if source.name == "primvars:normals" and "primvars:normals:indices" in attributes:
+                continue
+            if layer.GetNumTimeSamplesForPath(source.path) or not source.HasDefaultValue():
+                continue
+            normals = np.asarray(source.default)
+            interpolation = source.GetInfo("interpolation") if source.HasInfo("interpolation") else "vertex"
+            values[0] += len(normals)
+            updates.append((spec, normals, interpolation))
+
+    with Sdf.ChangeBlock():
+        for spec, normals, interpolation in updates:
+            values[1] += _write_normals(spec, normals, interpolation, indexed)
+
+    stats = {
+        "computed": computed,
+        "indexed": len(updates) if indexed else 0,
+        "values": tuple(values),
+    }
+    if verbose:
+        print(f"✅ Wrote normals for {len(updates)} meshes ({computed} computed): {values[0]} → {values[1]} normal values")
+    return stats
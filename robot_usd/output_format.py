@@ -0,0 +1,52 @@
+"""
+Layer format selection for generated files.
+
+Every generator exports an intermediate layer and then packages it into a
+.usdz. Text (.usda) layers are easy to read and diff, but binary crate
+(.usdc) layers are faster to write, faster for RealityKit to parse and
+several times smaller on disk.
+
+Generators take an output_format argument ("usda" or "usdc"). When it is
+None they fall back to the process-wide default, which is "usda" unless
+changed with set_default_output_format() or the ROBOT_USD_OUTPUT_FORMAT
+environment variable.
+"""
+
+import os
+
+# Layer formats the generators can write before packaging
+OUTPUT_FORMATS = ("usda", "usdc")
+
+_default_output_format = os.environ.get("ROBOT_USD_OUTPUT_FORMAT", "usda")
+
+
+def resolve_output_format(output_format=None):
+    """Return output_format, or the default when it is None, after validating it."""
+    output_format = output_format or _default_output_format
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}' (expected one of {', '.join(OUTPUT_FORMATS)})")
+    return output_format
+
+
+def set_default_output_format(output_format):
+    """Set the layer format used by every generator that is not given one explicitly."""
+    global _default_output_format
+    _default_output_format = resolve_output_format(output_format)
+
+
+def layer_path(path, output_format=None):
+    """Return path with its extension replaced by the one for output_format."""
+    return f"{os.path.splitext(path)[0]}.{resolve_output_format(output_format)}"
+
+
+def is_crate_file(path):
+    """Return True if the file at path is a binary crate layer, whatever its extension."""
+    with open(path, "rb") as f:
+        return f.read(8) == b"PXR-USDC"
+
+
+def add_output_format_argument(parser):
+    """Add the shared --format option to an argparse parser."""
+    parser.add_argument('--format', dest='output_format', choices=OUTPUT_FORMATS, default=None,
+                        help='Intermediate layer format: usda (text) or usdc (binary crate) '
+                             f'(default: {_default_output_format}, or $ROBOT_USD_OUTPUT_FORMAT)')
@@ -0,0 +1,247 @@
+"""
+UsdSkel conversion for articulated robots.
+
+animate_g1.py and animate_b2.py drive a robot by adding a rotate op to every
+joint prim, so each joint carries its own timeSamples array and a viewer has
+to re-resolve dozens of transform stacks per frame. convert_to_skeleton()
+turns the link hierarchy into a single UsdSkel Skeleton plus one
+SkelAnimation whose translations and rotations arrays hold every joint for
+each time sample, and rigidly binds each link's meshes to its joint. For a
+29-DoF humanoid that is two animated attributes instead of one per joint,
+and RealityKit evaluates it on its GPU skinning path.
+
+The link tree comes from the physics joints (body0 is the parent link, body1
+the child). Stages without physics joints fall back to the Xform namespace
+hierarchy. Link transforms are sampled through UsdGeom.XformCache, so the
+conversion works however the source animation was authored.
+"""
+
+import numpy as np
+from pxr import Gf, Sdf, Usd, UsdGeom, UsdPhysics, UsdSkel, Vt
+
+from robot_usd.keyframes import frame_times
+from robot_usd.mesh_dedupe import GEOMETRY_ATTRIBUTES
+
+# Mesh attributes copied onto the skinned meshes besides the geometry
+_SHADING_ATTRIBUTES = ("primvars:displayColor", "primvars:displayOpacity", "doubleSided")
+
+
+def link_hierarchy(stage, root_path):
+    """
+    Find the links of an articulated robot and their parents.
+
+    Args:
+        stage (Usd.Stage): Stage holding the robot
+        root_path (str): Robot root prim
+
+    Returns:
+        list: (link path, parent link path or None) pairs, parents first
+    """
+    root = stage.GetPrimAtPath(str(root_path))
+    if not root:
+        return []
+
+    # Physics joints connect a parent link (body0) to a child link (body1)
+    parents = {}
+    for prim in Usd.PrimRange(root, Usd.TraverseInstanceProxies()):
+        if not prim.IsA(UsdPhysics.Joint):
+            continue
+        joint = UsdPhysics.Joint(prim)
+        body0 = joint.GetBody0Rel().GetTargets()
+        body1 = joint.GetBody1Rel().GetTargets()
+        if body0 and body1:
+            parents[body1[0]] = body0[0]
+
+    # Without physics joints, use the Xform namespace hierarchy
+    if not parents:
+        links = [prim.GetPath() for prim in Usd.PrimRange(root) if prim.IsA(UsdGeom.Xform)]
+        link_set = set(links)
+        for link in links:
+            ancestor = link.GetParentPath()
+            while not ancestor.IsAbsoluteRootPath() and ancestor not in link_set:
+                ancestor = ancestor.GetParentPath()
+            parents[link] = None if ancestor.IsAbsoluteRootPath() else ancestor
+
+    children = {}
+    for child, parent in parents.items():
+        children.setdefault(parent, []).append(child)
+    roots = sorted({parent for parent in parents.values() if parent is not None and parent not in parents})
+    roots += children.get(None, [])
+
+    # Breadth-first order so every parent precedes its children
+    ordered = []
+    queue = [(link, None) for link in sorted(roots)]
+    seen = set()
+    while queue:
+        link, parent = queue.pop(0)
+        if link in seen:
+            continue
+        seen.add(link)
+        ordered.append((link, parent))
+        queue.extend((child, link) for child in sorted(children.get(link, [])))
+    return ordered
+
+
+def _joint_tokens(hierarchy):
+    """Name each joint by its chain of link names, e.g. "pelvis/left_hip_pitch_link"."""
+    tokens = {}
+    for link, parent in hierarchy:
+        name = link.name
+        tokens[link] = f"{tokens[parent]}/{name}" if parent is not None else name
+    return [tokens[link] for link, _ in hierarchy]
+
+
+def _local_transforms(stage, hierarchy, time):
+    """Return (world, local) Vt.Matrix4dArrays of every link at time."""
+    cache = UsdGeom.XformCache(time)
+    world = {}
+    local = []
+    for link, parent in hierarchy:
+        world[link] = cache.GetLocalToWorldTransform(stage.GetPrimAtPath(link))
+        local.append(world[link] * world[parent].GetInverse() if parent is not None else world[link])
+    return Vt.Matrix4dArray([world[link] for link, _ in hierarchy]), Vt.Matrix4dArray(local)
+
+
+def _link_meshes(stage, root_path, hierarchy):
+    """Map each visual mesh under root_path to the index of its nearest link."""
+    index = {link: i for i, (link, _) in enumerate(hierarchy)}
+    meshes = []
+    root = stage.GetPrimAtPath(str(root_path))
+    for prim in Usd.PrimRange(root, Usd.TraverseInstanceProxies()):
+        if not prim.IsA(UsdGeom.Mesh) or "collision" in prim.GetPath().pathString.lower():
+            continue
+        ancestor = prim.GetPath()
+        while not ancestor.IsAbsoluteRootPath() and ancestor not in index:
+            ancestor = ancestor.GetParentPath()
+        if ancestor in index:
+            meshes.append((prim, index[ancestor]))
+    return meshes
+
+
+def convert_to_skeleton(source_stage, stage, root_path, frames, skel_root_path="/Robot", bind_time=None):
+    """
+    Author a skinned, UsdSkel-animated copy of an articulated robot.
+
+    Args:
+        source_stage (Usd.Stage): Stage holding the animated robot
+        stage (Usd.Stage): Stage to author the SkelRoot into
+        root_path (str): Robot root prim in source_stage
+        frames (array): Frames to sample the animation at
+        skel_root_path (str): Path of the SkelRoot in stage
+        bind_time (float, optional): Time of the bind pose (default: the first
+            frame, so animated links without default values still resolve)
+
+    Returns:
+        dict: "joints" and "meshes" counts, or None if no links were found
+    """
+    hierarchy = link_hierarchy(source_stage, root_path)
+    if not hierarchy:
+        return None
+
+    tokens = _joint_tokens(hierarchy)
+    bind_time = frames[0] if bind_time is None else bind_time
+    bind_world, bind_local = _local_transforms(source_stage, hierarchy, bind_time)
+
+    UsdSkel.Root.Define(stage, skel_root_path)
+    skeleton = UsdSkel.Skeleton.Define(stage, f"{skel_root_path}/Skeleton")
+    skeleton.CreateJointsAttr(tokens)
+    skeleton.CreateBindTransformsAttr(bind_world)
+    skeleton.CreateRestTransformsAttr(bind_local)
+    _, _, bind_scales = UsdSkel.DecomposeTransforms(bind_local)
+
+    animation = UsdSkel.Animation.Define(stage, f"{skel_root_path}/Animation")
+    animation.CreateJointsAttr(tokens)
+    UsdSkel.BindingAPI.Apply(skeleton.GetPrim()).CreateAnimationSourceRel().SetTargets([animation.GetPath()])
+
+    # Sample every link once per frame and pack the joints into one array per sample
+    translations = []
+    rotations = []
+    for time in frames:
+        _, local = _local_transforms(source_stage, hierarchy, time)
+        translation, rotation, _ = UsdSkel.DecomposeTransforms(local)
+        translations.append(translation)
+        rotations.append(rotation)
+    animation.CreateScalesAttr(bind_scales)
+
+    # Rigid links only rotate about their joints, so translations are usually constant
+    translation_values = np.array([np.asarray(value) for value in translations])
+    translations_attr = animation.CreateTranslationsAttr()
+    rotations_attr = animation.CreateRotationsAttr()
+    curves = [(rotations_attr, rotations)]
+    if np.abs(translation_values - translation_values[0]).max() > 1e-6:
+        curves.append((translations_attr, translations))
+    else:
+        translations_attr.Set(translations[0])
+
+    edit_target = stage.GetEditTarget()
+    layer = edit_target.GetLayer()
+    with Sdf.ChangeBlock():
+        for attr, values in curves:
+            spec_path = edit_target.MapToSpecPath(attr.GetPath())
+            for time, value in zip(np.asarray(frames, dtype=np.float64).tolist(), values):
+                layer.SetTimeSample(spec_path, time, value)
+
+    # Copy each visual mesh with an identity transform and bind it rigidly to its link
+    meshes = _link_meshes(source_stage, root_path, hierarchy)
+    bind_cache = UsdGeom.XformCache(bind_time)
+    used_paths = set()
+    for source_mesh, joint_index in meshes:
+        mesh_path = f"{skel_root_path}/Geom/{hierarchy[joint_index][0].name}/{source_mesh.GetName()}"
+        suffix = 1
+        while mesh_path in used_paths:
+            mesh_path = f"{skel_root_path}/Geom/{hierarchy[joint_index][0].name}/{source_mesh.GetName()}_{suffix}"
+            suffix += 1
+        used_paths.add(mesh_path)
+
+        mesh = UsdGeom.Mesh.Define(stage, mesh_path)
+        for name in GEOMETRY_ATTRIBUTES + _SHADING_ATTRIBUTES:
+            source_attr = source_mesh.GetAttribute(name)
+            if source_attr and source_attr.HasAuthoredValue():
+                attr = mesh.GetPrim().CreateAttribute(name, source_attr.GetTypeName())
+                attr.Set(source_attr.Get(bind_time))
+                interpolation = source_attr.GetMetadata("interpolation")
+                if interpolation:
+                    attr.SetMetadata("interpolation", interpolation)
+
+        binding = UsdSkel.BindingAPI.Apply(mesh.GetPrim())
+        binding.CreateSkeletonRel().SetTargets([skeleton.GetPath()])
+        binding.CreateJointIndicesPrimvar(True, 1).Set(Vt.IntArray([joint_index]))
+        binding.CreateJointWeightsPrimvar(True, 1).Set(Vt.FloatArray([1.0]))
+        binding.CreateGeomBindTransformAttr(Gf.Matrix4d(bind_cache.GetLocalToWorldTransform(source_mesh)))
+
+    return {"joints": len(tokens), "meshes": len(meshes)}
+
+
+def create_skeleton_stage(source_stage, layer_file, skel_root_path="/Robot"):
+    """
+    Create a new stage holding the UsdSkel version of source_stage's robot.
+
+    The time range, frame rate, up axis and meters per unit are copied from
+    source_stage, and the default prim is converted at every frame.
+
+    Args:
+        source_stage (Usd.Stage): Stage holding the animated robot
+        layer_file (str): Path of the new layer
+        skel_root_path (str): Path of the SkelRoot, which becomes the default prim
+
+    Returns:
+        tuple: (Usd.Stage, stats dict from convert_to_skeleton), or (None, None)
+        if the robot has no links
+    """
+    root = source_stage.GetDefaultPrim()
+    if not root:
+        return None, None
+
+    stage = Usd.Stage.CreateNew(layer_file)
+    stage.SetTimeCodesPerSecond(source_stage.GetTimeCodesPerSecond())
+    stage.SetStartTimeCode(source_stage.GetStartTimeCode())
+    stage.SetEndTimeCode(source_stage.GetEndTimeCode())
+    UsdGeom.SetStageUpAxis(stage, UsdGeom.GetStageUpAxis(source_stage))
+    UsdGeom.SetStageMetersPerUnit(stage, UsdGeom.GetStageMetersPerUnit(source_stage))
+
+    frames = frame_times(source_stage.GetStartTimeCode(), source_stage.GetEndTimeCode())
+    stats = convert_to_skeleton(source_stage, stage, root.GetPath(), frames, skel_root_path)
+    if stats is None:
+        return None, None
+    stage.SetDefaultPrim(stage.GetPrimAtPath(skel_root_path))
+    return stage, stats
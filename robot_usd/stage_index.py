@@ -0,0 +1,77 @@
+"""
+Single-pass prim classification.
+
+The generators used to walk stage.Traverse() once per question (joints,
+then Xformables, then body/root parts, then materials), lowercasing every
+path string each time. StageIndex walks the stage once, lowercases each path
+once, and buckets prims by role so later lookups are plain list accesses.
+"""
+
+from pxr import UsdGeom, UsdShade
+
+# Role name -> test(prim, lowercase_path)
+ROLE_TESTS = {
+    "joint": lambda prim, path: "joint" in path,
+    "leg_joint": lambda prim, path: "joint" in path and "leg" in path,
+    "body": lambda prim, path: "body" in path,
+    "body_or_root": lambda prim, path: "body" in path or "root" in path,
+    "material": lambda prim, path: prim.IsA(UsdShade.Material),
+    "mesh": lambda prim, path: prim.IsA(UsdGeom.Mesh),
+    "xformable": lambda prim, path: prim.IsA(UsdGeom.Xformable),
+}
+
+
+class StageIndex:
+    """
+    Prim paths of a stage bucketed by role, built in one traversal.
+
+    Each bucket keeps stage.Traverse() order, so results match what the old
+    per-role traversals returned. The index is a snapshot: prims added or
+    removed after it is built are not reflected.
+
+    Args:
+        stage (Usd.Stage): Stage to index
+        roles (iterable, optional): Subset of ROLE_TESTS to compute. All roles
+            are computed by default.
+    """
+
+    def __init__(self, stage, roles=None):
+        tests = [(role, ROLE_TESTS[role]) for role in (roles or ROLE_TESTS)]
+        self._buckets = {role: [] for role, _ in tests}
+        self.prim_count = 0
+
+        for prim in stage.Traverse():
+            self.prim_count += 1
+            path = prim.GetPath()
+            path_lower = path.pathString.lower()
+            for role, test in tests:
+                if test(prim, path_lower):
+                    self._buckets[role].append(path)
+
+    def paths(self, role):
+        """Return the prim paths classified as role, in traversal order."""
+        return self._buckets[role]
+
+    @property
+    def joints(self):
+        return self._buckets["joint"]
+
+    @property
+    def leg_joints(self):
+        return self._buckets["leg_joint"]
+
+    @property
+    def bodies(self):
+        return self._buckets["body"]
+
+    @property
+    def materials(self):
+        return self._buckets["material"]
+
+    @property
+    def meshes(self):
+        return self._buckets["mesh"]
+
+    @property
+    def xformables(self):
+        return self._buckets["xformable"]
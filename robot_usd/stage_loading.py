@@ -0,0 +1,188 @@
+"""
+Partial stage loading.
+
+Most generators read a few subtrees of their input (the Crazyflie scripts
+only copy /crazyflie/body/body_visual and the four propellers) but used to
+open and compose the whole file, including collision meshes, sensors and
+physics prims they never touch. open_stage() opens the input with a
+Usd.StagePopulationMask built from the paths a generator declares, so only
+those subtrees (and their ancestors) are composed, and with load rules that
+only load payloads inside them.
+
+Set ROBOT_USD_MASKED_LOAD=0 to open every input in full, e.g. to compare
+outputs.
+
+Long-running processes (see generation_service.py) can keep source stages
+open between jobs with a SourceStageCache. While a cache is active,
+open_stage() returns the cached stage with its session layer as the edit
+target, so a generator's edits never reach the cached layers; release()
+clears them again after the job.
+"""
+
+import contextlib
+import os
+from collections import OrderedDict
+
+from pxr import Sdf, Usd
+
+# Cache consulted by open_stage(), set by SourceStageCache.activate()
+_active_cache = None
+
+
+def masked_loading_enabled(masked=True):
+    """Return whether masked loading is on for this call and environment."""
+    return masked and os.environ.get("ROBOT_USD_MASKED_LOAD", "1") != "0"
+
+
+def _check_paths(paths):
+    """Reject a single path string, which would otherwise be read character by character."""
+    if isinstance(paths, (str, Sdf.Path)):
+        raise TypeError(f"paths must be a list of prim paths, not a single path ({paths})")
+
+
+def _open_stage(input_file, paths, masked, load_payloads):
+    """Open input_file with a population mask and load rules built from paths."""
+    if not paths or not masked_loading_enabled(masked):
+        return Usd.Stage.Open(input_file, Usd.Stage.LoadAll if load_payloads else Usd.Stage.LoadNone)
+
+    mask = Usd.StagePopulationMask()
+    for path in paths:
+        mask.Add(Sdf.Path(str(path)))
+
+    # Open without payloads, then load only the ones under the declared paths
+    stage = Usd.Stage.OpenMasked(input_file, mask, Usd.Stage.LoadNone)
+    if load_payloads:
+        rules = Usd.StageLoadRules.LoadNone()
+        for path in paths:
+            rules.AddRule(Sdf.Path(str(path)), Usd.StageLoadRules.AllRule)
+        stage.SetLoadRules(rules)
+    return stage
+
+
+def open_stage(input_file, paths=None, masked=True, load_payloads=True):
+    """
+    Open a stage with only the subtrees at paths populated.
+
+    Args:
+        input_file (str): USD file to open
+        paths (list, optional): Prim paths the caller reads; their ancestors are
+            populated too, but not their ancestors' other children (default:
+            open everything)
+        masked (bool): Set to False to open the whole stage regardless of paths
+        load_payloads (bool): Load the payloads inside paths (or everywhere,
+            when the stage is not masked)
+
+    Returns:
+        Usd.Stage: The opened stage, or the cached one while a
+        SourceStageCache is active
+
+    Raises:
+        TypeError: If paths is a single path instead of a list
+    """
+    _check_paths(paths)
+    if _active_cache is not None:
+        return _active_cache.open(input_file, paths, masked, load_payloads)
+    return _open_stage(input_file, paths, masked, load_payloads)
+
+
+def _layer_mtimes(stage):
+    """Return the modification time of every file-backed layer the stage uses."""
+    mtimes = {}
+    for layer in stage.GetUsedLayers():
+        path = layer.realPath
+        if path and not layer.anonymous and os.path.exists(path):
+            mtimes[path] = os.path.getmtime(path)
+    return mtimes
+
+
+class SourceStageCache:
+    """
+    Least recently used cache of opened source stages.
+
+    Stages are keyed by file, population mask and payload loading, and are
+    reloaded when the modification time of any layer they use changes.
+
+    Args:
+        max_stages (int): Number of stages kept open
+    """
+
+    def __init__(self, max_stages=4):
+        self.max_stages = max_stages
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._stages = OrderedDict()
+        self._borrowed = []
+
+    def __len__(self):
+        return len(self._stages)
+
+    def open(self, input_file, paths=None, masked=True, load_payloads=True):
+        """
+        Return the cached stage for input_file, opening or reloading it if needed.
+
+        The stage's session layer is made its edit target; call release()
+        once the caller is done with it.
+
+        Args:
+            input_file (str): USD file to open
+            paths (list, optional): Prim paths to populate (see open_stage())
+            masked (bool): Set to False to open the whole stage regardless of paths
+            load_payloads (bool): Load the payloads inside paths
+
+        Returns:
+            Usd.Stage: The cached stage
+
+        Raises:
+            TypeError: If paths is a single path instead of a list
+        """
+        _check_paths(paths)
+        mask = tuple(sorted(str(path) for path in paths)) if paths and masked_loading_enabled(masked) else None
+        key = (os.path.realpath(input_file), mask, load_payloads)
+
+        entry = self._stages.get(key)
+        if entry is None:
+            self.misses += 1
+            stage = _open_stage(input_file, paths, masked, load_payloads)
+            entry = self._stages[key] = [stage, _layer_mtimes(stage)]
+            while len(self._stages) > self.max_stages:
+                self._stages.popitem(last=False)
+        else:
+            self.hits += 1
+            self._stages.move_to_end(key)
+            if _layer_mtimes(entry[0]) != entry[1]:
+                self.reloads += 1
+                entry[0].Reload()
+                entry[1] = _layer_mtimes(entry[0])
+
+        stage = entry[0]
+        stage.SetEditTarget(Usd.EditTarget(stage.GetSessionLayer()))
+        self._borrowed.append(stage)
+        return stage
+
+    def release(self):
+        """Discard the edits made to every stage handed out since the last release()."""
+        for stage in self._borrowed:
+            stage.GetSessionLayer().Clear()
+            stage.SetEditTarget(Usd.EditTarget(stage.GetRootLayer()))
+        self._borrowed = []
+
+    def clear(self):
+        """Close every cached stage."""
+        self.release()
+        self._stages.clear()
+
+    def paths(self):
+        """Return the files of the cached stages, least recently used first."""
+        return [key[0] for key in self._stages]
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make open_stage() use this cache within a with block, releasing stages on exit."""
+        global _active_cache
+        previous, _active_cache = _active_cache, self
+        try:
+            yield self
+        finally:
+            _active_cache = previous
+            self.release()
@@ -0,0 +1,282 @@
+"""
+Streaming replay of recorded robot logs.
+
+A log is a table with one row per recorded instant and named columns:
+
+    time                      seconds since the start of the recording
+    <joint name>              joint angle, one column per joint (radians by default)
+    base_x, base_y, base_z    optional base position
+    base_qw, base_qx, base_qy, base_qz
+                              optional base orientation quaternion
+
+Supported files:
+
+    .csv    header row with the column names
+    .npz    "columns" (C,) string array and "data" (T, C) array
+    .npy    (T, C) array, memory-mapped; column names from a sidecar <file>.json
+    .bin    raw (T, C) array, memory-mapped; sidecar <file>.json gives
+            {"columns": [...], "dtype": "float32"}
+
+TrajectoryLog yields the table in fixed-size chunks, and bake_trajectory_log()
+resamples each chunk to the stage frame rate and writes it straight into the
+edit target layer. Only one chunk (plus one carried-over row) is held in
+memory, so hour-long sessions can be replayed from disk.
+"""
+
+import csv
+import itertools
+import json
+import os
+import zipfile
+
+import numpy as np
+from pxr import Gf, Sdf, UsdGeom, UsdPhysics
+
+# Column names of the optional base pose
+BASE_POSITION_COLUMNS = ("base_x", "base_y", "base_z")
+BASE_ORIENTATION_COLUMNS = ("base_qw", "base_qx", "base_qy", "base_qz")
+
+
+def _read_sidecar(path):
+    sidecar = f"{path}.json"
+    if not os.path.exists(sidecar):
+        return {}
+    with open(sidecar) as f:
+        return json.load(f)
+
+
+class TrajectoryLog:
+    """
+    A recorded log read in chunks of at most chunk_rows rows.
+
+    Args:
+        path (str): .csv, .npz, .npy or .bin log file
+        chunk_rows (int): Rows per chunk, which bounds memory use
+        columns (list, optional): Column names, overriding the file or sidecar
+        dtype (str, optional): Element type of a .bin file (default: from the
+            sidecar, else float32)
+    """
+
+    def __init__(self, path, chunk_rows=4096, columns=None, dtype=None):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.format = os.path.splitext(path)[1].lower().lstrip(".")
+        sidecar = _read_sidecar(path) if self.format in ("npy", "bin") else {}
+        self.dtype = np.dtype(dtype or sidecar.get("dtype", "float32"))
+
+        if columns is not None:
+            self.columns = list(columns)
+        elif self.format == "csv":
+            with open(path, newline="") as f:
+                self.columns = [name.strip() for name in next(csv.reader(f))]
+        elif self.format == "npz":
+            with np.load(path) as archive:
+                self.columns = [str(name) for name in archive["columns"]]
+        elif self.format in ("npy", "bin"):
+            self.columns = list(sidecar.get("columns", []))
+        else:
+            raise ValueError(f"Unsupported log format '{self.format}' (expected csv, npz, npy or bin)")
+
+        if "time" not in self.columns:
+            raise ValueError(f"{path}: log has no 'time' column")
+
+    def __iter__(self):
+        if self.format == "csv":
+            return self._csv_chunks()
+        if self.format == "npz":
+            return self._npz_chunks()
+        if self.format == "npy":
+            return self._array_chunks(np.load(self.path, mmap_mode="r"))
+        array = np.memmap(self.path, dtype=self.dtype, mode="r")
+        return self._array_chunks(array.reshape(-1, len(self.columns)))
+
+    def _csv_chunks(self):
+        with open(self.path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader)
+            while True:
+                rows = list(itertools.islice(reader, self.chunk_rows))
+                if not rows:
+                    return
+                yield np.array(rows, dtype=np.float64)
+
+    def _npz_chunks(self):
+        # Read the "data" member through the zip stream instead of loading it whole
+        with zipfile.ZipFile(self.path) as archive, archive.open("data.npy") as member:
+            version = np.lib.format.read_magic(member)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(member)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(member)
+            if fortran_order or len(shape) != 2:
+                raise ValueError(f"{self.path}: 'data' must be a C-ordered 2-D array")
+            row_bytes = shape[1] * dtype.itemsize
+            for start in range(0, shape[0], self.chunk_rows):
+                rows = min(self.chunk_rows, shape[0] - start)
+                chunk = np.frombuffer(member.read(rows * row_bytes), dtype=dtype)
+                yield chunk.reshape(rows, shape[1]).astype(np.float64)
+
+    def _array_chunks(self, array):
+        if array.ndim != 2 or array.shape[1] != len(self.columns):
+            raise ValueError(f"{self.path}: expected {len(self.columns)} columns, got shape {array.shape}")
+        for start in range(0, array.shape[0], self.chunk_rows):
+            yield np.asarray(array[start:start + self.chunk_rows], dtype=np.float64)
+
+
+def _joint_target(stage, prim):
+    """
+    Return (Xformable prim to rotate, axis) for a joint prim.
+
+    Physics joints are not transformable themselves, so the rotation goes on
+    the child link they connect (body1), around the joint's physics:axis.
+    """
+    axis = "X"
+    joint = UsdPhysics.RevoluteJoint(prim)
+    if joint and joint.GetAxisAttr().Get():
+        axis = str(joint.GetAxisAttr().Get())
+
+    if prim.IsA(UsdGeom.Xformable):
+        return prim, axis
+    physics_joint = UsdPhysics.Joint(prim)
+    if physics_joint:
+        bodies = physics_joint.GetBody1Rel().GetTargets()
+        if bodies and stage.GetPrimAtPath(bodies[0]).IsA(UsdGeom.Xformable):
+            return stage.GetPrimAtPath(bodies[0]), axis
+    return None, axis
+
+
+def _add_rotate_op(xformable, axis):
+    add_op = {"X": xformable.AddRotateXOp, "Y": xformable.AddRotateYOp, "Z": xformable.AddRotateZOp}[axis]
+    return add_op(UsdGeom.XformOp.PrecisionDouble, "replay")
+
+
+def _align_hemispheres(quaternions):
+    """
+    Flip quaternions so each lies in the hemisphere of its predecessor.
+
+    q and -q are the same rotation, but interpolating between them passes
+    through zero; after alignment, neighbouring rows are never more than
+    180 degrees apart along the 4D arc and interpolate the short way.
+
+    Args:
+        quaternions (array): (N, 4) quaternions, one per row
+
+    Returns:
+        numpy.ndarray: (N, 4) quaternions with the first row unchanged
+    """
+    quaternions = np.asarray(quaternions, dtype=np.float64)
+    dots = np.einsum("ij,ij->i", quaternions[1:], quaternions[:-1])
+    signs = np.cumprod(np.concatenate([[1.0], np.where(dots < 0, -1.0, 1.0)]))
+    return quaternions * signs[:, np.newaxis]
+
+
+def bake_trajectory_log(stage, log, joint_paths, base_path=None, fps=None, angle_unit="rad", start_frame=1):
+    """
+    Stream a recorded log onto joint prims as time samples.
+
+    Each log column whose name matches the name of one of joint_paths drives a
+    single-axis rotate op on that prim, or on the child link of a physics
+    joint (the axis comes from physics:axis for revolute joints). Base pose
+    columns drive a translate and an orient op on base_path. Samples are
+    linearly resampled to one per frame.
+
+    Args:
+        stage (Usd.Stage): Stage whose edit target receives the samples
+        log (TrajectoryLog): Log to replay
+        joint_paths (list): Candidate joint prim paths
+        base_path (str, optional): Prim that receives the base pose
+        fps (float, optional): Frame rate to resample to (default: the stage's
+            timeCodesPerSecond)
+        angle_unit (str): "rad" or "deg", the unit of the joint columns
+        start_frame (int): Frame the first log row lands on
+
+    Returns:
+        dict: "joints" (matched joint names), "frames" (frames written),
+        "end_frame" (last frame written) and "attributes" (the Usd.Attributes
+        that received samples)
+    """
+    fps = fps or stage.GetTimeCodesPerSecond()
+    column_index = {name: i for i, name in enumerate(log.columns)}
+    time_column = column_index["time"]
+
+    # Create one op per matched joint before streaming any samples
+    targets = []
+    matched = []
+    for joint_path in joint_paths:
+        prim = stage.GetPrimAtPath(str(joint_path))
+        if not prim or prim.GetName() not in column_index:
+            continue
+        target, axis = _joint_target(stage, prim)
+        if target is None:
+            print(f"⚠️ Warning: No transformable prim to drive for joint {joint_path}")
+            continue
+        rotate_op = _add_rotate_op(UsdGeom.Xformable(target), axis)
+        scale = np.degrees(1.0) if angle_unit == "rad" else 1.0
+        targets.append((rotate_op.GetAttr(), [column_index[prim.GetName()]], scale))
+        matched.append(prim.GetName())
+
+    orient_attr = None
+    orient_columns = None
+    if base_path is not None:
+        base = UsdGeom.Xformable(stage.GetPrimAtPath(str(base_path)))
+        if all(name in column_index for name in BASE_POSITION_COLUMNS):
+            translate_op = base.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "replay")
+            targets.append((translate_op.GetAttr(), [column_index[name] for name in BASE_POSITION_COLUMNS], 1.0))
+        if all(name in column_index for name in BASE_ORIENTATION_COLUMNS):
+            orient_op = base.AddOrientOp(UsdGeom.XformOp.PrecisionDouble, "replay")
+            orient_attr = orient_op.GetAttr()
+            orient_columns = [column_index[name] for name in BASE_ORIENTATION_COLUMNS]
+            targets.append((orient_attr, orient_columns, 1.0))
+
+    edit_target = stage.GetEditTarget()
+    layer = edit_target.GetLayer()
+    spec_paths = []
+    for attr, _, _ in targets:
+        spec_path = edit_target.MapToSpecPath(attr.GetPath())
+        spec_paths.append(spec_path)
+        if not layer.GetAttributeAtPath(spec_path):
+            Sdf.JustCreatePrimAttributeInLayer(layer, spec_path, attr.GetTypeName(), attr.GetVariability(), attr.IsCustom())
+
+    start_time = None
+    next_frame = 0
+    carry = None
+    for chunk in log:
+        if start_time is None:
+            start_time = chunk[0, time_column]
+        if carry is not None:
+            chunk = np.concatenate([carry, chunk])
+        if orient_columns:
+            # Copied first, as memory-mapped chunks are read-only; the carried
+            # row is already aligned, so the sign stays consistent across chunks
+            chunk = np.array(chunk, dtype=np.float64)
+            chunk[:, orient_columns] = _align_hemispheres(chunk[:, orient_columns])
+        carry = chunk[-1:]
+
+        # Frames whose time falls inside this chunk
+        times = chunk[:, time_column] - start_time
+        last_frame = int(np.floor(times[-1] * fps + 1e-9))
+        if last_frame < next_frame:
+            continue
+        frame_offsets = np.arange(next_frame, last_frame + 1)
+        sample_times = frame_offsets / fps
+        next_frame = last_frame + 1
+
+        with Sdf.ChangeBlock():
+            for (attr, columns, scale), spec_path in zip(targets, spec_paths):
+                values = np.stack([np.interp(sample_times, times, chunk[:, column]) for column in columns], axis=-1) * scale
+                if attr == orient_attr:
+                    values /= np.linalg.norm(values, axis=-1, keepdims=True)
+                    samples = [Gf.Quatd(*value) for value in values.tolist()]
+                elif len(columns) == 3:
+                    samples = [Gf.Vec3d(*value) for value in values.tolist()]
+                else:
+                    samples = values[:, 0].tolist()
+                for frame_offset, sample in zip(frame_offsets.tolist(), samples):
+                    layer.SetTimeSample(spec_path, start_frame + frame_offset, sample)
+
+    end_frame = start_frame + next_frame - 1
+    if next_frame:
+        stage.SetStartTimeCode(start_frame)
+        stage.SetEndTimeCode(end_frame)
+    return {"joints": matched, "frames": next_frame, "end_frame": end_frame,
+            "attributes": [attr for attr, _, _ in targets]}
@@ -0,0 +1,94 @@
+"""
+Batched, time-aware world transform queries.
+
+Xformable.ComputeLocalToWorldTransform() walks and multiplies the full
+ancestor chain on every call, so querying P prims at F frames costs
+depth x P x F matrix products. TransformCache keeps one UsdGeom.XformCache
+per time code, which evaluates each ancestor once and reuses it for every
+prim below it, and answers whole path lists over whole time ranges at once
+as NumPy arrays.
+
+Example:
+
+    cache = TransformCache(stage)
+    frames = frame_times(stage.GetStartTimeCode(), stage.GetEndTimeCode())
+    positions = cache.world_positions(propeller_paths, frames)  # (F, P, 3)
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+from pxr import Usd, UsdGeom
+
+
+class TransformCache:
+    """
+    World transforms of a stage, cached per time code.
+
+    The cache assumes the stage is not edited while it is in use; call
+    clear() after authoring transforms.
+
+    Args:
+        stage (Usd.Stage): Stage to query
+        max_times (int): Number of time codes whose XformCaches are kept,
+            least recently used first out
+    """
+
+    def __init__(self, stage, max_times=256):
+        self.stage = stage
+        self.max_times = max_times
+        self._caches = OrderedDict()
+
+    def clear(self):
+        """Drop every cached transform."""
+        self._caches.clear()
+
+    def _cache(self, time):
+        key = time.GetValue() if time.IsNumeric() else None
+        cache = self._caches.get(key)
+        if cache is None:
+            cache = UsdGeom.XformCache(time)
+            self._caches[key] = cache
+            while len(self._caches) > self.max_times:
+                self._caches.popitem(last=False)
+        else:
+            self._caches.move_to_end(key)
+        return cache
+
+    def world_transforms(self, paths, times=None):
+        """
+        Return local-to-world matrices for every path at every time.
+
+        Args:
+            paths (list): Prim paths to query
+            times (float or array, optional): A single time code, or a range
+                of time codes such as frame_times(1, 72) (default: the
+                default time code)
+
+        Returns:
+            numpy.ndarray: (N, 4, 4) for a single time, (T, N, 4, 4) for a range.
+            Matrices are row-major with the translation in the last row, as in Gf.
+        """
+        prims = [self.stage.GetPrimAtPath(str(path)) for path in paths]
+        missing = [str(path) for path, prim in zip(paths, prims) if not prim]
+        if missing:
+            raise ValueError(f"Prims not found: {', '.join(missing)}")
+
+        single = times is None or np.ndim(times) == 0
+        time_list = [times] if single else list(np.asarray(times, dtype=np.float64))
+
+        result = np.empty((len(time_list), len(prims), 4, 4))
+        for i, time in enumerate(time_list):
+            cache = self._cache(Usd.TimeCode.Default() if time is None else Usd.TimeCode(float(time)))
+            for j, prim in enumerate(prims):
+                result[i, j] = np.asarray(cache.GetLocalToWorldTransform(prim))
+        return result[0] if single else result
+
+    def world_positions(self, paths, times=None):
+        """
+        Return world-space origins for every path at every time.
+
+        Returns:
+            numpy.ndarray: (N, 3) for a single time, (T, N, 3) for a range
+        """
+        return self.world_transforms(paths, times)[..., 3, :3]
@@ -0,0 +1,231 @@
+"""
+Incremental USDZ packaging.
+
+UsdUtils.CreateNewUsdzPackage reads and writes every file of a package on
+every build, so re-exporting a small animation layer also re-reads and
+re-hashes the unchanged geometry next to it. package_usdz() reuses the
+entries of the existing archive instead. Each entry records the size and
+modification time of the file it was packaged from (in an extra field of
+its central directory record); files whose size and modification time
+still match are not read again, and their entry data is copied straight
+from the old archive. Other files are read and compared by CRC-32 and size,
+so a file that was rewritten with the same content is not counted as a
+change either. Entries are matched by name, so unchanged geometry layers
+are reused even when the small root layer in front of them changes.
+
+The new archive is written to a temporary file next to the old one and
+moved into place with os.replace(), so an interrupted build leaves the
+previous archive intact. Archives follow the USDZ rules: the root layer is
+the first entry, entries are stored without compression, and each entry's
+data starts at a multiple of 64 bytes, padded with an extra field in its
+local header. Packages whose dependencies cannot be stored under their own
+relative paths (unresolved assets, or files outside the root layer's
+directory) fall back to UsdUtils.CreateNewUsdzPackage.
+"""
+
+import contextlib
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+import zlib
+
+from pxr import Sdf, UsdUtils
+
+# Entry data in a USDZ archive starts at a multiple of this many bytes
+USDZ_ALIGNMENT = 64
+
+# Extra field header ID used for alignment padding (the one USD's writer uses)
+_PADDING_FIELD_ID = 0x1986
+
+# Extra field header ID of the source file's size and mtime, in central records
+_SOURCE_STAT_FIELD_ID = 0x5255
+_SOURCE_STAT = struct.Struct("<QQ")
+
+# Bytes copied at a time from the old archive
+_COPY_CHUNK = 1 << 20
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_OF_CENTRAL_DIRECTORY = struct.Struct("<IHHHHIIH")
+
+
+def package_files(layer_file):
+    """
+    Return the files a package of layer_file needs, as (archive name, path).
+
+    Returns:
+        list: Root layer first, then its dependencies, largest first; or None
+        if a dependency is unresolved or outside the root layer's directory
+    """
+    layers, assets, unresolved = UsdUtils.ComputeAllDependencies(Sdf.AssetPath(layer_file))
+    if unresolved:
+        return None
+
+    root_dir = os.path.dirname(os.path.abspath(layer_file))
+    root_path = os.path.realpath(layer_file)
+    paths = {os.path.realpath(layer.realPath) for layer in layers if layer.realPath}
+    paths.update(os.path.realpath(asset) for asset in assets)
+    paths.discard(root_path)
+
+    files = []
+    for path in sorted(paths, key=lambda path: (-os.path.getsize(path), path)):
+        name = os.path.relpath(path, os.path.realpath(root_dir))
+        if name.startswith(os.pardir) or os.path.isabs(name):
+            return None
+        files.append((name.replace(os.sep, "/"), path))
+    return [(os.path.basename(layer_file), root_path)] + files
+
+
+def _source_stat(extra):
+    """Return the (size, mtime_ns) recorded in a central record's extra field, or None."""
+    offset = 0
+    while offset + 4 <= len(extra):
+        field_id, length = struct.unpack_from("<HH", extra, offset)
+        if field_id == _SOURCE_STAT_FIELD_ID and length == _SOURCE_STAT.size:
+            return _SOURCE_STAT.unpack_from(extra, offset + 4)
+        offset += 4 + length
+    return None
+
+
+def _existing_entries(usdz_file):
+    """
+    Return the reusable entries of an archive by name, as (crc, size, data
+    offset, source stat), or {} if there is none.
+    """
+    if not os.path.exists(usdz_file):
+        return {}
+    try:
+        with zipfile.ZipFile(usdz_file) as archive:
+            infos = archive.infolist()
+    except (zipfile.BadZipFile, OSError):
+        return {}
+
+    entries = {}
+    with open(usdz_file, "rb") as f:
+        for info in infos:
+            # Only stored entries can be copied byte for byte
+            if info.compress_type != zipfile.ZIP_STORED:
+                continue
+            f.seek(info.header_offset)
+            header = f.read(_LOCAL_HEADER.size)
+            if len(header) != _LOCAL_HEADER.size:
+                return {}
+            name_length, extra_length = _LOCAL_HEADER.unpack(header)[-2:]
+            data_offset = info.header_offset + _LOCAL_HEADER.size + name_length + extra_length
+            entries[info.filename] = (info.CRC, info.file_size, data_offset, _source_stat(info.extra))
+    return entries
+
+
+def _local_header(name, crc, size, offset):
+    """Return a stored entry's local header, padded so its data is aligned."""
+    encoded = name.encode("utf-8")
+    unpadded = offset + _LOCAL_HEADER.size + len(encoded)
+    padding = -(unpadded + 4) % USDZ_ALIGNMENT
+    extra = struct.pack("<HH", _PADDING_FIELD_ID, padding) + b"\0" * padding
+    return _LOCAL_HEADER.pack(0x04034b50, 10, 0, zipfile.ZIP_STORED, 0, 0x21,
+                              crc, size, size, len(encoded), len(extra)) + encoded + extra
+
+
+def _central_directory(entries, offset):
+    """Return the central directory and end record for (name, crc, size, header offset, stat) entries."""
+    records = []
+    for name, crc, size, header_offset, stat in entries:
+        encoded = name.encode("utf-8")
+        extra = struct.pack("<HH", _SOURCE_STAT_FIELD_ID, _SOURCE_STAT.size) + _SOURCE_STAT.pack(*stat)
+        records.append(_CENTRAL_HEADER.pack(0x02014b50, 20, 10, 0, zipfile.ZIP_STORED, 0, 0x21,
+                                            crc, size, size, len(encoded), len(extra), 0, 0, 0, 0,
+                                            header_offset) + encoded + extra)
+    directory = b"".join(records)
+    end = _END_OF_CENTRAL_DIRECTORY.pack(0x06054b50, 0, 0, len(entries), len(entries), len(directory), offset, 0)
+    return directory + end
+
+
+def _copy_range(source, destination, offset, size):
+    """Copy size bytes starting at offset from one open file to another."""
+    source.seek(offset)
+    while size:
+        chunk = source.read(min(size, _COPY_CHUNK))
+        if not chunk:
+            raise EOFError("archive ended inside an entry")
+        destination.write(chunk)
+        size -= len(chunk)
+
+
+def package_usdz(layer_file, usdz_file, verbose=True):
+    """
+    Package layer_file and its dependencies as usdz_file, reusing the
+    entries of the existing archive whose source files did not change.
+
+    Args:
+        layer_file (str): Root layer of the package, saved to disk
+        usdz_file (str): Archive to create or update
+        verbose (bool): Print how much changed
+
+    Returns:
+        dict: "entries" in the package, "changed" entries (new or with new
+        content), "read" source bytes and "copied" bytes taken from the old
+        archive
+    """
+    files = package_files(layer_file)
+    if files is None:
+        UsdUtils.CreateNewUsdzPackage(Sdf.AssetPath(layer_file), usdz_file)
+        if verbose:
+            print(f"✅ Packaged {usdz_file} from scratch ({os.path.getsize(usdz_file)} bytes)")
+        return {"entries": None, "changed": None, "read": None, "copied": 0}
+
+    # Decide, per entry, whether its data comes from the old archive or the file
+    existing = _existing_entries(usdz_file)
+    plan = []
+    changed = read = 0
+    for name, path in files:
+        stat = os.stat(path)
+        source_stat = (stat.st_size, stat.st_mtime_ns)
+        old = existing.get(name)
+        if old and old[3] == source_stat and old[1] == stat.st_size:
+            plan.append((name, old[0], old[1], source_stat, None, old[2]))
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        read += len(data)
+        crc = zlib.crc32(data)
+        plan.append((name, crc, len(data), source_stat, data, None))
+        if not old or old[:2] != (crc, len(data)):
+            changed += 1
+
+    if not changed and list(existing) == [name for name, _ in files]:
+        if verbose:
+            print(f"✅ {usdz_file} is up to date ({len(files)} entries)")
+        return {"entries": len(files), "changed": 0, "read": read, "copied": 0}
+
+    # Write the new archive next to the old one and move it into place
+    directory = os.path.dirname(os.path.abspath(usdz_file))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".usdz.tmp")
+    copied = 0
+    try:
+        with os.fdopen(fd, "wb") as out, (open(usdz_file, "rb") if existing else contextlib.nullcontext()) as old_archive:
+            entries = []
+            for name, crc, size, source_stat, data, old_offset in plan:
+                header_offset = out.tell()
+                out.write(_local_header(name, crc, size, header_offset))
+                if data is None:
+                    _copy_range(old_archive, out, old_offset, size)
+                    copied += size
+                else:
+                    out.write(data)
+                entries.append((name, crc, size, header_offset, source_stat))
+            out.write(_central_directory(entries, out.tell()))
+        if os.path.exists(usdz_file):
+            shutil.copymode(usdz_file, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, usdz_file)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    if verbose:
+        print(f"✅ Packaged {usdz_file}: {changed} of {len(files)} entries changed "
+              f"({read} bytes read, {copied} bytes reused)")
+    return {"entries": len(files), "changed": changed, "read": read, "copied": copied}
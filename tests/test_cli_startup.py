@@ -0,0 +1,22 @@
+"""
+Startup budget of the command line.
+
+Every command's --help must return within the startup budget (0.5 s, or
+$ROBOT_USD_STARTUP_BUDGET) without importing any pxr module.
+"""
+
+import os
+import sys
+
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.cli import COMMANDS, check_startup
+
+
+def test_help_loads_no_usd_modules_within_budget():
+    results = check_startup()
+
+    assert [result["command"] for result in results] == list(COMMANDS)
+    for result in results:
+        assert result["pxr_modules"] == [], f"{result['command']}: --help failed or loaded {result['pxr_modules']}"
+        assert result["ok"], f"{result['command']}: --help took {result['seconds']:.2f}s"
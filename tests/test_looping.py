@@ -0,0 +1,65 @@
+"""
+Loop seam validation.
+
+One cycle of a correct periodic motion (the G1/B2 gait, the drone's hover
+and propellers) must pass validate_loop_seam(); a motion whose velocity
+flips at the seam must not.
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pxr")
+import numpy as np
+from pxr import Usd, UsdGeom
+
+# Shared helpers live in the robot_usd package at the repository root
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "usdz_package"))
+from create_drone import define_drone
+from robot_usd.keyframes import sine_wave, vec3, write_keyframes
+from robot_usd.looping import common_period, loop_frames, mark_loopable, validate_loop_seam
+
+
+def _gait_stage(frames, amplitude, period):
+    """Return a stage with four legs swinging out of phase and a bobbing body."""
+    stage = Usd.Stage.CreateInMemory()
+    body = UsdGeom.Xform.Define(stage, "/robot")
+    keyframes = {body.AddTranslateOp(): (frames, vec3(z=sine_wave(frames, 0.03, period / 2)))}
+    angles = sine_wave(frames, amplitude, period, phase=np.arange(4) * (np.pi / 2))
+    for i in range(4):
+        leg = UsdGeom.Xform.Define(stage, f"/robot/leg_{i}")
+        keyframes[leg.AddRotateXOp()] = (frames, angles[i])
+    write_keyframes(stage, keyframes)
+    mark_loopable(stage, frames[0], frames[-1])
+    return stage
+
+
+def test_sine_gait_loop_is_continuous():
+    frames = loop_frames(common_period([24, 12]))
+
+    assert validate_loop_seam(_gait_stage(frames, 45, 24), verbose=False) == []
+    assert validate_loop_seam(_gait_stage(frames, 30, 24), verbose=False) == []
+
+
+def test_drone_loop_is_continuous():
+    fps = 24
+    hover_period = 3 * fps
+    frames = loop_frames(common_period([360 / (720 / fps), hover_period]))
+    stage = Usd.Stage.CreateInMemory()
+    define_drone(stage, "/drone", frames, fps, hover_period=hover_period)
+    mark_loopable(stage, frames[0], frames[-1])
+
+    assert validate_loop_seam(stage, verbose=False) == []
+
+
+def test_velocity_flip_at_seam_is_reported():
+    # Half a sine wave per loop comes back to its start value, but its
+    # velocity flips sign at the seam
+    frames = loop_frames(24)
+    issues = validate_loop_seam(_gait_stage(frames, 45, 48), verbose=False)
+
+    assert any("velocity changes" in issue for issue in issues)
@@ -6,22 +6,30 @@ This script helps you create animated USDZ files from USD files for use in Xcode
 It creates a simple animation for the model and packages it as a USDZ file.
 
 Usage:
-    python create_animated_usdz.py input.usd [output.usdz] [--duration 3] [--fps 24]
+    python create_animated_usdz.py input.usd [output.usdz] [--duration 3] [--fps 24] [--format usdc] [--mask /robot/base ...]
 
 Arguments:
     input.usd       Path to the input USD file
     output.usdz     Optional: Path to the output USDZ file (default: input_animated.usdz)
     --duration      Optional: Animation duration in seconds (default: 3)
     --fps           Optional: Frames per second (default: 24)
+    --format        Optional: Intermediate layer format, usda or usdc (default: usda)
+    --no-cache      Optional: Always rebuild instead of reusing a cached USDZ
+    --mask          Optional: Only load and animate these subtrees of the input (default: everything)
 """
 
-from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, UsdShade
 import math
 import os
 import sys
 import argparse
 
-def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.build_cache import open_build_cache
+from robot_usd.output_format import add_output_format_argument, layer_path, resolve_output_format
+from robot_usd.profiling import lap
+
+def create_animated_usdz(input_file, output_file=None, duration=3, fps=24, output_format=None, use_cache=True, mask_paths=None):
     if not os.path.exists(input_file):
         print(f"Error: Input file '{input_file}' not found.")
         return False
@@ -31,9 +39,30 @@ def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
         base_name = os.path.splitext(input_file)[0]
         output_file = f"{base_name}_animated.usdz"
     
+    # Reuse a previous build when the input, parameters and script are unchanged
+    cache = open_build_cache(use_cache)
+    if cache:
+        cache_key = cache.key(__file__, output_file, [input_file], {
+            "duration": duration,
+            "fps": fps,
+            "output_format": resolve_output_format(output_format),
+            "mask_paths": sorted(mask_paths or []),
+        })
+        if cache.fetch(cache_key, output_file):
+            return True
+    
+    # USD, NumPy and the helpers built on them are imported here rather than
+    # at module level, so --help and argument errors return without loading them
+    import numpy as np
+    from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, UsdShade
+    from robot_usd.keyframe_reduction import reduce_keyframes
+    from robot_usd.keyframes import frame_times, sine_wave, vec3, write_keyframes
+    from robot_usd.stage_index import StageIndex
+    from robot_usd.stage_loading import open_stage
+    
     # Create intermediate files
-    animated_usda = f"{os.path.splitext(output_file)[0]}.usda"
-    simplified_usda = f"{os.path.splitext(output_file)[0]}_simplified.usda"
+    animated_layer = layer_path(output_file, output_format)
+    simplified_layer = layer_path(f"{os.path.splitext(output_file)[0]}_simplified", output_format)
     
     print(f"Creating animated USDZ from {input_file}")
     print(f"Output will be saved to {output_file}")
@@ -43,8 +72,8 @@ def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
     total_frames = int(duration * fps)
     
     try:
-        # Open the existing USD file
-        stage = Usd.Stage.Open(input_file)
+        # Open the existing USD file, composing only the requested subtrees
+        stage = open_stage(input_file, mask_paths)
         
         # Set timeCodesPerSecond for proper playback
         stage.SetTimeCodesPerSecond(fps)
@@ -52,25 +81,32 @@ def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
         # Set frame range
         stage.SetStartTimeCode(1)
         stage.SetEndTimeCode(total_frames)
+        lap("open")
         
         # Find the robot parts to animate
         print("Exploring model structure...")
+        index = StageIndex(stage, roles=["joint", "xformable", "body_or_root"])
+        lap("traverse")
         
         # Find joints to animate
-        joints = []
-        for prim in stage.Traverse():
-            if "joint" in prim.GetPath().pathString.lower():
-                joints.append(prim.GetPath())
-                print(f"Found joint: {prim.GetPath()}")
+        joints = list(index.joints)
+        for joint_path in joints:
+            print(f"Found joint: {joint_path}")
         
         # If no joints found, try to find any transformable objects
         if not joints:
-            for prim in stage.Traverse():
-                if prim.IsA(UsdGeom.Xformable):
-                    # Skip the root prim
-                    if len(str(prim.GetPath()).split('/')) > 2:
-                        joints.append(prim.GetPath())
-                        print(f"Found transformable: {prim.GetPath()}")
+            # Skip the root prim
+            joints = [path for path in index.xformables if path.pathElementCount > 1]
+            for joint_path in joints:
+                print(f"Found transformable: {joint_path}")
+        
+        # Evaluate all animation curves for every frame at once
+        frames = frame_times(1, total_frames)
+        keyframes = {}
+        
+        # Create a motion with phase offset based on position
+        phase_offsets = np.arange(len(joints)) * (math.pi / max(len(joints), 1))
+        joint_angles = sine_wave(frames, 30, total_frames, phase=phase_offsets)
         
         # Animate the joints
         for i, joint_path in enumerate(joints):
@@ -78,20 +114,12 @@ def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
             
             # Create rotation animation
             rotation_attr = joint.AddRotateXYZOp(UsdGeom.XformOp.PrecisionDouble, "rotate")
-            
-            # Create a motion with phase offset based on position
-            phase_offset = i * (math.pi / len(joints)) if len(joints) > 0 else 0
-            for frame in range(1, total_frames + 1):
-                time = frame
-                angle = 30 * math.sin((2 * math.pi * frame / total_frames) + phase_offset)
-                rotation_attr.Set(Gf.Vec3d(angle, 0, 0), time)
+            keyframes[rotation_attr] = (frames, vec3(x=joint_angles[i]))
         
         # Find body/root parts to animate
-        body_paths = []
-        for prim in stage.Traverse():
-            if "body" in prim.GetPath().pathString.lower() or "root" in prim.GetPath().pathString.lower():
-                body_paths.append(prim.GetPath())
-                print(f"Found body part: {prim.GetPath()}")
+        body_paths = list(index.paths("body_or_root"))
+        for body_path in body_paths:
+            print(f"Found body part: {body_path}")
         
         # If no specific body parts found, use the root prim
         if not body_paths:
@@ -99,26 +127,33 @@ def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
                 body_paths.append(prim.GetPath())
                 print(f"Using root as body: {prim.GetPath()}")
         
+        # Create a subtle motion
+        height = sine_wave(frames, 0.05, total_frames)
+        x_pos = 0.1 * (frames / total_frames)
+        body_motion = vec3(x=x_pos, z=height)
+        
         # Animate the body parts
         for body_path in body_paths:
             body = UsdGeom.Xform(stage.GetPrimAtPath(body_path))
             
             # Create translation animation
             translate_op = body.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
-            
-            # Create a subtle motion
-            for frame in range(1, total_frames + 1):
-                time = frame
-                height = 0.05 * math.sin(2 * math.pi * frame / total_frames)
-                x_pos = 0.1 * (frame / total_frames)
-                translate_op.Set(Gf.Vec3d(x_pos, 0, height), time)
+            keyframes[translate_op] = (frames, body_motion)
+        
+        # Write all joint and body samples in one pass
+        write_keyframes(stage, keyframes)
+        # Drop samples that linear interpolation reproduces from the curves written
+        # here, leaving any animation that came with the input untouched
+        reduce_keyframes(stage, attributes=list(keyframes))
+        lap("author")
         
         # Save the animated USD file
-        stage.Export(animated_usda)
-        print(f"✅ Animated USD saved to {animated_usda}")
+        stage.Export(animated_layer)
+        lap("export")
+        print(f"✅ Animated USD saved to {animated_layer}")
         
         # Create a simplified version for USDZ conversion
-        simplified_stage = Usd.Stage.CreateNew(simplified_usda)
+        simplified_stage = Usd.Stage.CreateNew(simplified_layer)
         
         # Set up the simplified stage
         simplified_stage.SetTimeCodesPerSecond(fps)
@@ -142,6 +177,10 @@ def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
             (0.8, 0.8)     # Back Right
         ]
         
+        # Create a walking motion with phase offset
+        keyframes = {}
+        leg_angles = sine_wave(frames, 30, total_frames, phase=np.arange(4) * (math.pi / 2))  # Offset each leg by 90 degrees
+        
         for i, (x, z) in enumerate(leg_positions):
             leg = UsdGeom.Cylinder.Define(simplified_stage, f"/Robot/Leg_{i}")
             leg.CreateRadiusAttr(0.2)
@@ -153,24 +192,17 @@ def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
             
             # Add rotation animation to the leg
             rotate_op = leg_xform.AddRotateXYZOp(UsdGeom.XformOp.PrecisionDouble, "rotate")
-            
-            # Create a walking motion with phase offset
-            phase_offset = i * (math.pi / 2)  # Offset each leg by 90 degrees
-            for frame in range(1, total_frames + 1):
-                time = frame
-                angle = 30 * math.sin((2 * math.pi * frame / total_frames) + phase_offset)
-                rotate_op.Set(Gf.Vec3d(angle, 0, 0), time)
+            keyframes[rotate_op] = (frames, vec3(x=leg_angles[i]))
         
         # Add animation to the body
         body_xform = UsdGeom.Xformable(body.GetPrim())
         translate_op = body_xform.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
         
         # Create a forward walking motion with slight up/down
-        for frame in range(1, total_frames + 1):
-            time = frame
-            x_pos = 2.0 * (frame / total_frames)  # Move forward 2 units over the animation
-            y_pos = 0.1 * math.sin(2 * math.pi * frame / (total_frames/2))  # Small up/down motion
-            translate_op.Set(Gf.Vec3d(x_pos, y_pos, 0), time)
+        x_pos = 2.0 * (frames / total_frames)  # Move forward 2 units over the animation
+        y_pos = sine_wave(frames, 0.1, total_frames / 2)  # Small up/down motion
+        keyframes[translate_op] = (frames, vec3(x=x_pos, y=y_pos))
+        write_keyframes(simplified_stage, keyframes)
         
         # Add a simple material
         material = UsdShade.Material.Define(simplified_stage, "/Robot/Material")
@@ -191,24 +223,32 @@ def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
             leg = simplified_stage.GetPrimAtPath(f"/Robot/Leg_{i}")
             UsdShade.MaterialBindingAPI(leg).Bind(material)
         
+        # Drop samples that linear interpolation reproduces
+        reduce_keyframes(simplified_stage, attributes=list(keyframes))
+        lap("author")
+        
         # Save the simplified USD file
-        simplified_stage.Export(simplified_usda)
-        print(f"✅ Simplified USD saved to {simplified_usda}")
+        simplified_stage.Export(simplified_layer)
+        lap("export")
+        print(f"✅ Simplified USD saved to {simplified_layer}")
         
         # Convert to USDZ
         try:
             UsdUtils.CreateNewUsdzPackage(
-                Sdf.AssetPath(simplified_usda),
+                Sdf.AssetPath(simplified_layer),
                 output_file
             )
+            lap("package")
             print(f"✅ USDZ package created at {output_file}")
+            if cache:
+                cache.store(cache_key, output_file)
             return True
         except Exception as e:
             print(f"❌ Error creating USDZ package: {e}")
             print("Creating a basic USDZ file instead...")
             
             # Create a very basic USD file for USDZ conversion
-            basic_file = f"{os.path.splitext(output_file)[0]}_basic.usda"
+            basic_file = layer_path(f"{os.path.splitext(output_file)[0]}_basic", output_format)
             basic_stage = Usd.Stage.CreateNew(basic_file)
             
             # Set up the basic stage
@@ -229,11 +269,9 @@ def create_animated_usdz(input_file, output_file=None, duration=3, fps=24):
             translate_op = sphere_xform.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
             
             # Create a simple animation
-            for frame in range(1, total_frames + 1):
-                time = frame
-                x_pos = 2.0 * (frame / total_frames)  # Move forward 2 units
-                y_pos = 0.5 * math.sin(2 * math.pi * frame / total_frames)  # Up/down motion
-                translate_op.Set(Gf.Vec3d(x_pos, y_pos, 0), time)
+            x_pos = 2.0 * (frames / total_frames)  # Move forward 2 units
+            y_pos = sine_wave(frames, 0.5, total_frames)  # Up/down motion
+            write_keyframes(basic_stage, {translate_op: (frames, vec3(x=x_pos, y=y_pos))})
             
             # Add a simple material
             material = UsdShade.Material.Define(basic_stage, "/Robot/Material")
@@ -276,10 +314,16 @@ def main():
     parser.add_argument('output_file', nargs='?', help='Path to the output USDZ file (optional)')
     parser.add_argument('--duration', type=float, default=3, help='Animation duration in seconds (default: 3)')
     parser.add_argument('--fps', type=int, default=24, help='Frames per second (default: 24)')
+    add_output_format_argument(parser)
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help='Always rebuild instead of reusing a cached USDZ')
+    parser.add_argument('--mask', nargs='+', metavar='PATH', dest='mask_paths',
+                        help='Only load and animate these subtrees of the input (default: everything)')
     
     args = parser.parse_args()
     
-    create_animated_usdz(args.input_file, args.output_file, args.duration, args.fps)
+    create_animated_usdz(args.input_file, args.output_file, args.duration, args.fps, args.output_format, args.use_cache,
+                         args.mask_paths)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,7 +6,7 @@ This script creates an animated drone USDZ file with spinning propellers.
 You can customize the colors and dimensions of the drone.
 
 Usage:
-    python create_drone.py [output.usdz] [--duration 3] [--fps 24] [--body-color 0.1,0.1,0.1] [--prop1-color 0.8,0.0,0.0] [--prop2-color 0.0,0.0,0.8]
+    python create_drone.py [output.usdz] [--duration 3] [--fps 24] [--body-color 0.1,0.1,0.1] [--prop1-color 0.8,0.0,0.0] [--prop2-color 0.0,0.0,0.8] [--format usdc] [--loop]
 
 Arguments:
     output.usdz     Optional: Path to the output USDZ file (default: drone_animated.usdz)
@@ -15,16 +15,32 @@ Arguments:
     --body-color    Optional: RGB color for the drone body (default: 0.1,0.1,0.1)
     --prop1-color   Optional: RGB color for propellers 1 and 3 (default: 0.8,0.0,0.0)
     --prop2-color   Optional: RGB color for propellers 2 and 4 (default: 0.0,0.0,0.8)
+    --format        Optional: Intermediate layer format, usda or usdc (default: usda)
+    --loop          Optional: Write a single loopable cycle instead of the whole duration
 """
 
-from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, UsdShade, UsdLux
 import math
 import os
 import sys
 import argparse
 
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.output_format import add_output_format_argument, layer_path
+from robot_usd.profiling import lap
+
+# USD and the helpers built on it are imported inside the functions that use
+# them, so --help and argument errors return without loading them
+
+# Default part colors (RGB)
+DEFAULT_BODY_COLOR = (0.1, 0.1, 0.1)
+DEFAULT_PROP1_COLOR = (0.8, 0.0, 0.0)
+DEFAULT_PROP2_COLOR = (0.0, 0.0, 0.8)
+
 def parse_color(color_str):
     """Parse a comma-separated RGB color string into a Gf.Vec3f"""
+    from pxr import Gf
+    
     try:
         r, g, b = map(float, color_str.split(','))
         return Gf.Vec3f(r, g, b)
@@ -32,61 +48,69 @@ def parse_color(color_str):
         print(f"Error parsing color '{color_str}'. Using default.")
         return None
 
-def create_animated_drone(output_file=None, duration=3, fps=24, 
-                         body_color=Gf.Vec3f(0.1, 0.1, 0.1),
-                         prop1_color=Gf.Vec3f(0.8, 0.0, 0.0),
-                         prop2_color=Gf.Vec3f(0.0, 0.0, 0.8)):
-    # Set default output file if not provided
-    if output_file is None:
-        output_file = "drone_animated.usdz"
-    
-    # Create intermediate file
-    usda_file = f"{os.path.splitext(output_file)[0]}.usda"
-    
-    print(f"Creating animated drone USDZ")
-    print(f"Output will be saved to {output_file}")
-    print(f"Animation duration: {duration} seconds at {fps} fps")
-    
-    # Calculate total frames
-    total_frames = int(duration * fps)
+def define_drone(stage, root_path, frames, fps,
+                 body_color=None, prop1_color=None, prop2_color=None,
+                 prop_phase=0.0, hover_period=None, materials=None):
+    """
+    Define an animated drone (body, arms, motors, spinning propellers and
+    materials) under root_path.
     
-    # Create a new stage
-    stage = Usd.Stage.CreateNew(usda_file)
+    Args:
+        stage (Usd.Stage): Stage to author into
+        root_path (str): Path of the drone's root Xform
+        frames (array): Frame numbers to write samples for (see frame_times)
+        fps (float): Frames per second, used for the propeller speed
+        body_color, prop1_color, prop2_color (Gf.Vec3f, optional): Part
+                            colors (default: DEFAULT_*_COLOR)
+        prop_phase (float): Propeller angle offset in degrees, so several
+                            drones do not spin in lockstep
+        hover_period (float, optional): Frames per hover bob (default: the
+                            whole frame range)
+        materials (MaterialRegistry, optional): Registry to take the part
+                            materials from, so several drones can share them
     
-    # Set timeCodesPerSecond for proper playback
-    stage.SetTimeCodesPerSecond(fps)
+    Returns:
+        UsdGeom.Xform: The drone's root prim
+    """
+    from pxr import Gf, UsdGeom
+    from robot_usd.keyframes import linear_ramp, sine_wave, vec3, write_keyframes
+    from robot_usd.materials import MaterialRegistry
     
-    # Set frame range
-    stage.SetStartTimeCode(1)
-    stage.SetEndTimeCode(total_frames)
+    body_color = Gf.Vec3f(*DEFAULT_BODY_COLOR) if body_color is None else body_color
+    prop1_color = Gf.Vec3f(*DEFAULT_PROP1_COLOR) if prop1_color is None else prop1_color
+    prop2_color = Gf.Vec3f(*DEFAULT_PROP2_COLOR) if prop2_color is None else prop2_color
+    total_frames = len(frames)
+    hover_period = hover_period or total_frames
     
     # Create a root prim
-    root = UsdGeom.Xform.Define(stage, "/drone")
-    stage.SetDefaultPrim(root.GetPrim())
+    root = UsdGeom.Xform.Define(stage, root_path)
     
     # Create the drone body
-    body = UsdGeom.Xform.Define(stage, "/drone/body")
+    body = UsdGeom.Xform.Define(stage, f"{root_path}/body")
     
     # Create the main body as a cube
-    main_body = UsdGeom.Cube.Define(stage, "/drone/body/main")
+    main_body = UsdGeom.Cube.Define(stage, f"{root_path}/body/main")
     main_body.CreateSizeAttr(1.0)  # 1 unit cube
     main_body_xform = UsdGeom.Xformable(main_body.GetPrim())
     main_body_xform.AddScaleOp().Set(Gf.Vec3d(3.0, 0.5, 3.0))  # Flatten it and make it wider
     
     # Create circuit board as a thin disk
-    circuit = UsdGeom.Cylinder.Define(stage, "/drone/body/circuit")
+    circuit = UsdGeom.Cylinder.Define(stage, f"{root_path}/body/circuit")
     circuit.CreateRadiusAttr(1.4)  # Radius
     circuit.CreateHeightAttr(0.1)  # Height
     circuit_xform = UsdGeom.Xformable(circuit.GetPrim())
     circuit_xform.AddTranslateOp().Set(Gf.Vec3d(0, 0.3, 0))  # Position on top of body
     
     # Create battery as a box
-    battery = UsdGeom.Cube.Define(stage, "/drone/body/battery")
+    battery = UsdGeom.Cube.Define(stage, f"{root_path}/body/battery")
     battery.CreateSizeAttr(1.0)  # 1 unit cube
     battery_xform = UsdGeom.Xformable(battery.GetPrim())
     battery_xform.AddScaleOp().Set(Gf.Vec3d(1.5, 0.3, 1.0))  # Shape it
     battery_xform.AddTranslateOp().Set(Gf.Vec3d(0, -0.3, 0))  # Position under body
     
+    # Evaluate all animation curves for every frame at once
+    keyframes = {}
+    
     # Create four motor arms
     arm_positions = [
         (1.5, 0, 1.5),   # Front right
@@ -97,7 +121,7 @@ def create_animated_drone(output_file=None, duration=3, fps=24,
     
     for i, (x, y, z) in enumerate(arm_positions):
         # Create arm
-        arm = UsdGeom.Cylinder.Define(stage, f"/drone/body/arm_{i+1}")
+        arm = UsdGeom.Cylinder.Define(stage, f"{root_path}/body/arm_{i+1}")
         arm.CreateRadiusAttr(0.1)  # Radius
         arm.CreateHeightAttr(2.0)  # Length
         arm_xform = UsdGeom.Xformable(arm.GetPrim())
@@ -114,14 +138,14 @@ def create_animated_drone(output_file=None, duration=3, fps=24,
         arm_xform.AddTranslateOp().Set(Gf.Vec3d(x/2, y, z/2))
         
         # Create motor
-        motor = UsdGeom.Cylinder.Define(stage, f"/drone/body/motor_{i+1}")
+        motor = UsdGeom.Cylinder.Define(stage, f"{root_path}/body/motor_{i+1}")
         motor.CreateRadiusAttr(0.3)  # Radius
         motor.CreateHeightAttr(0.3)  # Height
         motor_xform = UsdGeom.Xformable(motor.GetPrim())
         motor_xform.AddTranslateOp().Set(Gf.Vec3d(x, y, z))  # Position at end of arm
         
         # Create propeller
-        prop = UsdGeom.Cylinder.Define(stage, f"/drone/prop_{i+1}")
+        prop = UsdGeom.Cylinder.Define(stage, f"{root_path}/prop_{i+1}")
         prop.CreateRadiusAttr(0.8)  # Radius
         prop.CreateHeightAttr(0.05)  # Height
         prop_xform = UsdGeom.Xformable(prop.GetPrim())
@@ -133,91 +157,133 @@ def create_animated_drone(output_file=None, duration=3, fps=24,
         rotate_op = prop_xform.AddRotateYOp(UsdGeom.XformOp.PrecisionDouble, "rotateY")
         
         # Create a continuous rotation animation
-        for frame in range(1, total_frames + 1):
-            time = frame
-            angle = direction * (720 / fps) * frame  # 720 degrees per second (2 rotations)
-            rotate_op.Set(angle, time)
+        keyframes[rotate_op] = (frames, linear_ramp(frames, direction * (720 / fps), direction * prop_phase))  # 720 degrees per second (2 rotations)
     
     # Add a subtle hovering motion to the entire drone
     hover_op = root.AddTranslateOp(UsdGeom.XformOp.PrecisionDouble, "translate")
     
     # Create a subtle up/down hovering motion
-    for frame in range(1, total_frames + 1):
-        time = frame
-        height = 0.2 * math.sin(2 * math.pi * frame / total_frames)  # Up/down motion
-        hover_op.Set(Gf.Vec3d(0, height, 0), time)
+    height = sine_wave(frames, 0.2, hover_period)  # Up/down motion
+    keyframes[hover_op] = (frames, vec3(y=height))
+    
+    # Write the propeller and hover samples in one pass
+    write_keyframes(stage, keyframes)
     
     # Define colors for different parts
     colors = {
         # Main body - user defined
-        "/drone/body/main": body_color,
+        f"{root_path}/body/main": body_color,
         
         # Circuit board - green
-        "/drone/body/circuit": Gf.Vec3f(0.0, 0.5, 0.0),
+        f"{root_path}/body/circuit": Gf.Vec3f(0.0, 0.5, 0.0),
         
         # Battery - silver
-        "/drone/body/battery": Gf.Vec3f(0.8, 0.8, 0.8),
+        f"{root_path}/body/battery": Gf.Vec3f(0.8, 0.8, 0.8),
         
         # Arms - dark gray
-        "/drone/body/arm_1": Gf.Vec3f(0.3, 0.3, 0.3),
-        "/drone/body/arm_2": Gf.Vec3f(0.3, 0.3, 0.3),
-        "/drone/body/arm_3": Gf.Vec3f(0.3, 0.3, 0.3),
-        "/drone/body/arm_4": Gf.Vec3f(0.3, 0.3, 0.3),
+        f"{root_path}/body/arm_1": Gf.Vec3f(0.3, 0.3, 0.3),
+        f"{root_path}/body/arm_2": Gf.Vec3f(0.3, 0.3, 0.3),
+        f"{root_path}/body/arm_3": Gf.Vec3f(0.3, 0.3, 0.3),
+        f"{root_path}/body/arm_4": Gf.Vec3f(0.3, 0.3, 0.3),
         
         # Motors - dark gray
-        "/drone/body/motor_1": Gf.Vec3f(0.25, 0.25, 0.25),
-        "/drone/body/motor_2": Gf.Vec3f(0.25, 0.25, 0.25),
-        "/drone/body/motor_3": Gf.Vec3f(0.25, 0.25, 0.25),
-        "/drone/body/motor_4": Gf.Vec3f(0.25, 0.25, 0.25),
+        f"{root_path}/body/motor_1": Gf.Vec3f(0.25, 0.25, 0.25),
+        f"{root_path}/body/motor_2": Gf.Vec3f(0.25, 0.25, 0.25),
+        f"{root_path}/body/motor_3": Gf.Vec3f(0.25, 0.25, 0.25),
+        f"{root_path}/body/motor_4": Gf.Vec3f(0.25, 0.25, 0.25),
         
         # Propellers - alternating user defined colors
-        "/drone/prop_1": prop1_color,  # User defined
-        "/drone/prop_2": prop2_color,  # User defined
-        "/drone/prop_3": prop1_color,  # User defined
-        "/drone/prop_4": prop2_color   # User defined
+        f"{root_path}/prop_1": prop1_color,  # User defined
+        f"{root_path}/prop_2": prop2_color,  # User defined
+        f"{root_path}/prop_3": prop1_color,  # User defined
+        f"{root_path}/prop_4": prop2_color   # User defined
     }
     
-    # Apply colors to parts
+    # Apply colors to parts; parts with the same color share one material
+    if materials is None:
+        materials = MaterialRegistry(stage)
     for part_path, color in colors.items():
-        # Create a new material for this part
-        material_path = part_path.replace("/", "_") + "_material"
-        material = UsdShade.Material.Define(stage, "/Materials" + material_path)
-        
-        # Create a PBR shader
-        shader = UsdShade.Shader.Define(stage, "/Materials" + material_path + "/shader")
-        shader.CreateIdAttr("UsdPreviewSurface")
-        
-        # Set color and other properties
-        shader.CreateInput("diffuseColor", Sdf.ValueTypeNames.Color3f).Set(color)
-        shader.CreateInput("metallic", Sdf.ValueTypeNames.Float).Set(0.0)
-        shader.CreateInput("roughness", Sdf.ValueTypeNames.Float).Set(0.4)
-        
-        # Connect shader to material
-        material.CreateOutput("surface", Sdf.ValueTypeNames.Token).ConnectToSource(
-            UsdShade.ConnectableAPI(shader), "surface"
-        )
-        
-        # Bind material to part
-        UsdShade.MaterialBindingAPI(stage.GetPrimAtPath(part_path)).Bind(material)
-        
+        materials.bind(stage.GetPrimAtPath(part_path), diffuseColor=color, metallic=0.0, roughness=0.4)
         print(f"Applied color to {part_path}")
     
+    return root
+
+def create_animated_drone(output_file=None, duration=3, fps=24, 
+                         body_color=None, prop1_color=None, prop2_color=None,
+                         output_format=None, loop=False):
+    from pxr import Usd, UsdUtils, Sdf, Gf, UsdLux
+    from robot_usd.keyframe_reduction import reduce_keyframes
+    from robot_usd.keyframes import frame_times
+    from robot_usd.looping import common_period, loop_frames, mark_loopable, validate_loop_seam
+    
+    # Set default output file if not provided
+    if output_file is None:
+        output_file = "drone_animated.usdz"
+    
+    # Create intermediate file
+    layer_file = layer_path(output_file, output_format)
+    
+    print(f"Creating animated drone USDZ")
+    print(f"Output will be saved to {output_file}")
+    print(f"Animation duration: {duration} seconds at {fps} fps")
+    
+    # Calculate total frames
+    total_frames = int(duration * fps)
+    frames = frame_times(1, total_frames)
+    hover_period = None
+    
+    if loop:
+        # One cycle holds whole propeller turns (720 degrees per second) and
+        # one 3 second hover bob; the viewer repeats it for any duration
+        hover_period = 3 * fps
+        frames = loop_frames(common_period([360 / (720 / fps), hover_period]))
+        print(f"Loop mode: writing one {len(frames) - 1} frame cycle")
+    
+    # Create a new stage
+    stage = Usd.Stage.CreateNew(layer_file)
+    
+    # Set timeCodesPerSecond for proper playback
+    stage.SetTimeCodesPerSecond(fps)
+    
+    # Set frame range
+    stage.SetStartTimeCode(1)
+    stage.SetEndTimeCode(frames[-1])
+    lap("open")
+    
+    # Build the drone and animate it
+    root = define_drone(stage, "/drone", frames, fps, body_color, prop1_color, prop2_color,
+                        hover_period=hover_period)
+    stage.SetDefaultPrim(root.GetPrim())
+    
     # Add a light to ensure visibility
     light = UsdLux.DistantLight.Define(stage, "/Light")
     light.CreateIntensityAttr(500.0)
     light.CreateAngleAttr(0.53)
     light.CreateColorAttr(Gf.Vec3f(1.0, 1.0, 1.0))
     
+    if loop:
+        # Mark the cycle as loopable and make sure it repeats without a hitch
+        mark_loopable(stage, frames[0], frames[-1])
+        if validate_loop_seam(stage):
+            print("❌ Error: Drone animation does not loop cleanly")
+            return False
+    
+    # Drop samples that linear interpolation reproduces
+    reduce_keyframes(stage)
+    lap("author")
+    
     # Save the animated USD file
-    stage.Export(usda_file)
-    print(f"✅ Animated USD saved to {usda_file}")
+    stage.Export(layer_file)
+    lap("export")
+    print(f"✅ Animated USD saved to {layer_file}")
     
     # Convert to USDZ
     try:
         UsdUtils.CreateNewUsdzPackage(
-            Sdf.AssetPath(usda_file),
+            Sdf.AssetPath(layer_file),
             output_file
         )
+        lap("package")
         print(f"✅ USDZ package created at {output_file}")
         return True
     except Exception as e:
@@ -232,16 +298,18 @@ def main():
     parser.add_argument('--body-color', type=str, default='0.1,0.1,0.1', help='RGB color for drone body (default: 0.1,0.1,0.1)')
     parser.add_argument('--prop1-color', type=str, default='0.8,0.0,0.0', help='RGB color for propellers 1 and 3 (default: 0.8,0.0,0.0)')
     parser.add_argument('--prop2-color', type=str, default='0.0,0.0,0.8', help='RGB color for propellers 2 and 4 (default: 0.0,0.0,0.8)')
+    add_output_format_argument(parser)
+    parser.add_argument('--loop', action='store_true', help='Write a single loopable cycle instead of the whole duration')
     
     args = parser.parse_args()
     
-    # Parse colors
-    body_color = parse_color(args.body_color) or Gf.Vec3f(0.1, 0.1, 0.1)
-    prop1_color = parse_color(args.prop1_color) or Gf.Vec3f(0.8, 0.0, 0.0)
-    prop2_color = parse_color(args.prop2_color) or Gf.Vec3f(0.0, 0.0, 0.8)
+    # Parse colors (None falls back to the default color)
+    body_color = parse_color(args.body_color)
+    prop1_color = parse_color(args.prop1_color)
+    prop2_color = parse_color(args.prop2_color)
     
     create_animated_drone(args.output_file, args.duration, args.fps, 
-                         body_color, prop1_color, prop2_color)
+                         body_color, prop1_color, prop2_color, args.output_format, args.loop)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Create Drone Fleet USDZ
+
+This script creates a single USDZ file containing a whole fleet of animated
+drones. The drones are drawn through one UsdGeom.PointInstancer, so even
+thousands of them load quickly on device. Each drone gets its own position,
+heading and propeller phase, and can optionally fly its own circle.
+
+Usage:
+    python create_fleet.py [output.usdz] [--count 100] [--spacing 6] [--duration 3] [--fps 24] [--phases 8] [--trajectory circle] [--seed 0] [--format usdc]
+
+Arguments:
+    output.usdz     Optional: Path to the output USDZ file (default: fleet_animated.usdz)
+    --count         Optional: Number of drones (default: 100)
+    --spacing       Optional: Distance between drones on the grid (default: 6)
+    --duration      Optional: Animation duration in seconds (default: 3)
+    --fps           Optional: Frames per second (default: 24)
+    --phases        Optional: Number of propeller phase prototypes (default: 8)
+    --trajectory    Optional: Per-drone motion, none or circle (default: none)
+    --seed          Optional: Random seed for headings and phases (default: 0)
+    --format        Optional: Intermediate layer format, usda or usdc (default: usda)
+"""
+
+import os
+import sys
+import argparse
+
+# Shared helpers live in the robot_usd package at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_usd.output_format import add_output_format_argument, layer_path
+
+from create_drone import define_drone
+
+def create_fleet(output_file=None, count=100, spacing=6.0, duration=3, fps=24,
+                 phase_count=8, trajectory="none", seed=0, output_format=None):
+    # USD, NumPy and the helpers built on them are imported here rather than
+    # at module level, so --help and argument errors return without loading them
+    import numpy as np
+    from pxr import Usd, UsdGeom, UsdUtils, Sdf, Gf, UsdLux
+    from robot_usd.fleet import circle_trajectories, define_fleet, grid_positions, phase_buckets, yaw_orientations
+    from robot_usd.keyframe_reduction import reduce_keyframes
+    from robot_usd.keyframes import frame_times
+    from robot_usd.materials import MaterialRegistry
+    
+    # Set default output file if not provided
+    if output_file is None:
+        output_file = "fleet_animated.usdz"
+    
+    # Create intermediate file
+    layer_file = layer_path(output_file, output_format)
+    
+    print(f"Creating fleet of {count} drones")
+    print(f"Output will be saved to {output_file}")
+    print(f"Animation duration: {duration} seconds at {fps} fps")
+    
+    # Calculate total frames
+    total_frames = int(duration * fps)
+    frames = frame_times(1, total_frames)
+    
+    # Create a new stage
+    stage = Usd.Stage.CreateNew(layer_file)
+    stage.SetTimeCodesPerSecond(fps)
+    stage.SetStartTimeCode(1)
+    stage.SetEndTimeCode(total_frames)
+    
+    # Create a root prim
+    root = UsdGeom.Xform.Define(stage, "/fleet")
+    stage.SetDefaultPrim(root.GetPrim())
+    
+    # One prototype drone per propeller phase; prototypes live under the
+    # instancer so they are only drawn through it
+    instancer_path = "/fleet/drones"
+    prototype_paths = []
+    materials = MaterialRegistry(stage)
+    for i in range(phase_count):
+        prototype_path = f"{instancer_path}/Prototypes/drone_{i}"
+        define_drone(stage, prototype_path, frames, fps, prop_phase=i * 360.0 / phase_count, materials=materials)
+        prototype_paths.append(prototype_path)
+    print(f"Created {phase_count} drone prototypes sharing {len(materials)} materials")
+    
+    # Per-drone layout: grid positions, random headings and propeller phases
+    rng = np.random.default_rng(seed)
+    positions = grid_positions(count, spacing)
+    headings = rng.uniform(0.0, 360.0, count)
+    phases = rng.uniform(0.0, 360.0, count)
+    
+    trajectories = None
+    if trajectory == "circle":
+        trajectories = circle_trajectories(positions, frames, radius=spacing / 3.0, phases=phases)
+    
+    define_fleet(
+        stage, instancer_path, prototype_paths, positions,
+        orientations=yaw_orientations(headings),
+        proto_indices=phase_buckets(phases, phase_count),
+        frames=frames if trajectories is not None else None,
+        trajectories=trajectories,
+    )
+    print(f"Placed {count} drones")
+    
+    # Add a light to ensure visibility
+    light = UsdLux.DistantLight.Define(stage, "/Light")
+    light.CreateIntensityAttr(500.0)
+    light.CreateAngleAttr(0.53)
+    light.CreateColorAttr(Gf.Vec3f(1.0, 1.0, 1.0))
+    
+    # Drop samples that linear interpolation reproduces
+    reduce_keyframes(stage)
+    
+    # Save the fleet USD file
+    stage.Export(layer_file)
+    print(f"✅ Fleet USD saved to {layer_file}")
+    
+    # Convert to USDZ
+    try:
+        UsdUtils.CreateNewUsdzPackage(
+            Sdf.AssetPath(layer_file),
+            output_file
+        )
+        print(f"✅ USDZ package created at {output_file}")
+        return True
+    except Exception as e:
+        print(f"❌ Error creating USDZ package: {e}")
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Create a USDZ file with a fleet of animated drones')
+    parser.add_argument('output_file', nargs='?', help='Path to the output USDZ file (optional)')
+    parser.add_argument('--count', type=int, default=100, help='Number of drones (default: 100)')
+    parser.add_argument('--spacing', type=float, default=6.0, help='Distance between drones on the grid (default: 6)')
+    parser.add_argument('--duration', type=float, default=3, help='Animation duration in seconds (default: 3)')
+    parser.add_argument('--fps', type=int, default=24, help='Frames per second (default: 24)')
+    parser.add_argument('--phases', type=int, default=8, help='Number of propeller phase prototypes (default: 8)')
+    parser.add_argument('--trajectory', choices=['none', 'circle'], default='none', help='Per-drone motion (default: none)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for headings and phases (default: 0)')
+    add_output_format_argument(parser)
+    
+    args = parser.parse_args()
+    
+    create_fleet(args.output_file, args.count, args.spacing, args.duration, args.fps,
+                 args.phases, args.trajectory, args.seed, args.output_format)
+
+if __name__ == "__main__":
+    main()